@@ -13,8 +13,14 @@ def create_app():
     environment_configuration = os.environ['CONFIGURATION_SETUP']
     app.config.from_object(environment_configuration)
     login_manager.init_app(app)
-    
-    
+
+    from application.common.log_context import LogContext
+    LogContext.install(app)
+
+    if app.config.get("SQL_METRICS_ENABLED"):
+        from application.common.sql_metrics import SqlMetrics
+        SqlMetrics.install()
+
     with app.app_context():
         # Register blueprints
 
@@ -30,5 +36,15 @@ def create_app():
         app.register_blueprint(auth_api_blueprint)
         from application.apis.lockups_api import lockups_api_blueprint
         app.register_blueprint(lockups_api_blueprint)
+        from application.apis.metrics_api import metrics_api_blueprint
+        app.register_blueprint(metrics_api_blueprint)
+
+        if app.config.get("ACTION_WORKERS_ENABLED"):
+            from application.common.action_worker import ActionWorker
+            ActionWorker.start()
+
+        if app.config.get("OUTBOX_RELAY_ENABLED"):
+            from application.common.outbox_relay import OutboxRelay
+            OutboxRelay.start()
 
         return app
@@ -5,10 +5,11 @@ import jwt
 from config import Config
 from . import auth_api_blueprint
 from application.common.general import General
+from application.common.pagination import Pagination
 from flask import app, request, jsonify, abort
 from ...models.auth.roles import Roles
 from werkzeug.security import generate_password_hash,check_password_hash
-from application.common.auth_middleware import token_required
+from application.common.auth_middleware import token_required, permission_required
 
       
         
@@ -161,6 +162,7 @@ def get_role(role_id):
 """delete user by id API."""
 @auth_api_blueprint.route('/api/roles/<int:role_id>', methods=['DELETE'])
 @token_required
+@permission_required("delete-roles")
 def delete_role_by_id(current_user, role_id):
     """
     API endpoint to delete a user by ID.
@@ -168,7 +170,7 @@ def delete_role_by_id(current_user, role_id):
     try:
         # Ensure the current user is authorized to delete users
         
-        if current_user['role'] != 1 and current_user['role'] != 2:
+        if current_user['role_id'] != 1 and current_user['role_id'] != 2:
             return jsonify({
                 "message": "You are not authorized to delete roles.",
                 "success": False
@@ -244,9 +246,17 @@ def list_roles(page,page_size):
                 'success': False
             }), 400
 
+        # Opt-in keyset pagination: ?after=<next_after of the previous page> ('' for the first page)
+        # ?approximate=1 reports an estimated total instead of counting
+        try:
+            keyset = Pagination.from_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e), 'success': False}), 400
+
         # Call Groups service to fetch paginated data
         role = Roles()
-        result = role.list_roles(page, page_size)
+        result = role.list_roles(page, page_size, keyset=keyset,
+                                 approximate=Pagination.flag(request.args, 'approximate'))
         # print(result)
         if isinstance(result, dict) and 'error' in result:
             return jsonify({
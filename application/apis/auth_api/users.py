@@ -4,11 +4,12 @@ import jwt
 from config import Config
 from . import auth_api_blueprint
 from application.common.general import General
+from application.common.pagination import Pagination
 from flask import app, request, jsonify, abort
 from ...models.auth.users import Users
 from ...models.auth.permissions import Permissions
 from werkzeug.security import generate_password_hash,check_password_hash
-from application.common.auth_middleware import token_required
+from application.common.auth_middleware import token_required, permission_required
 
 """login API."""
 @auth_api_blueprint.route('/api/users/login', methods=['POST'])
@@ -290,6 +291,7 @@ def get_user(current_user,user_id):
 """delete user by id API."""
 @auth_api_blueprint.route('/api/users/<int:user_id>', methods=['DELETE'])
 @token_required
+@permission_required("delete-users")
 def delete_user_by_id(current_user,user_id):
     """
     API endpoint to delete a user by ID.
@@ -373,9 +375,17 @@ def list_users(current_user,page,page_size):
                 'success': False
             }), 400
 
+        # Opt-in keyset pagination: ?after=<next_after of the previous page> ('' for the first page)
+        # ?approximate=1 reports an estimated total instead of counting
+        try:
+            keyset = Pagination.from_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e), 'success': False}), 400
+
         # Call Groups service to fetch paginated data
         user = Users()
-        result = user.list_users(page, page_size)
+        result = user.list_users(page, page_size, keyset=keyset,
+                                 approximate=Pagination.flag(request.args, 'approximate'))
         # print(result)
         if isinstance(result, dict) and 'error' in result:
             return jsonify({
@@ -1,10 +1,10 @@
 import json
 import logging
 
-from application.common.auth_middleware import token_required
+from application.common.auth_middleware import token_required, permission_required
 from . import dynamic_api_blueprint
 from application.common.general import General
-from flask import request, jsonify, abort
+from flask import request, jsonify, abort, Response, stream_with_context
 from ...models.dynamic.data import Data
 
 
@@ -157,6 +157,55 @@ def fetch_form_data():
         }), 500
 
 
+@dynamic_api_blueprint.route('/api/dynamic/data/export', methods=['POST'])
+@token_required
+@permission_required("export-form_data")
+def export_form_data(current_user):
+    try:
+        # Parse and validate request
+        req = request.get_json(force=True)
+        req_validation = General.request_validation(json_data=req, keys=[
+            ["table_name", "required", None],
+            ["columns", None, None],
+        ])
+
+        if req_validation is not None:
+            return jsonify({
+                'message': 'Request parameter error',
+                'data': req_validation,
+                'success': False
+            }), 400
+
+        columns = req.get("columns", None)
+        if columns is not None and not isinstance(columns, list):
+            return jsonify({
+                'message': 'Columns must be a list',
+                'success': False
+            }), 400
+
+        rows = Data.export_form_data(table_name=req["table_name"], columns=columns)
+        if isinstance(rows, dict) and 'error' in rows:
+            return jsonify({
+                'message': 'Failed to export form data',
+                'error': rows['error'],
+                'success': False
+            }), 400
+
+        # One JSON document per line, streamed while rows are read from MySQL. The query already ran;
+        # the stream keeps one pooled connection until the download ends or the client goes away
+        return Response(stream_with_context(json.dumps(row, default=str) + "\n" for row in rows),
+                        mimetype='application/x-ndjson')
+
+    except Exception as e:
+        General.write_event(f"Error in export_form_data: {str(e)}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
+
+
 @dynamic_api_blueprint.errorhandler(403)
 def forbidden(e):
     return jsonify({
@@ -4,7 +4,10 @@ import logging
 from application.common.auth_middleware import token_required
 from . import dynamic_api_blueprint
 from application.common.general import General
-from flask import request, jsonify, abort
+from application.common.pagination import Pagination
+from application.common.lookup_cache import LookupCache
+from flask import request, jsonify, abort, make_response
+import config as app
 from ...models.dynamic.lockups import Lockups
 
 
@@ -75,8 +78,16 @@ def fetch_lockups(current_user,page,page_size):
                 'success': False
             }), 400
             
+        # Opt-in keyset pagination: ?after=<next_after of the previous page> ('' for the first page)
+        # ?approximate=1 reports an estimated total instead of counting
+        try:
+            keyset = Pagination.from_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e), 'success': False}), 400
+
         # Fetch data from the database
-        result = Lockups.get_lockups(page,page_size)
+        result = Lockups.get_lockups(page,page_size,keyset=keyset,
+                                     approximate=Pagination.flag(request.args, 'approximate'))
         
         if isinstance(result, dict) and 'error' in result:
             return jsonify({
@@ -269,6 +280,66 @@ def add_lockup_data(current_user):
         }), 500
 
 
+"""API for fetching the rows of several lockups at once."""
+@dynamic_api_blueprint.route('/api/dynamic/lockups/bulk', methods=['POST'])
+@token_required
+def fetch_lockups_bulk(current_user):
+    try:
+        # {"lockup_ids": [1, 2], "etags": {"1": "<etag of lockup 1 from a previous response>"}}
+        req = request.get_json(force=True)
+        lockup_ids = req.get('lockup_ids')
+        known_etags = req.get('etags') or {}
+
+        if not isinstance(lockup_ids, list) or not lockup_ids \
+                or not all(isinstance(lockup_id, int) and lockup_id > 0 for lockup_id in lockup_ids):
+            return jsonify({
+                'message': 'Invalid lockup_ids parameter. lockup_ids must be a non-empty list of lockup ids.',
+                'success': False
+            }), 400
+
+        lockup_ids = list(dict.fromkeys(lockup_ids))  # drop repeated ids, keep the order
+        if len(lockup_ids) > app.Config.LOOKUP_BULK_MAX_IDS:
+            return jsonify({
+                'message': f'Too many lockup_ids. At most {app.Config.LOOKUP_BULK_MAX_IDS} lockups per call.',
+                'success': False
+            }), 400
+
+        if not isinstance(known_etags, dict):
+            return jsonify({'message': 'Invalid etags parameter. etags must map lockup ids to etags.',
+                            'success': False}), 400
+
+        result = Lockups.get_lockups_bulk(lockup_ids, known_etags)
+        if isinstance(result, dict) and 'error' in result:
+            return jsonify({
+                'message': 'Failed to retrieve lockups',
+                'error': result['error'],
+                'success': False
+            }), 500
+
+        # One tag for the whole set: If-None-Match with it gives a 304 while none of the lockups changed.
+        # Weak, because the body also depends on the per-lockup etags sent in the request.
+        etag = LookupCache.etag([[entry['lockup_id'], entry.get('etag')] for entry in result['data']])
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(jsonify({
+                'message': 'Successfully retrieved lockups',
+                'data': result['data'],
+                'success': True
+            }), 200)
+        response.set_etag(etag, weak=True)
+        return response
+
+    except Exception as e:
+        General.write_event(f"Error in fetch_lockups_bulk: {str(e)}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
+
+
 @dynamic_api_blueprint.route('/api/dynamic/lockups/data/<int:lockup_id>/<int:page>&<int:page_size>', methods=['GET'])
 @token_required
 def fetch_lockup_data(current_user,lockup_id,page,page_size):
@@ -285,8 +356,16 @@ def fetch_lockup_data(current_user,lockup_id,page,page_size):
                 'message': 'Invalid page_size parameter. Page size must be a positive integer between 1 and 100.',
                 'success': False
             }), 400
+        # Opt-in keyset pagination: ?after=<next_after of the previous page> ('' for the first page)
+        # ?approximate=1 reports an estimated total instead of counting
+        try:
+            keyset = Pagination.from_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e), 'success': False}), 400
+
         # Fetch data from the database
-        result = Lockups.get_lockup_table_data(lockup_id,page,page_size)
+        result = Lockups.get_lockup_table_data(lockup_id,page,page_size,keyset=keyset,
+                                               approximate=Pagination.flag(request.args, 'approximate'))
         
         # Return the result
         return jsonify({
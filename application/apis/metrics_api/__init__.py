@@ -0,0 +1,7 @@
+# application/metrics_api/__init__.py
+from flask import Blueprint
+metrics_api_blueprint = Blueprint('metrics_api', __name__)
+
+from . import sql
+from . import caches
+from . import http
@@ -0,0 +1,26 @@
+from application.common.auth_middleware import token_required, permission_required
+from . import metrics_api_blueprint
+from application.common.general import General
+from application.common.ttl_cache import TTLCache
+from flask import jsonify
+
+"""In-process cache statistics API."""
+@metrics_api_blueprint.route('/api/metrics/caches', methods=['GET'])
+@token_required
+@permission_required("view-metrics")
+def cache_statistics(current_user):
+    try:
+        return jsonify({
+            'message': 'Successfully retrieved cache statistics',
+            'data': TTLCache.all_stats(),
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"Error in cache_statistics: {e}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
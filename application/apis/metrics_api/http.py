@@ -0,0 +1,49 @@
+from application.common.auth_middleware import token_required, permission_required
+from . import metrics_api_blueprint
+from application.common.general import General
+from application.common.http_client import HttpClient
+from flask import jsonify
+
+"""Outbound HTTP statistics API."""
+@metrics_api_blueprint.route('/api/metrics/http', methods=['GET'])
+@token_required
+@permission_required("view-metrics")
+def http_statistics(current_user):
+    try:
+        return jsonify({
+            'message': 'Successfully retrieved outbound HTTP statistics',
+            'data': HttpClient.stats(),
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"Error in http_statistics: {e}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
+
+
+"""Reset outbound HTTP statistics API."""
+@metrics_api_blueprint.route('/api/metrics/http', methods=['DELETE'])
+@token_required
+@permission_required("delete-metrics")
+def reset_http_statistics(current_user):
+    try:
+        HttpClient.reset()
+        return jsonify({
+            'message': 'Outbound HTTP statistics reset successfully',
+            'data': None,
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"Error in reset_http_statistics: {e}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
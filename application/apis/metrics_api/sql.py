@@ -0,0 +1,94 @@
+from application.common.auth_middleware import token_required, permission_required
+from . import metrics_api_blueprint
+from application.common.general import General
+from application.common.sql_metrics import SqlMetrics
+from flask import request, jsonify
+
+ORDER_BY_FIELDS = ("total_ms", "avg_ms", "max_ms", "calls", "rows", "errors")
+
+"""Top-N SQL statements API."""
+@metrics_api_blueprint.route('/api/metrics/sql/top/<int:limit>', methods=['GET'])
+@token_required
+@permission_required("view-metrics")
+def top_sql_statements(current_user, limit):
+    try:
+        if limit < 1 or limit > 500:
+            return jsonify({
+                'message': 'Invalid limit parameter. Limit must be a positive integer between 1 and 500.',
+                'success': False
+            }), 400
+
+        order_by = request.args.get('order_by', 'total_ms')
+        if order_by not in ORDER_BY_FIELDS:
+            return jsonify({
+                'message': f"Invalid order_by parameter. Allowed values: {', '.join(ORDER_BY_FIELDS)}",
+                'success': False
+            }), 400
+
+        return jsonify({
+            'message': 'Successfully retrieved SQL statement statistics',
+            'data': SqlMetrics.top(limit=limit, order_by=order_by),
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"Error in top_sql_statements: {e}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
+
+
+"""Reset SQL statistics API."""
+@metrics_api_blueprint.route('/api/metrics/sql', methods=['DELETE'])
+@token_required
+@permission_required("delete-metrics")
+def reset_sql_statements(current_user):
+    try:
+        SqlMetrics.reset()
+        return jsonify({
+            'message': 'SQL statement statistics reset successfully',
+            'data': None,
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"Error in reset_sql_statements: {e}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
+
+
+@metrics_api_blueprint.errorhandler(403)
+def forbidden(e):
+    return jsonify({
+        "message": "Forbidden",
+        "error": str(e),
+        "data": None,
+        "success": False
+    }), 403
+
+
+@metrics_api_blueprint.errorhandler(404)
+def not_found(e):
+    return jsonify({
+        "message": "Endpoint Not Found",
+        "error": str(e),
+        "data": None,
+        "success": False
+    }), 404
+
+
+@metrics_api_blueprint.errorhandler(500)
+def internal_server_error(e):
+    return jsonify({
+        "message": "Internal Server Error",
+        "error": str(e),
+        "data": None,
+        "success": False
+    }), 500
@@ -5,6 +5,7 @@ workflow_api_blueprint = Blueprint('workflow_api', __name__)
 from . import workflow
 from . import activities
 from . import instances
+from . import inbox
 from . import tasks
 from . import execute_template
 from . import task_group_workflow
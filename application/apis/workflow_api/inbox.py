@@ -0,0 +1,57 @@
+from application.common.auth_middleware import token_required
+from . import workflow_api_blueprint
+from application.common.general import General
+from flask import request, jsonify
+from ...models.workflow.process import Process
+import config as app
+
+"""API for the work inbox of the current user."""
+@workflow_api_blueprint.route('/api/inbox', methods=['GET'])
+@token_required
+def get_inbox(current_user):
+    try:
+        # Keyset pagination: ?after=<last process_id of the previous page>&limit=<page size>
+        after = request.args.get('after', type=int)
+        limit = request.args.get('limit', default=app.Config.INBOX_PAGE_SIZE, type=int)
+
+        if after is not None and after < 1:
+            return jsonify({
+                'message': 'Invalid after parameter. After must be a positive process id.',
+                'success': False
+            }), 400
+
+        if limit is None or limit < 1 or limit > app.Config.INBOX_PAGE_SIZE_MAX:
+            return jsonify({
+                'message': f'Invalid limit parameter. Limit must be a positive integer between 1 and '
+                           f'{app.Config.INBOX_PAGE_SIZE_MAX}.',
+                'success': False
+            }), 400
+
+        process = Process()
+        result = process.list_inbox(user_id=current_user["id"],
+                                    group_id=current_user.get("group_id"),
+                                    level_id=current_user.get("level_id"),
+                                    after=after,
+                                    limit=limit)
+        if not result["success"]:
+            return jsonify({
+                'message': 'Failed to retrieve inbox',
+                'error': result['error'],
+                'success': False
+            }), 500
+
+        return jsonify({
+            'message': 'Successfully retrieved inbox',
+            'data': result['data'],
+            'pagination': {'limit': limit, 'after': after, 'next_after': result['next_after']},
+            'success': True
+        }), 200
+
+    except Exception as e:
+        General.write_event(f"An internal server error occurred: {str(e)}")
+        return jsonify({
+            "error": "An internal server error occurred",
+            "message": str(e),
+            "data": None,
+            "success": False
+        }), 500
@@ -1,14 +1,15 @@
-from application.common.auth_middleware import token_required
+from application.common.auth_middleware import token_required, permission_required
 from . import workflow_api_blueprint
 from application.common.general import General
-from flask import request, jsonify, abort
+from flask import request, jsonify, abort, Response, stream_with_context
 from ...models.workflow.instances import Instances
-from ...models.workflow.tasks import Tasks
-from ...models.workflow.task_dependencies import TaskDependencies
 from ...models.workflow.process import Process
+from ...models.workflow.workflow_graph import WorkflowGraph
+from ...models.workflow.workflow_router import WorkflowRouter
+from application.mysql_connection import Connection
 from datetime import datetime
-import time
-MAX_RETRIES = 3  # Maximum retries for task updates
+import json
+import config as app
 
 """API for start workflow instance."""
 @workflow_api_blueprint.route('/api/start_workflow/<int:template_id>', methods=['PUT'])
@@ -25,19 +26,34 @@ def start_workflow_instance(current_user, template_id):
         request_id = req.get('request_id')
         status = "Running"
         current_time = datetime.now()
+
+        # Get first task of the workflow and its routing (assigned_to, group_id, level_id)
+        graph = WorkflowGraph.for_template(template_id)
+        first_step = graph.first_task_id if graph else None
+        if not first_step:
+            return jsonify({'error': 'No steps defined for this workflow template', 'success': False}), 400
+
+        # The instance and its first process are written together or not at all
         instance = Instances()
-        # Check for existing instance with same request_id
-        data = instance.exists(request_id=request_id)
-        if data.get("success", False) is True and data.get("data") is not None:
+        with Connection.transaction() as tx:
+            # Create workflow instance; a retried request_id is rejected by the unique key
+            result = instance.create_instance(template_id=template_id, request_id=request_id, status=status,
+                                              started_at=current_time)
+            if 'error' not in result:
+                # Processing for a manual task; Pending with its actions queued for an automated one
+                created = WorkflowRouter().start_task(graph, result["instance_id"], first_step)
+                if 'error' in created:
+                    result = created
+            if 'error' in result:
+                tx.rollback_only()
+
+        if isinstance(result, dict) and result.get('duplicate'):
             return jsonify(
                 {'message': 'Duplicate request detected',
                  'error': 'Duplicate request detected',
+                 'data': {'instance_id': result.get('instance_id')},
                  'success': False}), 409
 
-        # Create workflow instance
-        result = instance.create_instance(template_id=template_id, request_id=request_id, status=status,
-                                          started_at=current_time)
-
         if isinstance(result, dict) and 'error' in result:
             General.write_event(f"Failed to create workflow instance: {result['error']}")
             return jsonify(
@@ -46,55 +62,128 @@ def start_workflow_instance(current_user, template_id):
         instance_id = result.get("instance_id")
         General.write_event(f"Workflow instance {instance_id} created successfully.")
 
-        # Get first task of the workflow
-        task = Tasks()
-        task_result = task.get_first_task_in_template(template_id=template_id)
-        if isinstance(task_result, dict) and 'error' in task_result:
-            General.write_event(f"Failed to retrieve first workflow task for template {template_id}: {task_result['error']}")
-            return jsonify({'message': f'Failed to retrieve first workflow task for template {template_id}',
-                            'error': task_result['error'], 'success': False}), 500
+        # The assignee is notified from the outbox: create_process stored a workflow_process.created
+        # event with the process, and OutboxRelay delivers it to the configured sinks
 
-        first_step = task_result.get("task_id")
-        if not first_step:
-            return jsonify({'error': 'No steps defined for this workflow template', 'success': False}), 400
+        General.write_event(f"Workflow {template_id} started successfully with instance ID {instance_id}")
 
-        # Get task information (assigned_to, group_id, level_id)
-        task_info_result = task.get_task_info(task_id=first_step)
-        if isinstance(task_info_result, dict) and 'error' in task_info_result:
-            General.write_event(f"Failed to retrieve workflow task info for task {first_step}: {task_info_result['error']}")
-            return jsonify({'message': f'Failed to retrieve workflow task info for task {first_step}',
-                            'error': task_info_result['error'], 'success': False}), 500
+        return jsonify({'message': 'Workflow started', 'data': {'instance_id': instance_id}, 'success': True}), 201
 
-        assigned_to = task_info_result.get("assigned_to")
-        group_id = task_info_result.get("group_id")
-        level_id = task_info_result.get("level_id")
+    except Exception as e:
+        General.write_event(f"An internal server error occurred: {str(e)}")
+        return jsonify(
+            {"error": "An internal server error occurred", "message": str(e), "data": None, "success": False}), 500
+"""API for start workflow instances in batch."""
+@workflow_api_blueprint.route('/api/start_workflow/<int:template_id>/batch', methods=['PUT'])
+@token_required
+def start_workflow_instances_batch(current_user, template_id):
+    try:
+        req = request.get_json(force=True)
 
-        # Create workflow process for instance
-        process = Process()
-        process.create_process(instance_id=instance_id, task_id=first_step, status="Processing",
-                               assigned_to=assigned_to, group_id=group_id, level_id=level_id)
-
-        # Notify assigned user (if available)
-        # if assigned_to:
-        #     user = General.get_user_info(user_id=assigned_to)  # Assuming function exists to get user details
-        #     if user:
-        #         email = user.get("email")
-        #         phone = user.get("phone")
-        #         message = f"You have been assigned a new task (ID: {first_step}) in workflow {template_id}."
-        #
-        #         if email:
-        #             send_email(email, "New Task Assigned", message)
-        #         if phone:
-        #             send_sms(phone, message)
+        # Validate request
+        req_validation = General.request_validation(json_data=req, keys=[["request_ids", "required", None]])
+        request_ids = req.get('request_ids')
+        if not req_validation and not isinstance(request_ids, list):
+            req_validation = [{"param": "request_ids", "errorType": "invalid_format",
+                               "message": "request_ids must be a list."}]
+        elif not req_validation and len(request_ids) > app.Config.WORKFLOW_START_BATCH_MAX:
+            req_validation = [{"param": "request_ids", "errorType": "invalid_format",
+                               "message": f"request_ids accepts at most {app.Config.WORKFLOW_START_BATCH_MAX} items."}]
+        if req_validation:
+            return jsonify({'message': 'Request parameter error', 'data': req_validation, 'success': False}), 400
 
-        General.write_event(f"Workflow {template_id} started successfully with instance ID {instance_id}")
+        # Get first task of the workflow and its routing before touching any row
+        graph = WorkflowGraph.for_template(template_id)
+        first_step = graph.first_task_id if graph else None
+        if not first_step:
+            return jsonify({'error': 'No steps defined for this workflow template', 'success': False}), 400
 
-        return jsonify({'message': 'Workflow started', 'data': {'instance_id': instance_id}, 'success': True}), 201
+        # One result per submitted item, in request order
+        results = [{"request_id": request_id, "status": None, "instance_id": None} for request_id in request_ids]
+        pending = {}
+        for result in results:
+            request_id = result["request_id"]
+            if request_id in (None, "") or isinstance(request_id, (dict, list, bool)):
+                result["status"] = "invalid"
+            elif str(request_id) in pending:
+                result["status"] = "duplicate"
+            else:
+                pending[str(request_id)] = result
+
+        # Drop request_ids that already have an instance with one IN (...) query
+        instance = Instances()
+        existing = instance.existing_request_ids(template_id, list(pending))
+        if isinstance(existing, dict) and 'error' in existing:
+            return jsonify({'message': 'Failed to check existing workflow instances', 'error': existing['error'],
+                            'success': False}), 500
+        for request_id in existing["data"]:
+            result = pending.pop(request_id, None)
+            if result is not None:
+                result["status"] = "duplicate"
+
+        if pending:
+            # Instances and their first processes are written together or not at all
+            with Connection.transaction() as tx:
+                created = instance.create_instances(template_id=template_id, request_ids=list(pending),
+                                                    status="Running", started_at=datetime.now())
+                if 'error' not in created:
+                    processed = WorkflowRouter().start_tasks(graph, list(created["data"].values()), first_step)
+                    created = processed if 'error' in processed else created
+                if 'error' in created:
+                    tx.rollback_only()
+
+            if created.get('duplicate'):
+                # A concurrent call inserted one of the ids after the check; a retry reports it as duplicate
+                return jsonify({'message': 'Duplicate request detected, retry the batch',
+                                'error': 'Duplicate request detected',
+                                'success': False}), 409
+            if 'error' in created:
+                General.write_event(f"Failed to create workflow instances: {created['error']}")
+                return jsonify({'message': 'Failed to create workflow instances', 'error': created['error'],
+                                'success': False}), 500
+
+            for request_id, instance_id in created["data"].items():
+                pending[request_id].update(status="created", instance_id=instance_id)
+
+        created_count = sum(1 for result in results if result["status"] == "created")
+        General.write_event(f"Workflow {template_id} started {created_count} of {len(results)} instances in batch",
+                            level="INFO")
+
+        return jsonify({'message': 'Workflow batch processed',
+                        'data': {'created': created_count,
+                                 'duplicates': sum(1 for result in results if result["status"] == "duplicate"),
+                                 'invalid': sum(1 for result in results if result["status"] == "invalid"),
+                                 'results': results},
+                        'success': True}), 201 if created_count else 200
+
+    except Exception as e:
+        General.write_event(f"An internal server error occurred: {str(e)}")
+        return jsonify(
+            {"error": "An internal server error occurred", "message": str(e), "data": None, "success": False}), 500
+"""API for export workflow instances by status."""
+@workflow_api_blueprint.route('/api/workflow_instances/<string:status>/export', methods=['GET'])
+@token_required
+@permission_required("export-workflow_instances")
+def export_workflow_instances(current_user, status):
+    try:
+        instance = Instances()
+        result = instance.iter_instances_by_status(status=status)
+        if isinstance(result, dict) and 'error' in result:
+            return jsonify({'message': 'Failed to export workflow instances', 'error': result['error'],
+                            'success': False}), 500
+
+        # One JSON document per line, streamed while rows are read from MySQL. The query already ran;
+        # the stream keeps one pooled connection until the download ends or the client goes away
+        rows = result["data"]
+        return Response(stream_with_context(json.dumps(row, default=str) + "\n" for row in rows),
+                        mimetype='application/x-ndjson')
 
     except Exception as e:
         General.write_event(f"An internal server error occurred: {str(e)}")
         return jsonify(
             {"error": "An internal server error occurred", "message": str(e), "data": None, "success": False}), 500
+
+
 # @workflow_api_blueprint.route('/api/start_workflow/<int:template_id>', methods=['PUT'])
 # @token_required
 # def start_workflow_instance(current_user, template_id):
@@ -181,98 +270,43 @@ def start_workflow_instance(current_user, template_id):
 @token_required
 def complete_task(current_user, process_id):
     try:
-        req = request.get_json(force=True)
-
-        # Validate request
-        req_validation = General.request_validation(json_data=req, keys=[["task_id", "required", None]])
-        if req_validation:
-            return jsonify({'message': 'Request parameter error', 'data': req_validation, 'success': False}), 400
-
-        task_id = req['task_id']
-        General.write_event(f"Completing task {task_id} in process {process_id}", level="INFO")
+        req = request.get_json(force=True, silent=True) or {}
 
+        # The task is the one stored on the process; a task_id in the body is only checked against it
         process = Process()
+        process_data = process.get_process_with_template(process_id=process_id)
+        if process_data.get("error"):
+            return jsonify({'message': 'Failed to retrieve workflow process data', 'error': process_data.get('error'),
+                            'success': False}), 500
+        if not process_data.get("data"):
+            return jsonify({'message': 'Workflow process not found', 'success': False}), 404
+
+        task_id = process_data["data"]["task_id"]
+        if req.get('task_id') is not None and str(req['task_id']) != str(task_id):
+            return jsonify({'message': 'Request parameter error',
+                            'data': [{"param": "task_id", "errorType": "invalid_value",
+                                      "message": f"Process {process_id} belongs to task {task_id}."}],
+                            'success': False}), 400
+        General.write_event(f"Completing task {task_id} in process {process_id}", level="INFO")
 
-        # Retry mechanism for updating task status
-        retries = 0
-        while retries < MAX_RETRIES:
-            try:
-                result = process.update_process(process_id=process_id, status="Completed")
-                if isinstance(result, dict) and 'error' in result:
-                    raise Exception(result['error'])
-                General.write_event(f"Task {task_id} marked as completed.")
-                break
-            except Exception as update_error:
-                General.write_event(f"Error updating task {task_id}: {update_error}")
-                retries += 1
-                time.sleep(2)
-
-        if retries == MAX_RETRIES:
-            General.write_event(f"Task {task_id} could not be marked as completed after {MAX_RETRIES} attempts.")
-            return jsonify({'message': 'Failed to update workflow process status', 'success': False}), 500
-
-        # Get next tasks that depend on the completed task
-        task_dependency = TaskDependencies()
-        tasks_dependent = task_dependency.get_tasks_dependent_on_specific_task(task_id=task_id)
-
-        # Get instance from process
-        process_data = process.get_process_by_id(process_id=process_id)
-        if isinstance(process_data, dict) and 'error' in process_data:
-            return jsonify({'message': 'Failed to retrieve workflow process data', 'error': process_data['error'], 'success': False}), 500
-
-        instance_id = process_data.get("instance_id")
-
-        if tasks_dependent:
-            General.write_event(f"Task {task_id} has dependent tasks: {tasks_dependent}")
-
-            for dependent_task in tasks_dependent:
-                next_task = dependent_task.get("next_task")
-
-                # Check if this task has conditions from previous tasks
-                specific_task_dependency = task_dependency.get_tasks_specific_task_depends(dependent_task_id=next_task)
-                task_condition = specific_task_dependency.get("task_condition")
-
-                if task_condition:  # Example: Waiting for all previous tasks to complete
-                    General.write_event(f"Task {next_task} has a condition: {task_condition}")
-                    # Implement condition check logic (e.g., ensure all dependencies are completed)
-
-                # Get task info
-                task = Tasks()
-                task_info_result = task.get_task_info(task_id=next_task)
-                if isinstance(task_info_result, dict) and 'error' in task_info_result:
-                    return jsonify({
-                        'message': f'Failed to retrieve workflow task info for task {next_task}',
-                        'error': task_info_result['error'],
-                        'success': False
-                    }), 500
-
-                assigned_to = task_info_result.get("assigned_to")
-                group_id = task_info_result.get("group_id")
-                level_id = task_info_result.get("level_id")
-                # role_id = task_info_result.get("role_id")
-
-                # Assign task to an available user if assigned_to is empty
-                # if not assigned_to and role_id:
-                #     assigned_to = get_available_user_by_role(role_id)
-
-                # Create new task process
-                process.create_process(instance_id=instance_id,
-                                       task_id=next_task,
-                                       status="Processing",
-                                       assigned_to=assigned_to,
-                                       group_id=group_id,
-                                       level_id=level_id)
-
-                # Send notifications
-                # if assigned_to:
-                #     notify_user(assigned_to, next_task)
-
-            General.write_event(f"Task {task_id} completed, moving to next tasks.")
-        else:
-            # If no more tasks, mark the instance as completed
-            instance = Instances()
-            instance.update_instance_status(instance_id=instance_id, status="Completed")
-            General.write_event(f"Workflow instance {instance_id} completed.")
+        # Completing the process, counting the join arrival and creating the next processes commit together
+        with Connection.transaction() as tx:
+            # Only a Processing process can be completed; of two concurrent calls exactly one gets the row
+            result = process.update_process(process_id=process_id, status="Completed", expected_status="Processing")
+            if result.get('success'):
+                result = WorkflowRouter().advance(instance_id=process_data["data"]["instance_id"],
+                                                  template_id=process_data["data"]["template_id"],
+                                                  task_id=task_id)
+            if not result.get('success'):
+                tx.rollback_only()
+
+        if not result.get('success') and result.get('data') == 0:
+            return jsonify({'message': 'Workflow process is not open for completion', 'error': result['error'],
+                            'success': False}), 409
+        if not result.get('success'):
+            General.write_event(f"Task {task_id} of process {process_id} could not be completed: {result['error']}")
+            return jsonify({'message': 'Failed to complete task and move the workflow to the next step',
+                            'error': result['error'], 'success': False}), 500
 
         return jsonify({'message': 'Task completed and moved to the next step', 'data': None, 'success': True}), 200
 
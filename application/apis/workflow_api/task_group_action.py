@@ -89,24 +89,7 @@ def update_task_group_action(current_user, task_id):
 
         workflow = TasksGroupAction()
 
-        # 1. حذف الإجراءات الحالية المرتبطة بالمهمة
-        result_data = workflow.get_task_group_action(task_id)
-        # print(f"Get task group action result: {result_data}")
-        General.write_event(f"Get task group action result: {result_data}", "INFO")
-
-        existing_actions = result_data.get('data') if isinstance(result_data, dict) else []
-
-        if isinstance(existing_actions, list):
-            for item in existing_actions:
-                item_id = item.get("id")
-                if item_id:
-                    delete_result = workflow.delete_task_group_action(item_id)
-                    if delete_result.get("success") is not True:
-                        General.write_event(f"Failed to delete item {item_id}: {delete_result.get('error')}")
-        else:
-            General.write_event("No valid list of existing actions found.", "INFO")
-
-        # 2. التحقق من صحة البيانات الجديدة
+        # 1. التحقق من صحة البيانات الجديدة
         new_actions = []
         for item in req_data:
             if not all(k in item for k in ("group_id", "action", "level")):
@@ -122,9 +105,9 @@ def update_task_group_action(current_user, task_id):
                 "level": item["level"]
             })
 
-        # 3. إدخال البيانات الجديدة
+        # 2. استبدال البيانات الحالية بالبيانات الجديدة (حذف وإدخال في معاملة واحدة)
         try:
-            result = workflow.create_task_group_action(new_actions)
+            result = workflow.replace_task_group_actions(task_id, new_actions)
         except Exception as db_error:
             General.write_event(f"Exception during creation: {str(db_error)}")
             return jsonify({
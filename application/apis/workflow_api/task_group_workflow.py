@@ -91,24 +91,7 @@ def update_task_group_workflow(current_user, task_id):
 
         workflow = TasksGroupWorkflow()
 
-        # 1. حذف الإجراءات الحالية المرتبطة بالمهمة
-        result_data = workflow.get_task_group_workflow(task_id)
-        # print(f"Get task group action result: {result_data}")
-        General.write_event(f"Get task group action result: {result_data}", "INFO")
-
-        existing_actions = result_data.get('data') if isinstance(result_data, dict) else []
-
-        if isinstance(existing_actions, list):
-            for item in existing_actions:
-                item_id = item.get("id")
-                if item_id:
-                    delete_result = workflow.delete_task_group_workflow(item_id)
-                    if delete_result.get("success") is not True:
-                        General.write_event(f"Failed to delete item {item_id}: {delete_result.get('error')}")
-        else:
-            General.write_event("No valid list of existing workflow found.", "INFO")
-
-        # 2. التحقق من صحة البيانات الجديدة
+        # 1. التحقق من صحة البيانات الجديدة
         new_workflows = []
         for item in req_data:
             if not all(k in item for k in ("from_group", "to_group", "assign_task")):
@@ -124,9 +107,9 @@ def update_task_group_workflow(current_user, task_id):
                 "assign_task": item["assign_task"]
             })
 
-        # 3. إدخال البيانات الجديدة
+        # 2. استبدال البيانات الحالية بالبيانات الجديدة (حذف وإدخال في معاملة واحدة)
         try:
-            result = workflow.create_task_group_workflow(new_workflows)
+            result = workflow.replace_task_group_workflows(task_id, new_workflows)
         except Exception as db_error:
             General.write_event(f"Exception during creation: {str(db_error)}")
             return jsonify({
@@ -1,6 +1,7 @@
 from application.common.auth_middleware import token_required
 from . import workflow_api_blueprint
 from application.common.general import General
+from application.common.pagination import Pagination
 from flask import request, jsonify, abort
 from ...models.workflow.workflow import Workflows
 
@@ -233,9 +234,17 @@ def list_workflows(current_user,page,page_size):
                 'success': False
             }), 400
 
+        # Opt-in keyset pagination: ?after=<next_after of the previous page> ('' for the first page)
+        # ?approximate=1 reports an estimated total instead of counting
+        try:
+            keyset = Pagination.from_args(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e), 'success': False}), 400
+
         # Call Groups service to fetch paginated data
         workflow = Workflows()
-        result = workflow.list_workflows(page, page_size)
+        result = workflow.list_workflows(page, page_size, keyset=keyset,
+                                         approximate=Pagination.flag(request.args, 'approximate'))
         # print(result)
         if isinstance(result, dict) and 'error' in result:
             return jsonify({
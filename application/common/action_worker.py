@@ -0,0 +1,278 @@
+import atexit
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import config as app
+from application.common.general import General
+from application.common.http_client import HttpClient
+from application.mysql_connection import Connection
+
+
+class PermanentActionError(Exception):
+    """Raised by an action handler for failures that retrying cannot fix (bad config, unknown type)."""
+
+
+class ActionWorker:
+    """
+    In-process pool that runs queued automated actions (ActionQueue).
+
+    A daemon thread claims due jobs whenever a slot is free, at most
+    ACTION_WORKER_THREADS at once and at most ACTION_WORKER_CONCURRENCY[type]
+    per action type, and runs them on a thread pool. Handlers registered with
+    register() receive the action config and a timeout (ACTION_TIMEOUT_SECONDS)
+    they must finish within; the built-in ones hand it to HttpClient as the
+    deadline of their calls. An attempt that raises is retried with exponential
+    backoff and one whose lease runs out is requeued, until ACTION_MAX_ATTEMPTS;
+    the outcome is recorded on workflow_process and the instance moves on once
+    all actions of the process succeeded.
+    """
+
+    _handlers = {}
+    _lock = threading.Lock()
+    _wakeup = threading.Condition(_lock)
+    _running = Counter()
+    _executor = None
+    _thread = None
+    _pid = None
+    _stopping = False
+    _pending_wakeup = False
+
+    @staticmethod
+    def register(action_type, handler):
+        """Registers `handler(config, timeout)` for `action_type`; its return value is stored as the job result."""
+        ActionWorker._handlers[action_type] = handler
+
+    @staticmethod
+    def start():
+        if app.Config.ACTION_WORKERS_ENABLED:
+            ActionWorker._ensure_started()
+
+    @staticmethod
+    def notify():
+        """Wakes the dispatcher after new jobs were queued instead of waiting for the next poll."""
+        if not app.Config.ACTION_WORKERS_ENABLED:
+            return
+        ActionWorker._ensure_started()
+        with ActionWorker._wakeup:
+            ActionWorker._pending_wakeup = True
+            ActionWorker._wakeup.notify()
+
+    @staticmethod
+    def shutdown():
+        """Stops claiming jobs and waits for running ones (registered with atexit)."""
+        with ActionWorker._wakeup:
+            ActionWorker._stopping = True
+            ActionWorker._wakeup.notify()
+        thread, executor = ActionWorker._thread, ActionWorker._executor
+        if ActionWorker._pid != os.getpid():
+            return
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _ensure_started():
+        # A forked worker inherits the state but not the threads
+        if ActionWorker._thread is not None and ActionWorker._pid == os.getpid():
+            return
+        with ActionWorker._lock:
+            if ActionWorker._thread is None or ActionWorker._pid != os.getpid():
+                ActionWorker._pid = os.getpid()
+                ActionWorker._stopping = False
+                ActionWorker._running = Counter()
+                ActionWorker._executor = ThreadPoolExecutor(max_workers=app.Config.ACTION_WORKER_THREADS,
+                                                            thread_name_prefix="action-worker")
+                ActionWorker._thread = threading.Thread(target=ActionWorker._run, name="action-dispatcher",
+                                                        daemon=True)
+                ActionWorker._thread.start()
+
+    @staticmethod
+    def _run():
+        from application.models.workflow.action_queue import ActionQueue
+
+        queue = ActionQueue()
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        last_requeue = 0
+        while True:
+            with ActionWorker._wakeup:
+                if not ActionWorker._stopping and not ActionWorker._pending_wakeup:
+                    ActionWorker._wakeup.wait(timeout=app.Config.ACTION_WORKER_POLL_SECONDS)
+                ActionWorker._pending_wakeup = False
+                if ActionWorker._stopping:
+                    return
+
+            try:
+                if time.monotonic() - last_requeue >= app.Config.ACTION_LEASE_SECONDS / 2:
+                    last_requeue = time.monotonic()
+                    queue.requeue_expired()
+                    # Processes whose last job ran out of attempts, or whose finishing never committed
+                    for process_id in queue.stalled_processes():
+                        ActionWorker._finish_process(queue, process_id)
+
+                with ActionWorker._lock:
+                    free = app.Config.ACTION_WORKER_THREADS - sum(ActionWorker._running.values())
+                    saturated = [action_type for action_type in ActionWorker._running
+                                 if ActionWorker._running[action_type] >= ActionWorker._limit(action_type)]
+                reserved = []
+
+                def accept(job):
+                    if not ActionWorker._reserve_slot(job):
+                        return False
+                    reserved.append(job)
+                    return True
+
+                try:
+                    jobs = queue.claim(worker_id, free, accept, exclude_types=saturated)
+                except Exception:
+                    # Nothing was claimed; give the slots back
+                    for job in reserved:
+                        ActionWorker._release_slot(job["action_type"])
+                    raise
+                for job in jobs:
+                    ActionWorker._executor.submit(ActionWorker._execute, queue, job)
+            except Exception as e:
+                # The dispatcher must survive a lost DB connection; the next poll retries
+                General.write_event(f"Action dispatcher error: {e}")
+
+    @staticmethod
+    def _limit(action_type):
+        limits = app.Config.ACTION_WORKER_CONCURRENCY
+        return limits.get(action_type, limits.get("default", app.Config.ACTION_WORKER_THREADS))
+
+    @staticmethod
+    def _reserve_slot(job):
+        with ActionWorker._lock:
+            if ActionWorker._running[job["action_type"]] >= ActionWorker._limit(job["action_type"]):
+                return False
+            ActionWorker._running[job["action_type"]] += 1
+            return True
+
+    @staticmethod
+    def _release_slot(action_type):
+        with ActionWorker._wakeup:
+            ActionWorker._running[action_type] -= 1
+            if ActionWorker._running[action_type] <= 0:
+                del ActionWorker._running[action_type]
+            # A slot opened up; look for more work right away
+            ActionWorker._pending_wakeup = True
+            ActionWorker._wakeup.notify()
+
+    @staticmethod
+    def _execute(queue, job):
+        timeout = app.Config.ACTION_TIMEOUT_SECONDS
+        finished = True
+        try:
+            handler = ActionWorker._handlers.get(job["action_type"])
+            if handler is None:
+                raise PermanentActionError(f"No handler registered for action type {job['action_type']}")
+
+            result = handler(ActionWorker._config(job["action_config"]), timeout)
+            queue.mark_succeeded(job["id"], result)
+        except Exception as e:
+            General.write_event(f"Automated action job {job['id']} attempt {job['attempts']} failed: {e}",
+                                level="WARNING")
+            try:
+                if isinstance(e, PermanentActionError) or job["attempts"] >= job["max_attempts"]:
+                    queue.mark_failed(job["id"], e)
+                else:
+                    queue.mark_retry(job["id"], e, ActionWorker._backoff(job["attempts"]))
+                    finished = False
+            except Exception as mark_error:
+                # The lease runs out and the job is requeued
+                General.write_event(f"Error recording failure of action job {job['id']}: {mark_error}")
+                finished = False
+        finally:
+            ActionWorker._release_slot(job["action_type"])
+
+        if finished:
+            ActionWorker._finish_process(queue, job["process_id"])
+
+    @staticmethod
+    def _finish_process(queue, process_id):
+        from application.models.workflow.workflow_router import WorkflowRouter
+
+        try:
+            # The outcome and the next processes commit together; if advancing fails the process stays
+            # Pending and the periodic sweep (ActionQueue.stalled_processes) finishes it again
+            with Connection.transaction() as tx:
+                finished = queue.finish_process(process_id)
+                if not finished.get("done") or not finished.get("data"):
+                    return
+
+                process = finished["data"]
+                if finished["failed"]:
+                    General.write_event(f"Automated actions of process {process_id} failed; "
+                                        f"instance {process['instance_id']} is waiting on task {process['task_id']}")
+                    return
+                routed = WorkflowRouter().advance(process["instance_id"], process["template_id"], process["task_id"])
+                if not routed.get("success"):
+                    tx.rollback_only()
+                    General.write_event(f"Error advancing instance {process['instance_id']} after automated "
+                                        f"process {process_id}: {routed.get('error')}")
+        except Exception as e:
+            General.write_event(f"Error finishing automated process {process_id}: {e}")
+
+    @staticmethod
+    def _backoff(attempts):
+        delay = min(app.Config.ACTION_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+                    app.Config.ACTION_RETRY_BACKOFF_MAX_SECONDS)
+        # Jitter keeps retries of a failed endpoint from arriving in lockstep
+        return max(1, round(delay * random.uniform(0.5, 1.0)))
+
+    @staticmethod
+    def _config(action_config):
+        if isinstance(action_config, str):
+            try:
+                return json.loads(action_config)
+            except ValueError:
+                raise PermanentActionError("action_config is not valid JSON")
+        return action_config or {}
+
+
+def call_api_action(config, timeout):
+    """Built-in handler: {"url", "method", "params", "data", "headers"} sent through General.call_api."""
+    if not isinstance(config, dict) or not config.get("url"):
+        raise PermanentActionError("action_config needs a url")
+
+    method = config.get("method", "POST")
+    response = General.call_api(config["url"], method=method, params=config.get("params"), data=config.get("data"),
+                                headers=config.get("headers"), retries=_http_retries(method),
+                                deadline=time.monotonic() + timeout)
+    if isinstance(response, dict) and response.get("error") == "API request failed":
+        raise RuntimeError(response.get("details"))
+    return response
+
+
+def call_apis_action(config, timeout):
+    """Built-in handler: {"calls": [call_api_action configs], "concurrency": n} sent concurrently."""
+    calls = config.get("calls") if isinstance(config, dict) else None
+    if not calls or not all(isinstance(call, dict) and call.get("url") for call in calls):
+        raise PermanentActionError("action_config needs a list of calls with a url")
+
+    deadline = time.monotonic() + timeout
+    responses = General.call_api_many([dict(call, method=call.get("method", "POST"), deadline=deadline,
+                                            retries=_http_retries(call.get("method", "POST")))
+                                       for call in calls], limit=config.get("concurrency"))
+    failed = [call["url"] for call, response in zip(calls, responses)
+              if isinstance(response, dict) and response.get("error") == "API request failed"]
+    if failed:
+        # The whole fan-out is retried, so receivers should tolerate repeats
+        raise RuntimeError(f"{len(failed)} of {len(calls)} calls failed: {', '.join(failed)}")
+    return responses
+
+
+def _http_retries(method):
+    # The job itself is retried; repeating a POST inside an attempt could run it twice on the receiver
+    return None if method.upper() in HttpClient.IDEMPOTENT_METHODS else 0
+
+
+ActionWorker.register("api", call_api_action)
+ActionWorker.register("webhook", call_api_action)
+ActionWorker.register("webhooks", call_apis_action)
+atexit.register(ActionWorker.shutdown)
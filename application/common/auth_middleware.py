@@ -4,6 +4,8 @@ from flask import request, jsonify, abort
 # import config as app
 from config import Config
 from application.models.auth.users import Users
+from application.models.auth.permissions import Permissions
+from application.common.log_context import LogContext
 
 def token_required(f):
     @wraps(f)
@@ -28,12 +30,12 @@ def token_required(f):
             # Decode token
             decoded_data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
 
-            # Fetch user details
+            # Fetch user details (cached for a few seconds per user)
             instance_user = Users()
-            current_user = instance_user.get_user_by_id(decoded_data["user_id"])
+            current_user = instance_user.get_user_context(decoded_data["user_id"])
 
             # Validate if user exists
-            if not current_user:
+            if not current_user or "error" in current_user:
                 return jsonify({
                     "message": "Invalid Authentication Token!",
                     "data": None,
@@ -52,6 +54,8 @@ def token_required(f):
                     "code": 403
                 }), 403
 
+            LogContext.set_user(current_user.get("id"))
+
         except jwt.ExpiredSignatureError:
             # Handle expired token
             return jsonify({
@@ -86,3 +90,35 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def permission_required(name):
+    """
+    Rejects the request with 403 unless the user's role grants permission `name`.
+
+    Must be applied below token_required, which supplies current_user:
+
+        @token_required
+        @permission_required("delete-users")
+        def delete_user_by_id(current_user, user_id): ...
+
+    The check runs against the cached permission set of the role, so it
+    costs no query once the role has been loaded.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            if not Permissions().has_permission(current_user.get("role_id"), name):
+                return jsonify({
+                    "message": f"Missing permission: {name}",
+                    "data": None,
+                    "error": "Forbidden",
+                    "success": False,
+                    "code": 403
+                }), 403
+
+            return f(current_user, *args, **kwargs)
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,135 @@
+import atexit
+import heapq
+import itertools
+import os
+import sys
+import threading
+from collections import deque
+import config as app
+
+
+class EventLogger:
+    """
+    Background writer behind General.write_event.
+
+    Callers only append the formatted line to an in-memory buffer; a daemon
+    thread wakes up every EVENT_LOG_FLUSH_SECONDS (or once EVENT_LOG_BATCH_SIZE
+    records are waiting) and appends each batch to its log file with a single
+    open/write/close. The buffer holds at most EVENT_LOG_BUFFER_SIZE records:
+    when it is full DEBUG/INFO records are dropped first, so warnings and
+    errors are only lost once the buffer holds nothing else. Whatever is still
+    buffered is written when the process exits.
+    """
+
+    LOW_PRIORITY_LEVELS = ("DEBUG", "INFO")
+
+    _lock = threading.Lock()
+    _wakeup = threading.Condition(_lock)
+    # Records are (sequence, file_name, line); low and high priority are kept apart
+    # so overflow can evict the oldest DEBUG/INFO record in O(1)
+    _low = deque()
+    _high = deque()
+    _sequence = itertools.count()
+    _dropped = 0
+    _thread = None
+    _pid = None
+    _stopping = False
+
+    @staticmethod
+    def log(file_name, line, level="ERROR"):
+        """Queues `line` for `file_name`; never blocks on file I/O."""
+        if not app.Config.EVENT_LOG_ASYNC:
+            EventLogger._write_batch([(0, file_name, line)])
+            return
+
+        EventLogger._ensure_started()
+        low = str(level).upper() in EventLogger.LOW_PRIORITY_LEVELS
+
+        with EventLogger._wakeup:
+            if len(EventLogger._low) + len(EventLogger._high) >= app.Config.EVENT_LOG_BUFFER_SIZE:
+                if low or not EventLogger._low:
+                    EventLogger._dropped += 1
+                    return
+                EventLogger._low.popleft()
+                EventLogger._dropped += 1
+
+            record = (next(EventLogger._sequence), file_name, line)
+            (EventLogger._low if low else EventLogger._high).append(record)
+
+            if len(EventLogger._low) + len(EventLogger._high) >= app.Config.EVENT_LOG_BATCH_SIZE:
+                EventLogger._wakeup.notify()
+
+    @staticmethod
+    def flush():
+        """Writes everything buffered so far on the calling thread."""
+        EventLogger._write_batch(EventLogger._take_batch())
+
+    @staticmethod
+    def shutdown():
+        """Stops the writer thread after a final flush (registered with atexit)."""
+        with EventLogger._wakeup:
+            EventLogger._stopping = True
+            EventLogger._wakeup.notify()
+        thread = EventLogger._thread
+        if thread is not None and thread.is_alive() and EventLogger._pid == os.getpid():
+            thread.join(timeout=5)
+        EventLogger.flush()
+
+    @staticmethod
+    def _ensure_started():
+        # A forked worker inherits the buffer but not the thread
+        if EventLogger._thread is not None and EventLogger._pid == os.getpid():
+            return
+        with EventLogger._lock:
+            if EventLogger._thread is None or EventLogger._pid != os.getpid():
+                EventLogger._pid = os.getpid()
+                EventLogger._stopping = False
+                EventLogger._thread = threading.Thread(target=EventLogger._run, name="event-logger", daemon=True)
+                EventLogger._thread.start()
+
+    @staticmethod
+    def _run():
+        while True:
+            with EventLogger._wakeup:
+                if not EventLogger._stopping:
+                    EventLogger._wakeup.wait(timeout=app.Config.EVENT_LOG_FLUSH_SECONDS)
+                stopping = EventLogger._stopping
+            EventLogger.flush()
+            if stopping:
+                return
+
+    @staticmethod
+    def _take_batch():
+        # Imported here: General itself logs through EventLogger
+        from application.common.general import General
+
+        with EventLogger._lock:
+            low, EventLogger._low = EventLogger._low, deque()
+            high, EventLogger._high = EventLogger._high, deque()
+            dropped, EventLogger._dropped = EventLogger._dropped, 0
+
+        # Restore the original order across both priorities
+        batch = list(heapq.merge(low, high))
+        if dropped:
+            # Same format as every other record, in the main event log
+            batch.append((next(EventLogger._sequence), General.log_file_name(),
+                          General.format_event("Event log buffer full, records dropped", level="WARNING",
+                                               dropped_records=dropped)))
+        return batch
+
+    @staticmethod
+    def _write_batch(batch):
+        by_file = {}
+        for _, file_name, line in batch:
+            by_file.setdefault(file_name, []).append(line)
+
+        for file_name, lines in by_file.items():
+            try:
+                with open(file_name, 'a') as handle:
+                    handle.write(''.join(lines))
+            except (OSError, TypeError) as e:
+                # Logging must never take the service down; fall back to stderr
+                sys.stderr.write(f"Failed to write {len(lines)} records to {file_name}: {e}\n")
+
+
+atexit.register(EventLogger.shutdown)
@@ -4,6 +4,10 @@ import re
 import requests
 from werkzeug.security import generate_password_hash
 import os
+import config as app
+from application.common.event_logger import EventLogger
+from application.common.http_client import HttpClient
+from application.common.log_context import LogContext
 
 
 class General:
@@ -72,25 +76,47 @@ class General:
     #         log_file.write(log_message)
     
     @staticmethod
-    def write_event(message, level="ERROR"):
-        time_date = datetime.now()
-        date = time_date.day
+    def log_file_name(name="bpm-service", time_date=None):
+        """Today's log file for `name` in the platform log directory."""
+        date = (time_date or datetime.now()).day
         file_name = None
         if platform == "linux" or platform == "linux2":
-            file_name = f'/var/log/code/bpm-service-{date}.log'
+            file_name = f'/var/log/code/{name}-{date}.log'
         elif platform == "win32":
-            file_name = f'D:\\log\\bpm-service-{date}.log'
+            file_name = f'D:\\log\\{name}-{date}.log'
         elif platform == "win64":
-            file_name = f'D:\\log\\bpm-service-{date}.log'
+            file_name = f'D:\\log\\{name}-{date}.log'
+        return file_name
 
-        handle = open(file_name, 'a')
-        if handle is None:
-            handle = open(file_name, 'w')
+    @staticmethod
+    def write_event(message, level="ERROR", **fields):
+        """Queues a log line; EventLogger appends it to today's file in the background."""
+        time_date = datetime.now()
+        file_name = General.log_file_name(time_date=time_date)
 
-        data = f'{time_date} -- {level}-- {message} --\n '
+        data = General.format_event(message, level, time_date, **fields)
 
-        handle.write(data)
-        handle.close()
+        EventLogger.log(file_name, data, level)
+
+    @staticmethod
+    def format_event(message, level="ERROR", time_date=None, **fields):
+        """
+        Formats one log record.
+
+        With EVENT_LOG_FORMAT = "json" the record is a JSON line carrying the
+        request context (request_id, method, route, user_id, elapsed_ms) and
+        any extra `fields`; otherwise it is the classic text line with the
+        fields appended as key=value.
+        """
+        time_date = time_date or datetime.now()
+        if app.Config.EVENT_LOG_FORMAT != "json":
+            extra = ''.join(f' {key}={value}' for key, value in fields.items())
+            return f'{time_date} -- {level}-- {message}{extra} --\n '
+
+        record = {"ts": time_date.isoformat(timespec="milliseconds"), "level": str(level).upper(), "message": message}
+        record.update(LogContext.current())
+        record.update(fields)
+        return LogContext.dumps(record) + "\n"
 
     # --------------- Request Validation ----------------
     @staticmethod
@@ -144,7 +170,7 @@ class General:
     def post_api(api_url, data=None, headers=None):
         """POST API Request."""
         try:
-            response = requests.post(api_url, json=data, headers=headers)
+            response = HttpClient.request('POST', api_url, json=data, headers=headers)
             response.raise_for_status()  # Raise HTTPError for bad responses
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -152,12 +178,46 @@ class General:
             return {"error": "API request failed", "details": str(e)}
 
     @staticmethod
-    def call_api(api_url, method='GET', params=None, data=None, headers=None):
+    def call_api(api_url, method='GET', params=None, data=None, headers=None, timeout=None, retries=None,
+                 deadline=None):
         """General API Call."""
         try:
-            response = requests.request(method, api_url, params=params, json=data, headers=headers)
+            response = HttpClient.request(method, api_url, timeout=timeout, retries=retries,
+                                          deadline=deadline, params=params, json=data, headers=headers)
             response.raise_for_status()  # Raise HTTPError for bad responses
             return response.json()
         except requests.exceptions.RequestException as e:
             General.write_event(f"API {method} Request Failed: {e}")
             return {"error": "API request failed", "details": str(e)}
+
+    @staticmethod
+    def call_api_many(calls, limit=None):
+        """
+        Concurrent form of call_api: sends every call at once (at most `limit` in flight)
+        and returns one call_api-style result per call, in order.
+
+        Each call is a dict with "url" and optional "method", "params", "data", "headers", "timeout",
+        "retries" and "deadline" (see HttpClient.request).
+        """
+        requests_args = [{
+            "url": call["url"],
+            "method": call.get("method", "GET"),
+            "params": call.get("params"),
+            "json": call.get("data"),
+            "headers": call.get("headers"),
+            "timeout": call.get("timeout"),
+            "retries": call.get("retries"),
+            "deadline": call.get("deadline"),
+        } for call in calls]
+
+        results = []
+        for call, outcome in zip(requests_args, HttpClient.request_many(requests_args, limit=limit)):
+            try:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                outcome.raise_for_status()  # Raise HTTPError for bad responses
+                results.append(outcome.json())
+            except requests.exceptions.RequestException as e:
+                General.write_event(f"API {call['method']} Request Failed: {e}")
+                results.append({"error": "API request failed", "details": str(e)})
+        return results
@@ -0,0 +1,300 @@
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+import config as app
+
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """Raised when no request slot for a host frees up within Config.HTTP_QUEUE_WAIT_SECONDS."""
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP layer behind General.call_api and General.post_api.
+
+    Each host gets its own keep-alive Session (so repeated calls skip DNS, TCP
+    and TLS setup), a cap of HTTP_MAX_CONCURRENCY_PER_HOST requests in flight
+    and default (connect, read) timeouts. Connection errors and 429/502/503/504
+    answers are retried with exponential backoff and full jitter; requests
+    that may have reached the server are only retried for idempotent methods.
+    Per-host latency statistics are available through HttpClient.stats().
+
+    gather() / request_many() fan several calls out concurrently, so N calls
+    take about as long as the slowest one instead of the sum of all.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+    RETRY_STATUSES = frozenset((429, 502, 503, 504))
+    # Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+    BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    _lock = threading.Lock()
+    _hosts = {}
+    _pid = None
+    _fanout_executor = None
+    _fanout_pid = None
+
+    @staticmethod
+    def request(method, url, timeout=None, retries=None, deadline=None, **kwargs):
+        """
+        Sends a request through the pooled session of the URL's host.
+
+        Args:
+            timeout: seconds or (connect, read) per attempt; defaults to the configured timeouts.
+            retries: retry budget; defaults to Config.HTTP_MAX_RETRIES.
+            deadline: time.monotonic() value by which the whole call, slot waits and
+                backoff included, must be done. Each attempt's timeouts are cut to the
+                time left and no retry is started after the deadline.
+            **kwargs: passed to requests.Session.request (params, json, headers, ...).
+
+        Returns:
+            requests.Response of the last attempt. Raises requests.RequestException
+            when every attempt failed to produce a response.
+        """
+        method = method.upper()
+        host = HttpClient._host(url)
+        if timeout is None:
+            timeout = (app.Config.HTTP_CONNECT_TIMEOUT_SECONDS, app.Config.HTTP_READ_TIMEOUT_SECONDS)
+        retries = app.Config.HTTP_MAX_RETRIES if retries is None else retries
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            response, error, sent, waited_ms = None, None, True, 0.0
+            queue_wait = HttpClient._remaining(app.Config.HTTP_QUEUE_WAIT_SECONDS, deadline)
+            try:
+                waited_ms = HttpClient._acquire(host, queue_wait)
+                try:
+                    started = time.perf_counter()
+                    attempt_timeout = HttpClient._remaining(timeout, deadline)
+                    response = host["session"].request(method, url, timeout=attempt_timeout, **kwargs)
+                finally:
+                    HttpClient._release(host)
+            except HostBusyError as e:
+                error, sent, waited_ms = e, False, queue_wait * 1000
+            except requests.exceptions.ConnectTimeout as e:
+                error, sent = e, False
+            except requests.exceptions.ConnectionError as e:
+                # Refused/reset before a response; the request may or may not have been processed
+                error = e
+            except requests.exceptions.RequestException as e:
+                error = e
+
+            HttpClient._record(host, (time.perf_counter() - started) * 1000, waited_ms, response, error, attempt)
+
+            retryable = (response is not None and response.status_code in HttpClient.RETRY_STATUSES) or \
+                        isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            may_repeat = not sent or method in HttpClient.IDEMPOTENT_METHODS or \
+                (response is not None and response.status_code in (429, 503))
+            if attempt >= retries or not retryable or not may_repeat:
+                if response is not None:
+                    return response
+                raise error
+
+            delay = HttpClient._backoff(attempt, response)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                # No time left for another attempt
+                if response is not None:
+                    return response
+                raise error
+            if response is not None:
+                # Hands the connection back to the pool before waiting
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    async def gather(calls, limit=None):
+        """
+        Runs `calls` concurrently, at most `limit` (Config.HTTP_FANOUT_CONCURRENCY)
+        at a time, and returns their outcomes in the same order.
+
+        Each call is a dict of request() arguments: "url", optional "method"
+        (GET) and any of timeout, retries, deadline, params, json, headers. An outcome is
+        the requests.Response, or the exception the call raised.
+        """
+        semaphore = asyncio.Semaphore(limit or app.Config.HTTP_FANOUT_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        executor = HttpClient._executor()
+
+        async def send(call):
+            call = dict(call)
+            method, url = call.pop("method", "GET"), call.pop("url")
+            async with semaphore:
+                # Requests stays blocking; the pooled sessions run on a shared thread pool
+                return await loop.run_in_executor(executor, functools.partial(HttpClient.request, method, url,
+                                                                              **call))
+
+        return await asyncio.gather(*(send(call) for call in calls), return_exceptions=True)
+
+    @staticmethod
+    def request_many(calls, limit=None):
+        """Blocking form of gather() for Flask handlers and worker threads."""
+        if not calls:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(HttpClient.gather(calls, limit))
+        # asyncio.run() cannot nest inside a running loop; use a helper thread instead
+        with ThreadPoolExecutor(max_workers=1) as helper:
+            return helper.submit(asyncio.run, HttpClient.gather(calls, limit)).result()
+
+    @staticmethod
+    def stats():
+        """Returns per-host call counts, retries, errors, status classes and latency histograms."""
+        labels = [f"<={bound}ms" for bound in HttpClient.BUCKETS_MS] + [f">{HttpClient.BUCKETS_MS[-1]}ms"]
+        with HttpClient._lock:
+            hosts = list(HttpClient._hosts.items())
+
+        result = {}
+        for name, host in hosts:
+            with host["lock"]:
+                stats = dict(host["stats"], statuses=dict(host["stats"]["statuses"]),
+                             histogram=list(host["stats"]["histogram"]))
+                in_flight = host["in_flight"]
+            calls = stats["calls"] or 1
+            result[name] = {
+                "calls": stats["calls"],
+                "retries": stats["retries"],
+                "errors": stats["errors"],
+                "statuses": stats["statuses"],
+                "avg_ms": round(stats["total_ms"] / calls, 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "avg_wait_ms": round(stats["wait_ms"] / calls, 3),
+                "in_flight": in_flight,
+                "histogram": {label: count for label, count in zip(labels, stats["histogram"]) if count},
+            }
+        return result
+
+    @staticmethod
+    def reset():
+        """Clears the collected statistics (sessions and their connections are kept)."""
+        with HttpClient._lock:
+            hosts = list(HttpClient._hosts.values())
+        for host in hosts:
+            with host["lock"]:
+                host["stats"] = HttpClient._new_stats()
+
+    @staticmethod
+    def _host(url):
+        parts = urlsplit(url)
+        name = f"{parts.scheme}://{parts.netloc}".lower()
+
+        with HttpClient._lock:
+            # A forked worker must not share sockets with its parent
+            if HttpClient._pid != os.getpid():
+                HttpClient._hosts = {}
+                HttpClient._pid = os.getpid()
+
+            host = HttpClient._hosts.get(name)
+            if host is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=app.Config.HTTP_MAX_CONCURRENCY_PER_HOST)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                host = HttpClient._hosts[name] = {
+                    "session": session,
+                    "slots": threading.BoundedSemaphore(app.Config.HTTP_MAX_CONCURRENCY_PER_HOST),
+                    "lock": threading.Lock(),
+                    "in_flight": 0,
+                    "stats": HttpClient._new_stats(),
+                }
+            return host
+
+    @staticmethod
+    def _executor():
+        with HttpClient._lock:
+            if HttpClient._fanout_executor is None or HttpClient._fanout_pid != os.getpid():
+                HttpClient._fanout_pid = os.getpid()
+                HttpClient._fanout_executor = ThreadPoolExecutor(max_workers=app.Config.HTTP_FANOUT_THREADS,
+                                                                 thread_name_prefix="http-fanout")
+            return HttpClient._fanout_executor
+
+    @staticmethod
+    def _remaining(timeout, deadline):
+        """`timeout` (seconds or a (connect, read) tuple) cut to the time left before `deadline`."""
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout("Deadline of the call passed")
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @staticmethod
+    def _acquire(host, wait):
+        """Waits up to `wait` seconds for a request slot of the host; returns the wait in ms."""
+        started = time.perf_counter()
+        if not host["slots"].acquire(timeout=wait):
+            raise HostBusyError(f"No free connection slot after {round(wait, 3)}s")
+        with host["lock"]:
+            host["in_flight"] += 1
+        return (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _release(host):
+        with host["lock"]:
+            host["in_flight"] -= 1
+        host["slots"].release()
+
+    @staticmethod
+    def _backoff(attempt, response):
+        cap = app.Config.HTTP_RETRY_BACKOFF_MAX_SECONDS
+        retry_after = HttpClient._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, cap)
+        # Full jitter: spreads retries of many callers hitting the same failing host
+        return random.uniform(0, min(cap, app.Config.HTTP_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                return None
+
+    @staticmethod
+    def _new_stats():
+        return {
+            "calls": 0,
+            "retries": 0,
+            "errors": 0,
+            "statuses": {},
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "wait_ms": 0.0,
+            "histogram": [0] * (len(HttpClient.BUCKETS_MS) + 1),
+        }
+
+    @staticmethod
+    def _record(host, elapsed_ms, waited_ms, response, error, attempt):
+        status = f"{response.status_code // 100}xx" if response is not None else type(error).__name__
+        bucket = next((index for index, bound in enumerate(HttpClient.BUCKETS_MS) if elapsed_ms <= bound),
+                      len(HttpClient.BUCKETS_MS))
+        with host["lock"]:
+            stats = host["stats"]
+            stats["calls"] += 1
+            stats["retries"] += 1 if attempt else 0
+            stats["errors"] += 1 if error is not None or response.status_code >= 500 else 0
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["wait_ms"] += waited_ms
+            stats["histogram"][bucket] += 1
@@ -0,0 +1,75 @@
+import json
+import time
+import uuid
+from flask import g, has_request_context, request
+import config as app
+
+try:
+    # Optional: several times faster than the stdlib encoder
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class LogContext:
+    """
+    Per-request correlation data attached to every structured log record.
+
+    install() registers Flask hooks that give each request an ID (taken from
+    the X-Request-ID header when the caller sends one) and echo it back in the
+    response, so all records written while serving a request can be joined.
+    """
+
+    REQUEST_ID_HEADER = "X-Request-ID"
+
+    @staticmethod
+    def install(app):
+        app.before_request(LogContext._start_request)
+        app.after_request(LogContext._finish_request)
+
+    @staticmethod
+    def current():
+        """Returns request_id, method, route, user_id and elapsed_ms, or {} outside a request."""
+        if not has_request_context():
+            return {}
+
+        started = g.get("request_started")
+        return {
+            "request_id": g.get("request_id"),
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule is not None else request.path,
+            "user_id": g.get("user_id"),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3) if started else None,
+        }
+
+    @staticmethod
+    def set_user(user_id):
+        """Records the authenticated user for the rest of the request."""
+        if has_request_context():
+            g.user_id = user_id
+
+    @staticmethod
+    def dumps(record):
+        """Serializes a log record to a single JSON line (non-JSON values become strings)."""
+        if orjson is not None:
+            return orjson.dumps(record, default=str).decode()
+        return json.dumps(record, default=str, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _start_request():
+        g.request_started = time.perf_counter()
+        incoming = request.headers.get(LogContext.REQUEST_ID_HEADER, "")
+        # Accept a caller's ID only if it is short and printable
+        g.request_id = incoming if 0 < len(incoming) <= 64 and incoming.isprintable() else uuid.uuid4().hex
+
+    @staticmethod
+    def _finish_request(response):
+        from application.common.general import General
+
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers[LogContext.REQUEST_ID_HEADER] = request_id
+        if app.Config.LOG_REQUESTS:
+            General.write_event("request completed", level="INFO", status=response.status_code,
+                                **({} if app.Config.EVENT_LOG_FORMAT == "json" else LogContext.current()))
+        return response
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import time
+import config as app
+from application.common.ttl_cache import TTLCache
+
+
+class LookupCache:
+    """
+    Process-local cache of whole lookup tables with versioned entries.
+
+    Each cached table carries the version it was loaded at, read from the
+    lookup_versions table (migration 007). Writers call invalidate(), which
+    bumps that version and drops the local entry. The other worker processes
+    notice the bump through a primary-key read of lookup_versions, made at
+    most once every LOOKUP_CACHE_CHECK_SECONDS per table. Between checks a
+    table is served from memory without touching MySQL.
+
+    Entries also carry an ETag, a hash of their rows computed once per load.
+    """
+
+    cache = TTLCache(
+        name="lookup_tables",
+        max_size=app.Config.LOOKUP_CACHE_SIZE,
+        ttl_seconds=app.Config.LOOKUP_CACHE_TTL_SECONDS,
+    )
+
+    _MISSING = object()
+
+    @staticmethod
+    def get(name, loader):
+        """
+        Rows of lookup `name`, calling `loader()` when they are not cached or out of date.
+
+        `loader` returns a list of row dicts, or None when the table is not worth
+        caching (too large); None is remembered until the version changes and
+        passed back so the caller reads MySQL itself. Callers get copies of the rows.
+        """
+        return LookupCache.get_with_etag(name, loader)[0]
+
+    @staticmethod
+    def get_with_etag(name, loader):
+        """Same as get(), returning (rows, etag); the etag is None when the rows are None."""
+        rows, etag = LookupCache._entry(name, loader)
+        return LookupCache._copy(rows), etag
+
+    @staticmethod
+    def get_slice(name, loader, start, stop):
+        """
+        Same as get(), returning (rows[start:stop], total row count); only the
+        rows of the slice are copied. Returns (None, None) when the rows are None.
+        """
+        rows = LookupCache._entry(name, loader)[0]
+        if rows is None:
+            return None, None
+        return LookupCache._copy(rows[start:stop]), len(rows)
+
+    @staticmethod
+    def _entry(name, loader):
+        """(rows, etag) as cached, not copied; callers must not modify the rows."""
+        from application.mysql_connection import Connection
+
+        now = time.monotonic()
+        entry = LookupCache.cache.get(name, LookupCache._MISSING)
+        if entry is not LookupCache._MISSING and now < entry["checked_until"]:
+            return entry["rows"], entry["etag"]
+
+        # Taken before reading MySQL: an invalidate() in this process meanwhile keeps the result out of the cache
+        generation = LookupCache.cache.generation(name)
+        version = LookupCache._version(Connection(), name)
+        checked_until = now + app.Config.LOOKUP_CACHE_CHECK_SECONDS
+        if entry is not LookupCache._MISSING and entry["version"] == version:
+            LookupCache.cache.set_if_generation(name, dict(entry, checked_until=checked_until), generation)
+            return entry["rows"], entry["etag"]
+
+        # Loaded after reading the version: a write in between only causes one extra reload
+        rows = loader()
+        etag = LookupCache.etag(rows) if rows is not None else None
+        LookupCache.cache.set_if_generation(name, {"version": version, "rows": rows, "etag": etag,
+                                                   "checked_until": checked_until}, generation)
+        return rows, etag
+
+    @staticmethod
+    def etag(rows):
+        """Content hash of `rows`; equal rows give the same tag in every worker process."""
+        content = json.dumps(rows, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @staticmethod
+    def invalidate(*names):
+        """
+        Marks lookups `names` as changed for every worker process.
+
+        Inside a transaction the version bump commits with the write, and the
+        local entries are dropped again after the commit.
+        """
+        from application.mysql_connection import Connection
+
+        db_connection = Connection()
+        for name in names:
+            db_connection._execute_query(
+                query=("INSERT INTO `lookup_versions` (name, version) VALUES (%s, 1) "
+                       "ON DUPLICATE KEY UPDATE version = version + 1"),
+                bind_variables=(name,),
+                fetch_one=False, fetch_all=False
+            )
+            LookupCache.cache.invalidate(name)
+
+        tx = Connection.current_transaction()
+        if tx is not None:
+            tx.after_commit(lambda: [LookupCache.cache.invalidate(name) for name in names])
+
+    @staticmethod
+    def _version(db_connection, name):
+        row = db_connection.select_one(table_name="`lookup_versions`", columns=["version"],
+                                       condition="name = %s", bind_variables=(name,))
+        return row["version"] if row else 0
+
+    @staticmethod
+    def _copy(rows):
+        return None if rows is None else [dict(row) for row in rows]
@@ -0,0 +1,152 @@
+import atexit
+import json
+import os
+import random
+import threading
+import config as app
+from application.common.general import General
+
+
+class OutboxRelay:
+    """
+    Background delivery of outbox events (see models.workflow.outbox.Outbox).
+
+    A daemon thread claims up to OUTBOX_BATCH_SIZE pending events every
+    OUTBOX_POLL_SECONDS and hands the batch to each sink named in
+    OUTBOX_SINKS. A sink is a callable taking the list of events and raising
+    on failure; the batch is then retried with jittered backoff until
+    OUTBOX_MAX_ATTEMPTS, so sinks must tolerate repeats (use the event id).
+    Sinks are added with register_sink(); "file" and "http" are built in.
+    """
+
+    _sinks = {}
+    _lock = threading.Lock()
+    _wakeup = threading.Condition(_lock)
+    _thread = None
+    _pid = None
+    _stopping = False
+    _pending_wakeup = False
+
+    @staticmethod
+    def register_sink(name, sink):
+        OutboxRelay._sinks[name] = sink
+
+    @staticmethod
+    def start():
+        if not app.Config.OUTBOX_RELAY_ENABLED:
+            return
+        # A forked worker inherits the state but not the thread
+        if OutboxRelay._thread is not None and OutboxRelay._pid == os.getpid():
+            return
+        with OutboxRelay._lock:
+            if OutboxRelay._thread is None or OutboxRelay._pid != os.getpid():
+                OutboxRelay._pid = os.getpid()
+                OutboxRelay._stopping = False
+                OutboxRelay._thread = threading.Thread(target=OutboxRelay._run, name="outbox-relay", daemon=True)
+                OutboxRelay._thread.start()
+
+    @staticmethod
+    def notify():
+        """Asks the relay to look for events now instead of at the next poll."""
+        OutboxRelay.start()
+        with OutboxRelay._wakeup:
+            OutboxRelay._pending_wakeup = True
+            OutboxRelay._wakeup.notify()
+
+    @staticmethod
+    def shutdown():
+        """Stops the relay after the batch in progress (registered with atexit)."""
+        with OutboxRelay._wakeup:
+            OutboxRelay._stopping = True
+            OutboxRelay._wakeup.notify()
+        thread = OutboxRelay._thread
+        if thread is not None and thread.is_alive() and OutboxRelay._pid == os.getpid():
+            thread.join(timeout=5)
+
+    @staticmethod
+    def relay_once(outbox=None):
+        """Delivers one batch; returns the number of events handled."""
+        from application.models.workflow.outbox import Outbox
+
+        outbox = outbox or Outbox()
+        events = outbox.claim(app.Config.OUTBOX_BATCH_SIZE, app.Config.OUTBOX_LEASE_SECONDS)
+        if not events:
+            return 0
+
+        event_ids = [event["id"] for event in events]
+        try:
+            for name in app.Config.OUTBOX_SINKS:
+                sink = OutboxRelay._sinks.get(name)
+                if sink is None:
+                    raise LookupError(f"Unknown outbox sink {name}")
+                sink(events)
+        except Exception as e:
+            attempts = max(event["attempts"] for event in events)
+            if attempts >= app.Config.OUTBOX_MAX_ATTEMPTS:
+                outbox.mark_dead(event_ids, e)
+            else:
+                General.write_event(f"Outbox delivery of {len(events)} events failed (attempt {attempts}): {e}",
+                                    level="WARNING")
+                outbox.mark_retry(event_ids, e, OutboxRelay._backoff(attempts))
+            return len(events)
+
+        outbox.mark_delivered(event_ids)
+        return len(events)
+
+    @staticmethod
+    def _run():
+        from application.models.workflow.outbox import Outbox
+
+        outbox = Outbox()
+        polls = 0
+        while True:
+            with OutboxRelay._wakeup:
+                if not OutboxRelay._stopping and not OutboxRelay._pending_wakeup:
+                    OutboxRelay._wakeup.wait(timeout=app.Config.OUTBOX_POLL_SECONDS)
+                OutboxRelay._pending_wakeup = False
+                if OutboxRelay._stopping:
+                    return
+
+            try:
+                if polls % 60 == 0:
+                    outbox.requeue_expired()
+                polls += 1
+                # Keep going while full batches come back
+                while OutboxRelay.relay_once(outbox) >= app.Config.OUTBOX_BATCH_SIZE \
+                        and not OutboxRelay._stopping:
+                    pass
+            except Exception as e:
+                # The relay must survive a lost DB connection; the next poll retries
+                General.write_event(f"Outbox relay error: {e}")
+
+    @staticmethod
+    def _backoff(attempts):
+        delay = min(app.Config.OUTBOX_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+                    app.Config.OUTBOX_RETRY_BACKOFF_MAX_SECONDS)
+        return max(1, round(delay * random.uniform(0.5, 1.0)))
+
+
+def file_sink(events):
+    """Built-in sink: appends one JSON line per event to Config.OUTBOX_FILE_PATH (or a daily log file)."""
+    file_name = app.Config.OUTBOX_FILE_PATH or General.log_file_name("bpm-service-outbox")
+    with open(file_name, "a") as handle:
+        handle.write("".join(json.dumps(event, default=str) + "\n" for event in events))
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def http_sink(events):
+    """Built-in sink: POSTs {"events": [...]} to Config.OUTBOX_HTTP_URL through the pooled HttpClient."""
+    from application.common.http_client import HttpClient
+
+    if not app.Config.OUTBOX_HTTP_URL:
+        raise ValueError("OUTBOX_HTTP_URL is not configured")
+    response = HttpClient.request("POST", app.Config.OUTBOX_HTTP_URL,
+                                  data=json.dumps({"events": events}, default=str),
+                                  headers={"Content-Type": "application/json"})
+    response.raise_for_status()
+
+
+OutboxRelay.register_sink("file", file_sink)
+OutboxRelay.register_sink("http", http_sink)
+atexit.register(OutboxRelay.shutdown)
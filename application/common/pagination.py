@@ -0,0 +1,110 @@
+import base64
+import binascii
+import json
+from application.common.row_counts import RowCounts
+
+
+class Pagination:
+    """
+    Keyset (cursor) pagination for the list endpoints.
+
+    The list APIs page with LIMIT/OFFSET by default, which reads and drops
+    every row before the page. Passing ?after=<cursor> switches them to
+    keyset mode: the page is read with `key > last key ORDER BY key LIMIT n`,
+    so any page costs the same as the first one. An empty ?after= asks for
+    the first page; each response carries the cursor of the next page in
+    pagination.next_after (None on the last page). The total count is only
+    computed in keyset mode when ?total=1 is given.
+
+    Totals come from RowCounts: exact and briefly cached, or the optimizer's
+    estimate with ?approximate=1.
+    """
+
+    @staticmethod
+    def flag(args, name):
+        """True when the boolean request argument `name` is set ("1", "true" or "yes")."""
+        return str(args.get(name, "")).lower() in ("1", "true", "yes")
+
+    @staticmethod
+    def encode_cursor(key_value):
+        """Opaque cursor for the row whose key is `key_value`."""
+        raw = json.dumps({"after": key_value}, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Key value carried by `cursor`; None for an empty cursor. Raises ValueError when it is malformed."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            return json.loads(raw)["after"]
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise ValueError("Invalid after parameter. Use the next_after value of the previous page.") from e
+
+    @staticmethod
+    def from_args(args):
+        """
+        Reads the keyset parameters of a request.
+
+        Returns None when the request does not ask for keyset mode (no `after`
+        argument), otherwise {"after": key value or None, "cursor": str, "with_total": bool}.
+        Raises ValueError for a malformed cursor.
+        """
+        if "after" not in args:
+            return None
+        cursor = args.get("after", "")
+        return {
+            "after": Pagination.decode_cursor(cursor),
+            "cursor": cursor or None,
+            "with_total": Pagination.flag(args, "total"),
+        }
+
+    @staticmethod
+    def keyset_page(db_connection, columns, from_where, bind_variables, key, keyset, page_size, key_field=None,
+                    count_table=None, count_condition=None, count_bind_variables=(), approximate=False):
+        """
+        Reads one keyset page.
+
+        `from_where` is the "FROM ... WHERE ..." part of the list query (its
+        WHERE clause must be a single condition, parenthesised if it uses OR)
+        and `key` the unique, indexed column the pages are sorted on, as
+        written in the query ("u.id"). `key_field` is the name of that column
+        in the result rows when it differs from the unqualified key.
+
+        With `count_table` the total is taken from RowCounts for that table
+        and `count_condition` (which must match the same rows as `from_where`);
+        otherwise it is counted from `from_where` directly.
+
+        Returns:
+            dict: {"data": rows, "pagination": {"page_size", "after", "next_after"[, "total_items"]}}
+        """
+        key_field = key_field or key.split(".")[-1]
+        seek, seek_variables = "", ()
+        if keyset["after"] is not None:
+            seek, seek_variables = f" AND {key} > %s", (keyset["after"],)
+
+        # One extra row tells whether there is a next page
+        rows = db_connection.execute_raw(
+            f"SELECT {columns} {from_where}{seek} ORDER BY {key} LIMIT %s",
+            (*bind_variables, *seek_variables, page_size + 1)
+        ) or []
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        pagination = {
+            "page_size": page_size,
+            "after": keyset["cursor"],
+            "next_after": Pagination.encode_cursor(rows[-1][key_field]) if has_more and rows else None,
+        }
+
+        if keyset["with_total"] and count_table:
+            pagination["total_items"] = RowCounts.count(db_connection, count_table, count_condition,
+                                                        count_bind_variables, approximate=approximate)
+            pagination["total_is_approximate"] = approximate
+        elif keyset["with_total"]:
+            total_count_results = db_connection.execute_raw(f"SELECT COUNT(*) AS total {from_where}",
+                                                            bind_variables)
+            pagination["total_items"] = total_count_results[0]["total"] if total_count_results else 0
+
+        return {"data": rows, "pagination": pagination}
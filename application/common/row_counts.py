@@ -0,0 +1,119 @@
+import re
+import threading
+import config as app
+from application.common.ttl_cache import TTLCache
+
+
+class RowCounts:
+    """
+    Row counts for pagination metadata.
+
+    Exact counts are cached per (table, condition, bind variables) for
+    COUNT_CACHE_TTL_SECONDS. Every INSERT, UPDATE (soft deletes included),
+    DELETE or REPLACE run through Connection bumps the generation of its
+    table, which makes the cached counts of that table unreachable at once;
+    inside a transaction the table is bumped again after the commit. Writes
+    made by other processes or outside Connection are only seen once the TTL
+    runs out.
+
+    With approximate=True the count is the optimizer's estimate instead of a
+    scan: TABLE_ROWS from information_schema without a condition, otherwise
+    the rows EXPLAIN expects to examine (an upper bound of the filtered count).
+    """
+
+    cache = TTLCache(
+        name="row_counts",
+        max_size=app.Config.COUNT_CACHE_SIZE,
+        ttl_seconds=app.Config.COUNT_CACHE_TTL_SECONDS,
+    )
+
+    _generations = {}
+    _lock = threading.Lock()
+    _installed = False
+
+    _write_target = re.compile(
+        r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM)\s+([`\w.$]+)",
+        re.I
+    )
+
+    @staticmethod
+    def install():
+        """Registers the invalidation hook on Connection (idempotent)."""
+        from application.mysql_connection import Connection
+
+        if RowCounts._installed:
+            return
+        with RowCounts._lock:
+            if not RowCounts._installed:
+                Connection.register_query_hook(RowCounts._on_query)
+                RowCounts._installed = True
+
+    @staticmethod
+    def count(db_connection, table_name, condition=None, bind_variables=(), approximate=False):
+        """
+        Number of rows of `table_name` matching `condition`.
+
+        Args:
+            db_connection (Connection): Connection used on a cache miss.
+            table_name (str): Table to count, as written in queries ("`users`").
+            condition (str, optional): WHERE clause with %s markers.
+            bind_variables (tuple, optional): Values of the markers.
+            approximate (bool, optional): Return the optimizer's estimate instead of an exact count.
+        """
+        RowCounts.install()
+        table = RowCounts._table_key(table_name)
+        bind_variables = tuple(bind_variables or ())
+        key = (table, RowCounts._generations.get(table, 0), condition, bind_variables, approximate)
+
+        def load():
+            if approximate:
+                return RowCounts._estimate(db_connection, table_name, condition, bind_variables)
+            where = f" WHERE {condition}" if condition else ""
+            result = db_connection.execute_raw(f"SELECT COUNT(*) AS total FROM {table_name}{where}",
+                                               bind_variables)
+            return result[0]["total"] if result else 0
+
+        return RowCounts.cache.get_or_load(key, load)
+
+    @staticmethod
+    def invalidate(table_name):
+        """Drops the cached counts of `table_name`."""
+        table = RowCounts._table_key(table_name)
+        with RowCounts._lock:
+            RowCounts._generations[table] = RowCounts._generations.get(table, 0) + 1
+
+    @staticmethod
+    def _estimate(db_connection, table_name, condition, bind_variables):
+        if not condition:
+            result = db_connection.execute_raw(
+                "SELECT TABLE_ROWS AS total FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (RowCounts._table_key(table_name),)
+            )
+            return int(result[0]["total"] or 0) if result else 0
+
+        plan = db_connection.execute_raw(f"EXPLAIN SELECT 1 FROM {table_name} WHERE {condition}", bind_variables)
+        return int(plan[0].get("rows") or 0) if plan else 0
+
+    @staticmethod
+    def _on_query(event):
+        """Query hook: invalidates the table written by a successful statement."""
+        from application.mysql_connection import Connection
+
+        if event["error"] is not None:
+            return
+        match = RowCounts._write_target.match(event["query"])
+        if match is None:
+            return
+
+        table = match.group(1)
+        RowCounts.invalidate(table)
+        tx = Connection.current_transaction()
+        if tx is not None:
+            # A count read before the commit would cache the old total again
+            tx.after_commit(lambda: RowCounts.invalidate(table))
+
+    @staticmethod
+    def _table_key(table_name):
+        # "`db`.`users`", "db.users" and "users" are the same table here
+        return table_name.replace("`", "").strip().lower().rsplit(".", 1)[-1]
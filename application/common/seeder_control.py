@@ -2,6 +2,7 @@ import hashlib
 import json
 from application.common.general import General
 from application import mysql_connection as db
+from application.models.auth.permissions import Permissions
 from werkzeug.security import generate_password_hash
 import logging
 
@@ -115,6 +116,30 @@ class SeedController:
                         "description": "يمكن للمستخدم الذي يمتلك هذا الإذن من اضافة خدمة مضافة",
                         "system_code": "6613"
                     },
+                    {
+                        "name": "export-form_data",
+                        "display_name": "تصدير بيانات النماذج",
+                        "description": "يمكن للمستخدم الذي يمتلك هذا الإذن تصدير بيانات النماذج.",
+                        "system_code": "6613"
+                    },
+                    {
+                        "name": "export-workflow_instances",
+                        "display_name": "تصدير حالات سير العمل",
+                        "description": "يمكن للمستخدم الذي يمتلك هذا الإذن تصدير حالات سير العمل.",
+                        "system_code": "6613"
+                    },
+                    {
+                        "name": "view-metrics",
+                        "display_name": "عرض مقاييس الأداء",
+                        "description": "يمكن للمستخدم الذي يمتلك هذا الإذن عرض إحصائيات الاستعلامات والاتصالات الخارجية.",
+                        "system_code": "6613"
+                    },
+                    {
+                        "name": "delete-metrics",
+                        "display_name": "إعادة ضبط مقاييس الأداء",
+                        "description": "يمكن للمستخدم الذي يمتلك هذا الإذن إعادة ضبط إحصائيات الأداء.",
+                        "system_code": "6613"
+                    },
                     # ... other permission entries
                 ],
             }
@@ -169,6 +194,9 @@ class SeedController:
                 except Exception as e:
                     logger.error(f"Error executing SQL: {sql}. Error: {e}")
 
+            # Role grants changed underneath the permission cache
+            Permissions.invalidate_role_permissions()
+
             return {
                 "success": True,
                 "added": added,
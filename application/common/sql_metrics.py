@@ -0,0 +1,187 @@
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+import config as app
+from application.common.general import General
+from application.common.event_logger import EventLogger
+
+
+class SqlMetrics:
+    """
+    In-process statistics for every statement run through Connection.
+
+    Statements are grouped by a normalized fingerprint (literals, bind
+    markers and IN/VALUES lists collapsed) and each group keeps call counts,
+    timings, a latency histogram and the model methods that issued it.
+    Statements slower than Config.SLOW_QUERY_THRESHOLD_MS are also written to
+    the dedicated slow-query log.
+    """
+
+    # Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    _lock = threading.Lock()
+    _stats = {}
+    _installed = False
+
+    _comments = re.compile(r"(--[^\n]*|/\*.*?\*/)", re.S)
+    _strings = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+    _numbers = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?(?![\w`])")
+    _markers = re.compile(r"%s|%\(\w+\)s")
+    _lists = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+    _rows = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+    _spaces = re.compile(r"\s+")
+
+    # Frames from these modules are plumbing, not the caller we want to report
+    _internal_modules = ("application.mysql_connection", "application.common.sql_metrics", "contextlib")
+
+    @staticmethod
+    def install():
+        """Registers the metrics hook on Connection (idempotent)."""
+        from application.mysql_connection import Connection
+
+        if SqlMetrics._installed:
+            return
+        Connection.register_query_hook(SqlMetrics.record)
+        SqlMetrics._installed = True
+
+    @staticmethod
+    def fingerprint(query):
+        """Normalizes a statement so calls differing only in values share one entry."""
+        sql = SqlMetrics._comments.sub(" ", query)
+        sql = SqlMetrics._strings.sub("?", sql)
+        sql = SqlMetrics._markers.sub("?", sql)
+        sql = SqlMetrics._numbers.sub("?", sql)
+        sql = SqlMetrics._lists.sub("(...)", sql)
+        sql = SqlMetrics._rows.sub("(...)", sql)
+        return SqlMetrics._spaces.sub(" ", sql).strip().rstrip(";").strip()
+
+    @staticmethod
+    def record(event):
+        """Query hook: folds one statement into the per-fingerprint statistics."""
+        query = event["query"]
+        fingerprint = SqlMetrics.fingerprint(query)
+        total_ms = event["connect_ms"] + event["execute_ms"]
+        caller = SqlMetrics._caller()
+        bind_count = SqlMetrics._bind_count(event["bind_variables"], event.get("is_bulk_insert"))
+        rows = event["rows"] or 0
+
+        with SqlMetrics._lock:
+            stats = SqlMetrics._stats.get(fingerprint)
+            if stats is None:
+                if len(SqlMetrics._stats) >= app.Config.SQL_METRICS_MAX_FINGERPRINTS:
+                    fingerprint = "<other>"
+                    stats = SqlMetrics._stats.get(fingerprint)
+                if stats is None:
+                    stats = SqlMetrics._stats[fingerprint] = SqlMetrics._new_stats(fingerprint)
+
+            stats["calls"] += 1
+            stats["errors"] += 1 if event["error"] is not None else 0
+            stats["total_ms"] += total_ms
+            stats["connect_ms"] += event["connect_ms"]
+            stats["execute_ms"] += event["execute_ms"]
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            stats["rows"] += rows
+            stats["bind_count"] = bind_count
+            stats["histogram"][SqlMetrics._bucket(total_ms)] += 1
+            stats["callers"][caller] += 1
+
+        if total_ms >= app.Config.SLOW_QUERY_THRESHOLD_MS:
+            SqlMetrics._write_slow_query(fingerprint, bind_count, rows, event, caller)
+
+    @staticmethod
+    def top(limit=20, order_by="total_ms"):
+        """Returns the `limit` statements with the highest `order_by` value."""
+        with SqlMetrics._lock:
+            snapshot = [SqlMetrics._export(stats) for stats in SqlMetrics._stats.values()]
+
+        snapshot.sort(key=lambda item: item.get(order_by) or 0, reverse=True)
+        return snapshot[:limit]
+
+    @staticmethod
+    def reset():
+        """Clears all collected statistics."""
+        with SqlMetrics._lock:
+            SqlMetrics._stats = {}
+
+    @staticmethod
+    def _new_stats(fingerprint):
+        return {
+            "fingerprint": fingerprint,
+            "calls": 0,
+            "errors": 0,
+            "total_ms": 0.0,
+            "connect_ms": 0.0,
+            "execute_ms": 0.0,
+            "max_ms": 0.0,
+            "rows": 0,
+            "bind_count": 0,
+            "histogram": [0] * (len(SqlMetrics.BUCKETS_MS) + 1),
+            "callers": Counter(),
+        }
+
+    @staticmethod
+    def _export(stats):
+        calls = stats["calls"] or 1
+        labels = [f"<={bound}ms" for bound in SqlMetrics.BUCKETS_MS] + [f">{SqlMetrics.BUCKETS_MS[-1]}ms"]
+        return {
+            "fingerprint": stats["fingerprint"],
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "total_ms": round(stats["total_ms"], 3),
+            "avg_ms": round(stats["total_ms"] / calls, 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "avg_connect_ms": round(stats["connect_ms"] / calls, 3),
+            "avg_execute_ms": round(stats["execute_ms"] / calls, 3),
+            "rows": stats["rows"],
+            "avg_rows": round(stats["rows"] / calls, 2),
+            "bind_count": stats["bind_count"],
+            "histogram": {label: count for label, count in zip(labels, stats["histogram"]) if count},
+            "callers": dict(stats["callers"].most_common(5)),
+        }
+
+    @staticmethod
+    def _bucket(total_ms):
+        for index, bound in enumerate(SqlMetrics.BUCKETS_MS):
+            if total_ms <= bound:
+                return index
+        return len(SqlMetrics.BUCKETS_MS)
+
+    @staticmethod
+    def _bind_count(bind_variables, is_bulk_insert=False):
+        if not bind_variables:
+            return 0
+        if is_bulk_insert:
+            return sum(len(row) for row in bind_variables)
+        return len(bind_variables)
+
+    @staticmethod
+    def _caller():
+        """Returns `module:Class.method` of the first frame outside the database layer."""
+        frame = sys._getframe(1)
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if not module.startswith(SqlMetrics._internal_modules):
+                code = frame.f_code
+                return f"{module.rsplit('.', 1)[-1]}:{getattr(code, 'co_qualname', code.co_name)}"
+            frame = frame.f_back
+        return "<unknown>"
+
+    @staticmethod
+    def _write_slow_query(fingerprint, bind_count, rows, event, caller):
+        time_date = datetime.now()
+        if app.Config.EVENT_LOG_FORMAT == "json":
+            data = General.format_event(
+                "slow query", "WARNING", time_date,
+                total_ms=round(event["connect_ms"] + event["execute_ms"], 3),
+                connect_ms=round(event["connect_ms"], 3),
+                execute_ms=round(event["execute_ms"], 3),
+                rows=rows, binds=bind_count, caller=caller, fingerprint=fingerprint,
+            )
+        else:
+            data = (f'{time_date} -- SLOW -- {event["connect_ms"] + event["execute_ms"]:.1f}ms '
+                    f'(connect {event["connect_ms"]:.1f}ms, execute {event["execute_ms"]:.1f}ms) '
+                    f'-- rows {rows} -- binds {bind_count} -- caller {caller} -- {fingerprint} --\n ')
+        EventLogger.log(General.log_file_name("bpm-service-slow-query", time_date), data, "WARNING")
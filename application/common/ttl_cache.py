@@ -0,0 +1,127 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after `ttl_seconds`.
+
+    Every instance is registered by name so its hit/miss counters can be
+    reported through TTLCache.all_stats().
+
+    Loads that race with an invalidation must not put the old value back:
+    take generation(key) before reading the source and store the result with
+    set_if_generation(), which skips it when the key was invalidated (or the
+    cache cleared) in between. get_or_load() does this for you.
+    """
+
+    _registry = weakref.WeakValueDictionary()
+    _MISSING = object()
+
+    def __init__(self, name, max_size, ttl_seconds):
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1.")
+
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidation counters; bumping the epoch outdates every key at once
+        self._generations = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        TTLCache._registry[name] = self
+
+    def get(self, key, default=None):
+        """Returns the cached value, or `default` when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl_seconds=None):
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def generation(self, key):
+        """Token for set_if_generation(); it changes whenever `key` is invalidated or the cache is cleared."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set_if_generation(self, key, value, generation, ttl_seconds=None):
+        """Caches `value` unless `key` was invalidated since `generation` was taken; True when it was cached."""
+        with self._lock:
+            if (self._epoch, self._generations.get(key, 0)) != generation:
+                return False
+            self._store(key, value, ttl_seconds)
+            return True
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for `key`, calling `loader()` on a miss.
+        The loaded value is only cached when it is not None and `key` was not
+        invalidated while it loaded.
+        """
+        value = self.get(key, TTLCache._MISSING)
+        if value is not TTLCache._MISSING:
+            return value
+
+        generation = self.generation(key)
+        value = loader()
+        if value is not None:
+            self.set_if_generation(key, value, generation)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if key not in self._generations and len(self._generations) >= self.max_size:
+                # Keeps the counters bounded; the new epoch outdates the forgotten ones
+                self._generations.clear()
+                self._epoch += 1
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def _store(self, key, value, ttl_seconds):
+        """Inserts an entry; the caller holds the lock."""
+        self._entries[key] = (value, time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    @staticmethod
+    def all_stats():
+        """Returns the counters of every live cache, by name."""
+        return {name: cache.stats() for name, cache in list(TTLCache._registry.items())}
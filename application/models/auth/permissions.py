@@ -1,7 +1,18 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
+from application.common.ttl_cache import TTLCache
+import config as app
 
 class Permissions:
+    # Compiled permissions per role: (permission rows, frozenset of names)
+    role_permission_cache = TTLCache(
+        name="role_permissions",
+        max_size=app.Config.ROLE_PERMISSION_CACHE_SIZE,
+        ttl_seconds=app.Config.ROLE_PERMISSION_CACHE_TTL_SECONDS,
+    )
+
     def __init__(self):
         self.db_connection = Connection()
         
@@ -81,13 +92,22 @@ class Permissions:
     """
     Function to get list of user using paginations
     """         
-    def list_permissions(self, page=1, page_size=10):
+    def list_permissions(self, page=1, page_size=10, keyset=None, approximate=False):
         """
         Retrieve user with pagination.
         :param page: The page number (1-based index).
         :param page_size: The number of items per page.
+        :param keyset: Keyset parameters from Pagination.from_args; pages on the id instead of OFFSET when given.
+        :param approximate: Report the estimated total of RowCounts instead of an exact count.
         """
         try:
+            if keyset is not None:
+                return Pagination.keyset_page(self.db_connection, columns="*",
+                                              from_where="FROM permissions WHERE is_deleted = %s",
+                                              bind_variables=(0,), key="id", keyset=keyset, page_size=page_size,
+                                              count_table="`permissions`", count_condition="is_deleted = %s",
+                                              count_bind_variables=(0,), approximate=approximate)
+
             # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
 
@@ -103,14 +123,8 @@ class Permissions:
                 return {"error": "No permissions found."}
 
             # Fetch total count of roles for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = self.db_connection.select(
-                table_name="`permissions`",
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(self.db_connection, "`permissions`", "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -119,7 +133,8 @@ class Permissions:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
         except Exception as e:
@@ -139,6 +154,9 @@ class Permissions:
                 debug=True
             )
 
+            # Any role may have held the permission
+            Permissions.invalidate_role_permissions()
+
             if is_update != 0:
                 return {"error": "Failed to delete role."}
 
@@ -154,21 +172,46 @@ class Permissions:
             return {"error": "Role ID is required."}
 
         try:
-            # Fetch permissions details
-            query = """ 
-                SELECT DISTINCT p.* 
-                FROM permissions p
-                INNER JOIN permission_role pr ON p.id = pr.permission_id
-                WHERE pr.role_id = %s;
-            """
-            permissions = self.db_connection.execute_raw(query=query, bind_variables=(role_id,))
+            rows, _ = self._compiled_role_permissions(role_id)
 
-            if not permissions:
+            if not rows:
                 return {"error": "Permission not found."}
 
-            return permissions
+            return [dict(row) for row in rows]
 
         except Exception as e:
             error_message = f"Error retrieving role: {str(e)}"
             General.write_event(error_message)  # Log error for debugging
-            return {"error": error_message}
\ No newline at end of file
+            return {"error": error_message}
+
+    def get_role_permission_names(self, role_id):
+        """Returns the names of the permissions granted to a role as a frozenset."""
+        if not role_id:
+            return frozenset()
+        return self._compiled_role_permissions(role_id)[1]
+
+    def has_permission(self, role_id, name):
+        """O(1) check against the cached permission set of the role."""
+        return name in self.get_role_permission_names(role_id)
+
+    @staticmethod
+    def invalidate_role_permissions(role_id=None):
+        """Drops the cached permissions of one role, or of every role when role_id is None."""
+        if role_id is None:
+            Permissions.role_permission_cache.clear()
+        else:
+            Permissions.role_permission_cache.invalidate(role_id)
+
+    def _compiled_role_permissions(self, role_id):
+        """Loads the permissions of a role once and caches them until invalidated or expired."""
+        def load():
+            query = """ 
+                SELECT DISTINCT p.* 
+                FROM permissions p
+                INNER JOIN permission_role pr ON p.id = pr.permission_id
+                WHERE pr.role_id = %s AND p.is_deleted = %s;
+            """
+            rows = self.db_connection.execute_raw(query=query, bind_variables=(role_id, 0)) or []
+            return tuple(rows), frozenset(row["name"] for row in rows)
+
+        return Permissions.role_permission_cache.get_or_load(role_id, load)
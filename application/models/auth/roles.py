@@ -1,5 +1,8 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
+from application.models.auth.permissions import Permissions
 
 class Roles:
     def __init__(self):
@@ -34,45 +37,37 @@ class Roles:
                 "description": description,
             }
 
-            # Start a transaction (if supported)
-            # self.db_connection.start_transaction()
-
-            # Insert the role into the database
-            role_id = self.db_connection.create("`roles`", role_data)
-
-            if not role_id:
-                # self.db_connection.rollback()  # Rollback in case of failure
-                General.write_event("Failed to create the role.")
-                return {"error": "Failed to create the role."}
-
-            # Associate permissions with the role
-            if permissions:
-                try:
-                    print(permissions)
-                    # Ensure all permissions are valid integers
-                    
-                    permission_data = [{"permission_id": int(permission), "role_id": role_id} for permission in permissions]
-                    print(permission_data)
-                    # Bulk insert permissions into `permission_role` table
-                    insert_count = self.db_connection.create_many("permission_role", permission_data)
-                    
-
-                    if insert_count != len(permission_data):
-                        General.write_event("Some permissions failed to insert.")
-                        raise Exception("Some permissions failed to insert.")
-
-                except Exception as perm_error:
-                    # self.db_connection.rollback()  # Rollback the transaction
-                    General.write_event(f"Failed to associate permissions: {str(perm_error)}")
-                    return {"error": f"Failed to associate permissions: {str(perm_error)}"}
-
-            # Commit transaction if everything is successful
-            # self.db_connection.commit()
-
+            # The role and its permission rows are committed together
+            with Connection.transaction() as tx:
+                # Insert the role into the database
+                role_id = self.db_connection.create("`roles`", role_data)
+
+                if not role_id:
+                    tx.rollback_only()  # Rollback in case of failure
+                    General.write_event("Failed to create the role.")
+                    return {"error": "Failed to create the role."}
+
+                # Associate permissions with the role
+                if permissions:
+                    try:
+                        # Ensure all permissions are valid integers
+                        permission_data = [{"permission_id": int(permission), "role_id": role_id} for permission in permissions]
+                        # Bulk insert permissions into `permission_role` table
+                        insert_count = self.db_connection.create_many("permission_role", permission_data)
+
+                        if insert_count != len(permission_data):
+                            General.write_event("Some permissions failed to insert.")
+                            raise Exception("Some permissions failed to insert.")
+
+                    except Exception as perm_error:
+                        tx.rollback_only()  # Rollback the transaction
+                        General.write_event(f"Failed to associate permissions: {str(perm_error)}")
+                        return {"error": f"Failed to associate permissions: {str(perm_error)}"}
+
+            Permissions.invalidate_role_permissions(role_id)
             return {"role_id": role_id}
 
         except Exception as e:
-            # self.db_connection.rollback()  # Ensure rollback on error
             General.write_event(f"Error creating role: {str(e)}")
             return {"error": f"Error creating role: {str(e)}"}
 
@@ -120,13 +115,22 @@ class Roles:
     """
     Function to get list of user using paginations
     """         
-    def list_roles(self, page=1, page_size=10):
+    def list_roles(self, page=1, page_size=10, keyset=None, approximate=False):
         """
         Retrieve user with pagination.
         :param page: The page number (1-based index).
         :param page_size: The number of items per page.
+        :param keyset: Keyset parameters from Pagination.from_args; pages on the id instead of OFFSET when given.
+        :param approximate: Report the estimated total of RowCounts instead of an exact count.
         """
         try:
+            if keyset is not None:
+                return Pagination.keyset_page(self.db_connection, columns="*",
+                                              from_where="FROM roles WHERE is_deleted = %s",
+                                              bind_variables=(0,), key="id", keyset=keyset, page_size=page_size,
+                                              count_table="`roles`", count_condition="is_deleted = %s",
+                                              count_bind_variables=(0,), approximate=approximate)
+
             # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
 
@@ -142,14 +146,8 @@ class Roles:
                 return {"error": "No roles found."}
 
             # Fetch total count of roles for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = self.db_connection.select(
-                table_name="`roles`",
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(self.db_connection, "`roles`", "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -158,7 +156,8 @@ class Roles:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
         except Exception as e:
@@ -177,6 +176,8 @@ class Roles:
                 update_data={"is_deleted": True}
             )
 
+            Permissions.invalidate_role_permissions(role_id)
+
             if is_update != 0:
                 return {"error": "Failed to delete role."}
 
@@ -1,7 +1,18 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
+from application.common.ttl_cache import TTLCache
+import config as app
 
 class Users:
+    # Rows of get_user_by_id kept for token_required; see get_user_context
+    user_context_cache = TTLCache(
+        name="user_context",
+        max_size=app.Config.USER_CONTEXT_CACHE_SIZE,
+        ttl_seconds=app.Config.USER_CONTEXT_CACHE_TTL_SECONDS,
+    )
+
     def __init__(self):
         self.db_connection = Connection()
         
@@ -109,17 +120,57 @@ class Users:
             return result[0]
         except Exception as e:
             return {"error": f"Error retrieving user: {str(e)}" ,"success": False}
+
+    def get_user_context(self, user_id):
+        """
+        Same as get_user_by_id, served from a short-lived cache.
+
+        Only found users are cached. Entries are dropped when the user is
+        updated or deleted through this class; changes made elsewhere are
+        picked up once USER_CONTEXT_CACHE_TTL_SECONDS expire.
+        """
+        def load():
+            user = self.get_user_by_id(user_id)
+            return None if "error" in user else user
+
+        user = Users.user_context_cache.get_or_load(user_id, load)
+        if user is None:
+            return {"error": "User not found." ,"success": False}
+        # Callers get their own copy so they cannot alter the cached row
+        return dict(user)
+
+    @staticmethod
+    def invalidate_user_context(user_id):
+        """Drops the cached context of a user after it changed."""
+        Users.user_context_cache.invalidate(user_id)
         
     """
     Function to get list of user using paginations
     """         
-    def list_users(self, page=1, page_size=10):
+    def list_users(self, page=1, page_size=10, keyset=None, approximate=False):
         """
         Retrieve user with pagination.
         :param page: The page number (1-based index).
         :param page_size: The number of items per page.
+        :param keyset: Keyset parameters from Pagination.from_args; pages on the user id instead of OFFSET when given.
+        :param approximate: Report the estimated total of RowCounts instead of an exact count.
         """
         try:
+            if keyset is not None:
+                return Pagination.keyset_page(
+                    self.db_connection,
+                    columns=("u.id,u.full_name,u.username,u.status,u.creation_date,u.role as role_id,"
+                             "r.name as role_name,u.`group` as group_id,g.group_name,u.`level` as level_id, "
+                             "l.name as level_name"),
+                    from_where=("FROM dynamic_workflows_db.users u "
+                                "LEFT JOIN `groups` g ON g.group_id = u.`group` "
+                                "LEFT JOIN roles r ON r.id = u.role "
+                                "LEFT JOIN group_level l ON l.id = u.`level` "
+                                "WHERE u.is_deleted = %s"),
+                    bind_variables=(0,), key="u.id", keyset=keyset, page_size=page_size,
+                    count_table="`users`", count_condition="is_deleted = %s", count_bind_variables=(0,),
+                    approximate=approximate)
+
             # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
 
@@ -142,14 +193,8 @@ class Users:
                 return {"error": "No users found." ,"success": False}
 
             # Fetch total count of users for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = self.db_connection.select(
-                table_name="`users`",
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(self.db_connection, "`users`", "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -158,7 +203,8 @@ class Users:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
         except Exception as e:
@@ -187,6 +233,8 @@ class Users:
                 update_data=update_data
             )
 
+            Users.invalidate_user_context(user_id)
+
             if is_update != 0:
                 return {"error": "Failed to update user data." ,"success": False}
 
@@ -207,6 +255,8 @@ class Users:
                 update_data={"is_deleted": True}
             )
 
+            Users.invalidate_user_context(user_id)
+
             if is_update != 0:
                 return {"error": "Failed to delete user." ,"success": False}
 
@@ -215,7 +265,7 @@ class Users:
             return {"error": f"Error while deleting user: {str(e)}" ,"success": False}
         
 
-    def update_user_password(user_id, new_password):
+    def update_user_password(self, user_id, new_password):
         """
         Change the password for a user.
         """
@@ -234,6 +284,8 @@ class Users:
                 update_data={"password": new_password}
             )
 
+            Users.invalidate_user_context(user_id)
+
             if is_update != 0:
                 return {"error": "Failed to update the user password." ,"success": False}
 
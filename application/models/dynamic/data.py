@@ -1,4 +1,5 @@
 from application.mysql_connection import Connection 
+from application.models.dynamic.forms import Forms
 from ...common.general import General
 import json
 import logging
@@ -92,6 +93,47 @@ class Data:
             return {"error": str(e), "message": "An error occurred while fetching data"}
 
 
+    @staticmethod
+    def export_form_data(table_name, columns=None, batch_size=None, as_tuples=False):
+        """
+        Stream every row of a dynamic `ts_*` form table.
+
+        Only tables registered in `forms` can be exported, and only `id` and
+        the columns of the form's fields. Returns a generator (rows are read in
+        batches, never materialized) or an error dict. The query has already
+        run when the generator is returned; it holds a pooled connection until
+        it is exhausted or closed.
+        """
+        if not table_name:
+            return {"error": "Table name is required."}
+
+        try:
+            db_connection = Connection()
+            form = db_connection.select_one(table_name='forms',
+                                            columns=['id', 'table_name'],
+                                            condition='table_name = %s',
+                                            bind_variables=(table_name,))
+            if not form:
+                return {"error": "Invalid table name"}
+
+            if columns:
+                fields = db_connection.select(table_name='form_fields', columns=['name'],
+                                              condition='form_id = %s', bind_variables=(form['id'],)) or []
+                allowed = {"id", *(Forms.column_name(field['name']) for field in fields)}
+                unknown = [col for col in columns if not isinstance(col, str) or col not in allowed]
+                if unknown:
+                    return {"error": f"Unknown columns: {', '.join(map(str, unknown))}"}
+
+            columns = [f"`{col}`" for col in columns] if columns else None
+            return db_connection.select_iter(table_name=f"`{form['table_name']}`",
+                                             columns=columns,
+                                             batch_size=batch_size,
+                                             as_tuples=as_tuples,
+                                             eager=True)
+        except Exception as e:
+            General.write_event(f"Error exporting data from {table_name}: {e}")
+            return {"error": str(e)}
+
     # Fetching all columns and all rows from 'form_customer_feedback'
     # result = fetch_form_data("form_customer_feedback")
     # print(result)
@@ -24,8 +24,6 @@ class Forms:
         """
         try:
             db_connection = Connection()
-            db = db_connection._connect()
-            cursor = db.cursor()
 
             # Create a safe table name
             table_name = f"ts_{form_name.strip().lower().replace(' ', '_')}"
@@ -33,19 +31,13 @@ class Forms:
                 raise ValueError("Invalid form name for table creation.")
 
             # Insert metadata
-            cursor.execute(
-                '''
-                INSERT INTO forms (task_id, form_name, table_name, description)
-                VALUES (%s, %s, %s, %s)
-                ''',
-                (task_id, form_name, table_name, description)
-            )
+            form_id = db_connection.create("forms", {
+                "task_id": task_id,
+                "form_name": form_name,
+                "table_name": table_name,
+                "description": description,
+            })
 
-            form_id = cursor.lastrowid
-
-            db.commit()
-            cursor.close()
-            db.close()
             return form_id
 
         except Exception as e:
@@ -77,31 +69,27 @@ class Forms:
     @staticmethod
     def create_form_fields(form_id, fields):
         try:
+            if not fields:
+                return True
+
             db_connection = Connection()
-            db = db_connection._connect()
-            cursor = db.cursor()
 
-            # Insert form fields
-            for field in fields:
-                label = field['label']
-                name = field['name']
-                placeholder = field['placeholder']
-                field_type = field['field_type']
-                options = json.dumps(field.get('options', None))  # Convert options to JSON if available
-                # description = field['description']
-                required = field['required']
-                enabled = field['enabled']
-                cursor.execute(
-                    'INSERT INTO form_fields (form_id, label, name, placeholder, field_type, '
-                    'options, required, enabled) '
-                    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
-                    (form_id, label, name, placeholder, field_type, options, required, enabled)
-                )
+            # Insert all form fields in one statement
+            rows = [{
+                "form_id": form_id,
+                "label": field['label'],
+                "name": field['name'],
+                "placeholder": field['placeholder'],
+                "field_type": field['field_type'],
+                "options": json.dumps(field.get('options', None)),  # Convert options to JSON if available
+                "required": field['required'],
+                "enabled": field['enabled'],
+            } for field in fields]
+
+            result = db_connection.create_many("form_fields", rows)
+            if isinstance(result, dict):  # Check if error occurred
+                return result
 
-            # Commit and close DB connection
-            db.commit()
-            cursor.close()
-            db.close()
             return True
         except Exception as e:
             return {"error": str(e)}
@@ -228,26 +216,12 @@ class Forms:
             cursor = db.cursor()
 
             # Create table based on form name
-            table_name = f"ts_{form_name.lower().replace(' ', '_')}"
+            table_name = Forms.dynamic_table_name(form_name)
             columns = ["id INT PRIMARY KEY AUTO_INCREMENT"]
 
             # Generate columns based on fields
             for field in fields:
-                name = field['name'].replace(' ', '_').lower()
-                field_type = field['type']
-
-                if field_type == 'text':
-                    columns.append(f"{name} VARCHAR(255)")
-                elif field_type == 'number':
-                    columns.append(f"{name} INT")
-                elif field_type == 'date':
-                    columns.append(f"{name} DATE")
-                elif field_type in ['dropdown', 'multi_select']:
-                    columns.append(f"{name} JSON")  # Store options as JSON
-                elif field_type == 'file':
-                    columns.append(f"{name} TEXT")  # Store file paths or metadata
-                else:
-                    columns.append(f"{name} TEXT")  # Default fallback
+                columns.append(Forms.column_definition(field))
 
             # Build and execute the CREATE TABLE query
             query = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(columns)});"
@@ -262,27 +236,128 @@ class Forms:
             return {"error": str(e)}
 
     @staticmethod
-    def create_form_with_fields(task_id, form_name, description, fields):
+    def dynamic_table_name(form_name):
+        """Name of the ts_* table holding the responses of a form."""
+        return f"ts_{form_name.lower().replace(' ', '_')}"
+
+    @staticmethod
+    def column_name(field_name):
+        """Column of a form field in its ts_* table."""
+        return field_name.replace(' ', '_').lower()
+
+    @staticmethod
+    def column_definition(field):
+        """Column name and SQL type of a form field in its ts_* table."""
+        name = Forms.column_name(field['name'])
+        field_type = field['type']
+
+        if field_type == 'text':
+            return f"{name} VARCHAR(255)"
+        elif field_type == 'number':
+            return f"{name} INT"
+        elif field_type == 'date':
+            return f"{name} DATE"
+        elif field_type in ['dropdown', 'multi_select']:
+            return f"{name} JSON"  # Store options as JSON
+        elif field_type == 'file':
+            return f"{name} TEXT"  # Store file paths or metadata
+        else:
+            return f"{name} TEXT"  # Default fallback
+
+    @staticmethod
+    def alter_dynamic_table(table_name, fields):
+        """
+        Adds the columns of new fields and retypes existing ones in a single
+        ALTER TABLE. Columns that already exist are modified instead of added,
+        so a repeated call is harmless.
+        """
+        if not fields:
+            return table_name
+
         try:
-            # Create form metadata
-            form_id = Forms.create_metadata(task_id, form_name, description)
-            if isinstance(form_id, dict):  # Check if error occurred
-                return form_id
+            db_connection = Connection()
+            db = db_connection._connect()
+            cursor = db.cursor()
 
-            # Insert fields metadata
-            result = Forms.create_form_fields(form_id, fields)
-            if isinstance(result, dict):  # Check if error occurred
-                return result
+            cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+            existing = {row[0].lower() for row in cursor.fetchall()}
+
+            changes = []
+            for field in fields:
+                definition = Forms.column_definition(field)
+                action = "MODIFY" if definition.split(' ', 1)[0] in existing else "ADD"
+                changes.append(f"{action} COLUMN {definition}")
+
+            cursor.execute(f"ALTER TABLE {table_name} {', '.join(changes)};")
+
+            db.commit()
+            cursor.close()
+            db.close()
+            return table_name
+        except Exception as e:
+            return {"error": str(e)}
 
-            # Create table for form responses
+    @staticmethod
+    def create_form_with_fields(task_id, form_name, description, fields):
+        try:
+            # DDL commits implicitly, so the response table is created before the
+            # transaction (as TemplateCompiler does) and dropped again when the
+            # metadata does not commit; a table that already existed is left alone
+            existed = Forms.dynamic_table_exists(form_name)
             table_name = Forms.create_dynamic_table(form_name, fields)
             if isinstance(table_name, dict):  # Check if error occurred
                 return table_name
 
+            committed = False
+            try:
+                # Metadata and fields are written in one transaction so a failure
+                # never leaves a form without its fields
+                with Connection.transaction() as tx:
+                    # Create form metadata
+                    form_id = Forms.create_metadata(task_id, form_name, description)
+                    if isinstance(form_id, dict):  # Check if error occurred
+                        tx.rollback_only()
+                        return form_id
+
+                    # Insert fields metadata
+                    result = Forms.create_form_fields(form_id, fields)
+                    if isinstance(result, dict):  # Check if error occurred
+                        tx.rollback_only()
+                        return result
+                committed = True
+            finally:
+                if not committed and not existed:
+                    Forms.drop_dynamic_table(table_name)
+
             return {"form_id": form_id, "table_name": table_name}
         except Exception as e:
             return {"error": str(e)}
 
+    @staticmethod
+    def dynamic_table_exists(form_name):
+        """True when the ts_* response table of `form_name` already exists."""
+        result = Connection().execute_raw(
+            "SELECT 1 AS found FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (Forms.dynamic_table_name(form_name),)
+        )
+        return bool(result)
+
+    @staticmethod
+    def drop_dynamic_table(table_name):
+        try:
+            db_connection = Connection()
+            db = db_connection._connect()
+            cursor = db.cursor()
+
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
+
+            cursor.close()
+            db.close()
+            return True
+        except Exception as e:
+            General.write_event(f"Error dropping form table {table_name}: {e}")
+            return {"error": str(e)}
+
     @staticmethod
     def add_new_field(table_name, field_name, field_type):
         try:
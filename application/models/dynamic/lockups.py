@@ -1,5 +1,9 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
+from application.common.lookup_cache import LookupCache
+import config as app
 import json
 
 class Lockups:
@@ -24,6 +28,7 @@ class Lockups:
             db.commit()
             cursor.close()
             db.close()
+            LookupCache.invalidate("lockups")
             return lockup_id
         except Exception as e:
             return {"error": str(e)}
@@ -113,8 +118,16 @@ class Lockups:
       
       
     @staticmethod
-    def get_lockups(page=1, page_size=10):
+    def get_lockups(page=1, page_size=10, keyset=None, approximate=False):
         try:
+            if keyset is not None:
+                # Keyset mode (see Pagination.from_args): pages on id instead of OFFSET
+                return Pagination.keyset_page(Connection(), columns="*",
+                                              from_where="FROM `lockups` WHERE is_deleted = %s",
+                                              bind_variables=(0,), key="id", keyset=keyset, page_size=page_size,
+                                              count_table="`lockups`", count_condition="is_deleted = %s",
+                                              count_bind_variables=(0,), approximate=approximate)
+
              # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
 
@@ -134,14 +147,8 @@ class Lockups:
                 return {"error": "No groups found."}
 
             # Fetch total count of groups for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = db_connection.select(
-                table_name="`lockups`",
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(db_connection, "`lockups`", "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -150,7 +157,8 @@ class Lockups:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
         except Exception as e:
@@ -171,6 +179,7 @@ class Lockups:
 
             if is_update != 0:
                 return {"error": "Failed to update lockup data."}
+            LookupCache.invalidate("lockups")
             return is_update
         except ValueError as ve:
             # Handle specific errors like invalid input
@@ -196,6 +205,7 @@ class Lockups:
 
             if is_update != 0:
                 return {"error": "Failed to delete lockup."}
+            LookupCache.invalidate("lockups", f"lockup:{id}")
             return is_update
         except ValueError as ve:
             # Handle specific errors like invalid input
@@ -215,12 +225,13 @@ class Lockups:
         
         try:
             db_connection = Connection()
-            result = db_connection.select_one(
+            # The whole lockups table is cached; every lookup read starts here
+            lockups = LookupCache.get("lockups", lambda: db_connection.select(
                 table_name='lockups',
-                condition='id = %s AND is_deleted = %s',
-                bind_variables=(lockup_id,0)
-            )
-            return result
+                condition='is_deleted = %s',
+                bind_variables=(0,)
+            ) or [])
+            return next((lockup for lockup in lockups if str(lockup["id"]) == str(lockup_id)), None)
         except ValueError as ve:
             # Handle specific errors like invalid input
             General.write_event(f"Invalid input: {ve}")
@@ -267,6 +278,9 @@ class Lockups:
                 cursor.close()
                 db.close()
 
+            # Written on a raw cursor, so the Connection hooks did not see it
+            LookupCache.invalidate(f"lockup:{lockup_id}")
+            RowCounts.invalidate(table_name)
             return {"success": True, "id": inserted_id}
 
         except Exception as e:
@@ -275,9 +289,11 @@ class Lockups:
         
         
     @staticmethod   
-    def get_lockup_table_data(lockup_id,page,page_size):
+    def get_lockup_table_data(lockup_id,page,page_size,keyset=None,approximate=False):
         """
         Retrieve a lockup's details by its ID.
+        With `keyset` (see Pagination.from_args) the rows are paged on id instead of OFFSET.
+        With `approximate` the total is the estimate of RowCounts instead of an exact count.
         """
         if not lockup_id:
             return {"error": "Lockup ID is required."}
@@ -292,6 +308,30 @@ class Lockups:
 
             table_name = lockup["table_name"]
             db_connection = Connection()
+
+            if keyset is None and not approximate:
+                offset = (page - 1) * page_size
+                rows, total_count = Lockups._lockup_table_slice(lockup_id, table_name, offset, offset + page_size)
+                if rows is not None:
+                    if not rows:
+                        return {"error": f"No data found for table: {table_name}"}
+                    return {
+                        "data": rows,
+                        "pagination": {
+                            "page": page,
+                            "page_size": page_size,
+                            "total_items": total_count,
+                            "total_pages": (total_count + page_size - 1) // page_size,
+                            "total_is_approximate": False
+                        }
+                    }
+
+            if keyset is not None:
+                return Pagination.keyset_page(db_connection, columns="*",
+                                              from_where=f"FROM {table_name} WHERE is_deleted = %s",
+                                              bind_variables=(0,), key="id", keyset=keyset, page_size=page_size,
+                                              count_table=table_name, count_condition="is_deleted = %s",
+                                              count_bind_variables=(0,), approximate=approximate)
             
              # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
@@ -311,14 +351,8 @@ class Lockups:
 
             # return {"success": True, "data": result}
             # Fetch total count of groups for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = db_connection.select(
-                table_name= table_name,
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(db_connection, table_name, "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -327,7 +361,8 @@ class Lockups:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
 
@@ -336,6 +371,72 @@ class Lockups:
             return {"error": f"Error retrieving lockup: {str(e)}"}
         
      
+    @staticmethod
+    def get_lockup_table_rows(lockup_id, table_name):
+        """
+        All rows of a lookup table that are not soft deleted, ordered by id, from LookupCache.
+        Returns None when the table has more than Config.LOOKUP_CACHE_MAX_ROWS rows and is not cached.
+        """
+        return Lockups._lockup_table_entry(lockup_id, table_name)[0]
+
+    @staticmethod
+    def _lockup_table_entry(lockup_id, table_name):
+        """(rows, etag) of a lookup table from LookupCache; (None, None) when it is too large to cache."""
+        return LookupCache.get_with_etag(f"lockup:{lockup_id}", Lockups._lockup_table_loader(table_name))
+
+    @staticmethod
+    def _lockup_table_slice(lockup_id, table_name, start, stop):
+        """(rows[start:stop], total) of a lookup table from LookupCache; (None, None) when it is too large to cache."""
+        return LookupCache.get_slice(f"lockup:{lockup_id}", Lockups._lockup_table_loader(table_name), start, stop)
+
+    @staticmethod
+    def _lockup_table_loader(table_name):
+        def load():
+            rows = Connection().execute_raw(
+                f"SELECT * FROM {table_name} WHERE is_deleted = %s ORDER BY id LIMIT %s",
+                (0, app.Config.LOOKUP_CACHE_MAX_ROWS + 1)
+            ) or []
+            return None if len(rows) > app.Config.LOOKUP_CACHE_MAX_ROWS else rows
+
+        return load
+
+    @staticmethod
+    def get_lockups_bulk(lockup_ids, known_etags=None):
+        """
+        Rows of several lookups in one call, each with the ETag of its content.
+
+        Lookups whose ETag is in `known_etags` ({lockup_id: etag}) are returned
+        with "not_modified": True and no rows. Lookups that do not exist or are
+        too large to cache carry an "error" instead.
+        """
+        if not lockup_ids:
+            return {"error": "lockup_ids is required.", "success": False}
+
+        known_etags = {str(lockup_id): etag for lockup_id, etag in (known_etags or {}).items()}
+        try:
+            results = []
+            for lockup_id in lockup_ids:
+                lockup = Lockups.get_lockup_info(lockup_id)
+                if not lockup or "table_name" not in lockup:
+                    results.append({"lockup_id": lockup_id, "error": "Lockup info not found or invalid."})
+                    continue
+
+                rows, etag = Lockups._lockup_table_entry(lockup["id"], lockup["table_name"])
+                entry = {"lockup_id": lockup_id, "name": lockup.get("name"),
+                         "display_name": lockup.get("display_name"), "etag": etag}
+                if rows is None:
+                    entry["error"] = "Lockup is too large for a bulk fetch; use the paginated data endpoint."
+                elif known_etags.get(str(lockup_id)) == etag:
+                    entry["not_modified"] = True
+                else:
+                    entry["data"] = rows
+                results.append(entry)
+
+            return {"success": True, "data": results}
+        except Exception as e:
+            General.write_event(f"Error in get_lockups_bulk: {e}")
+            return {"error": f"Error retrieving lockups: {str(e)}", "success": False}
+
     @staticmethod   
     def search_lockup_table_data(lockup_id,search_value):
         """
@@ -415,6 +516,8 @@ class Lockups:
                         General.write_event(f"No rows updated for lockup_id: {lockup_id}")
                         return {"error": "No rows updated" , "success" : False}
 
+                    LookupCache.invalidate(f"lockup:{lockup_id}")
+
                     # Return success response
                     return {"row_updated": cursor.rowcount ,"success" : True}
 
@@ -468,6 +571,9 @@ class Lockups:
                         General.write_event(f"No rows deleted for lockup_id: {lockup_id}")
                         return {"error": "No rows deleted"}
 
+                    LookupCache.invalidate(f"lockup:{lockup_id}")
+                    RowCounts.invalidate(table_name)
+
                     # Return success response
                     return {"success": True, "rows_deleted": cursor.rowcount}
 
@@ -1,5 +1,7 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
 
 class Groups:
     def __init__(self):
@@ -96,13 +98,23 @@ class Groups:
     """
     Function to get list of Group using paginations
     """         
-    def list_groups(self, page=1, page_size=10):
+    def list_groups(self, page=1, page_size=10, keyset=None, approximate=False):
         """
         Retrieve groups with pagination.
         :param page: The page number (1-based index).
         :param page_size: The number of items per page.
+        :param keyset: Keyset parameters from Pagination.from_args; pages on group_id instead of OFFSET when given.
+        :param approximate: Report the estimated total of RowCounts instead of an exact count.
         """
         try:
+            if keyset is not None:
+                return Pagination.keyset_page(self.db_connection, columns="*",
+                                              from_where="FROM `groups` WHERE is_deleted = %s",
+                                              bind_variables=(0,), key="group_id", keyset=keyset,
+                                              page_size=page_size, count_table="`groups`",
+                                              count_condition="is_deleted = %s", count_bind_variables=(0,),
+                                              approximate=approximate)
+
             # Zero means except soft deleted
             offset = (page - 1) * page_size  # Calculate the offset
 
@@ -121,14 +133,8 @@ class Groups:
                 return {"error": "No groups found."}
 
             # Fetch total count of groups for pagination metadata
-            total_count_condition = "is_deleted = %s"
-            total_count_results = self.db_connection.select(
-                table_name="`groups`",
-                columns=["COUNT(*) as total"],
-                condition=total_count_condition,
-                bind_variables=(0,)
-            )
-            total_count = total_count_results[0]["total"] if total_count_results else 0
+            total_count = RowCounts.count(self.db_connection, "`groups`", "is_deleted = %s", (0,),
+                                          approximate=approximate)
 
             # Prepare response with pagination metadata
             return {
@@ -137,7 +143,8 @@ class Groups:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 }
             }
         except Exception as e:
@@ -1,11 +1,16 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.common.lookup_cache import LookupCache
 
 
 class ActionTypes:
     def __init__(self):
         self.db_connection = Connection()
 
+    def _all_action_types(self):
+        """Every action_types row, served from LookupCache."""
+        return LookupCache.get("action_types", lambda: self.db_connection.select(table_name="`action_types`") or [])
+
     def create_action_type(self, name, color):
         """
         Create a new action type and return the ID.
@@ -24,6 +29,7 @@ class ActionTypes:
             if not action_type_id:
                 return {"error": "Failed to create action type."}
 
+            LookupCache.invalidate("action_types")
             return {"action_type_id": action_type_id}
         except Exception as e:
             return {"error": f"Error creating action type: {str(e)}"}
@@ -56,7 +62,7 @@ class ActionTypes:
         """
         try:
             """ Zero means except soft deleted """
-            results = self.db_connection.select(table_name="`action_types`")
+            results = self._all_action_types()
 
             if not results:
                 return {"error": "No data for action types found."}
@@ -74,8 +80,8 @@ class ActionTypes:
         Retrieve all action types enums.
         """
         try:
-            sql = "select name from action_types"
-            results = self.db_connection.execute_raw(query=sql)
+            # Served from the cached table instead of "select name from action_types"
+            results = [{"name": row["name"]} for row in self._all_action_types()]
 
             if not results:
                 return {"error": "No data for action types enums found."}
@@ -104,6 +110,7 @@ class ActionTypes:
             if is_update != 0:
                 return {"error": "Failed to update action type data."}
 
+            LookupCache.invalidate("action_types")
             return {"success": True, "message": "action type data updated successfully."}
         except Exception as e:
             return {"error": f"Error while updating data for action type: {str(e)}"}
@@ -1,11 +1,16 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.common.lookup_cache import LookupCache
 
 
 class FieldTypes:
     def __init__(self):
         self.db_connection = Connection()
 
+    def _all_field_types(self):
+        """Every filed_types row, served from LookupCache."""
+        return LookupCache.get("field_types", lambda: self.db_connection.select(table_name="`filed_types`") or [])
+
     def create_field_type(self, name):
         """
         Create a new action type and return the ID.
@@ -23,6 +28,7 @@ class FieldTypes:
             if not filed_type_id:
                 return {"error": "Failed to create filed type."}
 
+            LookupCache.invalidate("field_types")
             return {"filed_type_id": filed_type_id}
         except Exception as e:
             return {"error": f"Error creating filed type: {str(e)}"}
@@ -55,7 +61,7 @@ class FieldTypes:
         """
         try:
             """ Zero means except soft deleted """
-            results = self.db_connection.select(table_name="`filed_types`")
+            results = self._all_field_types()
 
             if not results:
                 return {"error": "No data for action types found."}
@@ -73,8 +79,8 @@ class FieldTypes:
         Retrieve all field types enums.
         """
         try:
-            sql = "select name from filed_types"
-            results = self.db_connection.execute_raw(query=sql)
+            # Served from the cached table instead of "select name from filed_types"
+            results = [{"name": row["name"]} for row in self._all_field_types()]
 
             if not results:
                 return {"error": "No data for field types enums found."}
@@ -103,6 +109,7 @@ class FieldTypes:
             if is_update != 0:
                 return {"error": "Failed to update action type data."}
 
+            LookupCache.invalidate("field_types")
             return {"success": True, "message": "action type data updated successfully."}
         except Exception as e:
             return {"error": f"Error while updating data for action type: {str(e)}"}
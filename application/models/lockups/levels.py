@@ -1,5 +1,6 @@
 from application.mysql_connection import Connection 
 from application.common.general import General
+from application.common.lookup_cache import LookupCache
 
 class Levels:
     def __init__(self):
@@ -23,6 +24,7 @@ class Levels:
             if not level_id:
                 return {"error": "Failed to create level."}
 
+            LookupCache.invalidate("group_level")
             return {"level_id": level_id}
         except Exception as e:
             return {"error": f"Error creating level: {str(e)}"}
@@ -56,7 +58,8 @@ class Levels:
         """
         try:
             """ Zero means except soft deleted """
-            results = self.db_connection.select(table_name="`group_level`",condition="is_deleted = %s ", bind_variables=(0,))
+            results = LookupCache.get("group_level", lambda: self.db_connection.select(
+                table_name="`group_level`", condition="is_deleted = %s ", bind_variables=(0,)) or [])
 
             if not results:
                 return {"error": "No grouplevel found."}
@@ -85,6 +88,7 @@ class Levels:
             if is_update != 0:
                 return {"error": "Failed to update group level data."}
 
+            LookupCache.invalidate("group_level")
             return {"success": True, "message": "Group level data updated successfully."}
         except Exception as e:
             return {"error": f"Error while updating data for group level: {str(e)}"}
@@ -106,6 +110,7 @@ class Levels:
             if is_update != 0:
                 return {"error": "Failed to delete group level."}
 
+            LookupCache.invalidate("group_level")
             return {"success": True, "message": "Group level deleted successfully."}
         except Exception as e:
             return {"error": f"Error while deleting group level: {str(e)}"}
@@ -0,0 +1,216 @@
+import json
+from application.mysql_connection import Connection
+from application.common.general import General
+from application.models.workflow.outbox import Outbox
+import config as app
+
+
+class ActionQueue:
+    """
+    DB-backed queue of automated action jobs (table automated_action_jobs).
+
+    One job is queued per automated_actions row of a task when its process is
+    created. Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED, so
+    several app processes can share the queue without running a job twice.
+    """
+
+    def __init__(self):
+        self.db_connection = Connection()
+
+    def enqueue_task_actions(self, process_id, task_id):
+        """Queues every active action of `task_id` for `process_id` with a single INSERT ... SELECT."""
+        if not process_id or not task_id:
+            return {"error": "process id and task id are required.", "success": False}
+
+        try:
+            _, queued = self.db_connection._execute_query(
+                query=('INSERT INTO `automated_action_jobs` (process_id, action_id, action_type, action_config, '
+                       'max_attempts) '
+                       'SELECT %s, id, action_type, action_config, %s FROM automated_actions '
+                       'WHERE task_id = %s AND is_deleted = 0'),
+                bind_variables=(process_id, app.Config.ACTION_MAX_ATTEMPTS, task_id),
+                fetch_one=False, fetch_all=False, with_rowcount=True
+            )
+            return {"jobs": queued, "success": True}
+        except Exception as e:
+            General.write_event(f"Error queueing automated actions of task {task_id}: {str(e)}")
+            return {"error": f"Error queueing automated actions of task {task_id}: {str(e)}", "success": False}
+
+    def enqueue_processes_actions(self, process_ids, task_id):
+        """Queues every active action of `task_id` for each of `process_ids` with a single INSERT ... SELECT."""
+        if not process_ids or not task_id:
+            return {"error": "process ids and task id are required.", "success": False}
+
+        try:
+            placeholders = ", ".join(["%s"] * len(process_ids))
+            _, queued = self.db_connection._execute_query(
+                query=('INSERT INTO `automated_action_jobs` (process_id, action_id, action_type, action_config, '
+                       'max_attempts) '
+                       'SELECT p.id, a.id, a.action_type, a.action_config, %s FROM automated_actions a '
+                       'JOIN workflow_process p ON p.task_id = a.task_id '
+                       f'WHERE a.task_id = %s AND a.is_deleted = 0 AND p.id IN ({placeholders})'),
+                bind_variables=(app.Config.ACTION_MAX_ATTEMPTS, task_id, *process_ids),
+                fetch_one=False, fetch_all=False, with_rowcount=True
+            )
+            return {"jobs": queued, "success": True}
+        except Exception as e:
+            General.write_event(f"Error queueing automated actions of task {task_id}: {str(e)}")
+            return {"error": f"Error queueing automated actions of task {task_id}: {str(e)}", "success": False}
+
+    def claim(self, worker_id, limit, accept, exclude_types=()):
+        """
+        Claims up to `limit` due jobs for `worker_id`.
+
+        `accept(job)` is called for each candidate and returns False when its
+        action type has no free slot; such jobs stay queued. Claimed jobs are
+        marked running with a lease of Config.ACTION_LEASE_SECONDS.
+        """
+        if limit < 1:
+            return []
+
+        condition = "status = 'queued' AND available_at <= NOW()"
+        bind_variables = ()
+        if exclude_types:
+            condition += f" AND action_type NOT IN ({', '.join(['%s'] * len(exclude_types))})"
+            bind_variables = tuple(exclude_types)
+
+        with Connection.transaction():
+            candidates = self.db_connection.execute_raw(
+                query=(f'SELECT id, process_id, action_id, action_type, action_config, attempts, max_attempts '
+                       f'FROM `automated_action_jobs` WHERE {condition} '
+                       f'ORDER BY available_at, id LIMIT {int(limit)} FOR UPDATE SKIP LOCKED'),
+                bind_variables=bind_variables
+            ) or []
+
+            jobs = [job for job in candidates if accept(job)]
+            if jobs:
+                self.db_connection._execute_query(
+                    query=(f"UPDATE `automated_action_jobs` SET status = 'running', attempts = attempts + 1, "
+                           f"locked_by = %s, locked_until = NOW() + INTERVAL %s SECOND "
+                           f"WHERE id IN ({', '.join(['%s'] * len(jobs))})"),
+                    bind_variables=(worker_id, app.Config.ACTION_LEASE_SECONDS, *(job["id"] for job in jobs)),
+                    fetch_one=False, fetch_all=False
+                )
+
+        for job in jobs:
+            job["attempts"] += 1
+        return jobs
+
+    def requeue_expired(self):
+        """
+        Handles running jobs whose lease ran out (their worker died or hung).
+
+        Jobs with attempts left go back in the queue; the others are marked failed,
+        since the lost attempt counted. Returns {"requeued": n, "failed_process_ids": [...]}:
+        the processes of failed jobs may be finished now (see finish_process).
+        """
+        with Connection.transaction():
+            expired = self.db_connection.execute_raw(
+                query=("SELECT id, process_id, attempts, max_attempts FROM `automated_action_jobs` "
+                       "WHERE status = 'running' AND locked_until < NOW() FOR UPDATE SKIP LOCKED")
+            ) or []
+            failed = [job for job in expired if job["attempts"] >= job["max_attempts"]]
+            requeued = [job for job in expired if job["attempts"] < job["max_attempts"]]
+
+            if failed:
+                self.db_connection._execute_query(
+                    query=("UPDATE `automated_action_jobs` SET status = 'failed', last_error = %s, locked_by = NULL, "
+                           f"locked_until = NULL, finished_at = NOW() WHERE id IN ({', '.join(['%s'] * len(failed))})"),
+                    bind_variables=("Lease expired on the last attempt", *(job["id"] for job in failed)),
+                    fetch_one=False, fetch_all=False
+                )
+            if requeued:
+                self.db_connection._execute_query(
+                    query=("UPDATE `automated_action_jobs` SET status = 'queued', locked_by = NULL, "
+                           f"locked_until = NULL WHERE id IN ({', '.join(['%s'] * len(requeued))})"),
+                    bind_variables=tuple(job["id"] for job in requeued),
+                    fetch_one=False, fetch_all=False
+                )
+
+        return {"requeued": len(requeued), "failed_process_ids": sorted({job["process_id"] for job in failed})}
+
+    def mark_succeeded(self, job_id, result):
+        self._finish_job(job_id, "succeeded", result=result)
+
+    def mark_failed(self, job_id, error):
+        self._finish_job(job_id, "failed", error=error)
+
+    def mark_retry(self, job_id, error, delay_seconds):
+        self.db_connection._execute_query(
+            query=("UPDATE `automated_action_jobs` SET status = 'queued', last_error = %s, locked_by = NULL, "
+                   "locked_until = NULL, available_at = NOW() + INTERVAL %s SECOND WHERE id = %s"),
+            bind_variables=(str(error), int(delay_seconds), job_id),
+            fetch_one=False, fetch_all=False
+        )
+
+    def stalled_processes(self, limit=100):
+        """
+        Ids of Pending processes whose jobs have all finished: their finish_process
+        never committed (the worker died, or advancing the instance failed).
+        """
+        rows = self.db_connection.execute_raw(
+            query=("SELECT p.id FROM workflow_process p WHERE p.status = 'Pending' "
+                   "AND EXISTS (SELECT 1 FROM `automated_action_jobs` j WHERE j.process_id = p.id) "
+                   "AND NOT EXISTS (SELECT 1 FROM `automated_action_jobs` j WHERE j.process_id = p.id "
+                   "AND j.status IN ('queued', 'running')) "
+                   f"ORDER BY p.id LIMIT {int(limit)}")
+        ) or []
+        return [row["id"] for row in rows]
+
+    def finish_process(self, process_id):
+        """
+        Records the outcome on workflow_process once none of its jobs is pending.
+
+        Joins the caller's transaction, so the status change and its outbox event
+        commit together with whatever the caller does next (advancing the instance).
+
+        Returns {"done": False} while jobs are still queued or running, otherwise
+        {"done": True, "failed": bool, "data": {instance_id, task_id, template_id}}.
+        """
+        jobs = self.db_connection.select(
+            table_name='`automated_action_jobs`',
+            columns=['action_id', 'action_type', 'status', 'result', 'last_error'],
+            condition='process_id = %s',
+            bind_variables=(process_id,)
+        ) or []
+        if any(job["status"] in ("queued", "running") for job in jobs):
+            return {"done": False, "success": True}
+
+        failed = any(job["status"] == "failed" for job in jobs)
+        outcome = [{
+            "action_id": job["action_id"],
+            "action_type": job["action_type"],
+            "status": job["status"],
+            "result": json.loads(job["result"]) if isinstance(job["result"], str) else job["result"],
+            "error": job["last_error"] if job["status"] == "failed" else None,
+        } for job in jobs]
+
+        status = "Failed" if failed else "Completed"
+        with Connection.atomic():
+            # Only the first finisher moves the process on; the status check makes the update a no-op for the rest
+            _, updated = self.db_connection._execute_query(
+                query=("UPDATE workflow_process SET status = %s, completed_at = NOW(), action_result = %s "
+                       "WHERE id = %s AND status = 'Pending'"),
+                bind_variables=(status, json.dumps(outcome, default=str), process_id),
+                fetch_one=False, fetch_all=False, with_rowcount=True
+            )
+            if not updated:
+                return {"done": False, "success": True}
+            Outbox().add("workflow_process.status_changed", "workflow_process", process_id,
+                         {"process_id": process_id, "status": status, "action_result": outcome})
+
+        process = self.db_connection.execute_raw(
+            query=('SELECT p.instance_id, p.task_id, i.template_id FROM workflow_process p '
+                   'JOIN workflow_instances i ON i.id = p.instance_id WHERE p.id = %s'),
+            bind_variables=(process_id,)
+        )
+        return {"done": True, "failed": failed, "data": process[0] if process else None, "success": True}
+
+    def _finish_job(self, job_id, status, result=None, error=None):
+        self.db_connection._execute_query(
+            query=("UPDATE `automated_action_jobs` SET status = %s, result = %s, last_error = %s, "
+                   "locked_by = NULL, locked_until = NULL, finished_at = NOW() WHERE id = %s"),
+            bind_variables=(status, None if result is None else json.dumps(result, default=str),
+                            None if error is None else str(error), job_id),
+            fetch_one=False, fetch_all=False
+        )
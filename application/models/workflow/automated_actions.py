@@ -1,5 +1,6 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.models.workflow.workflow_graph import WorkflowGraph
 
 
 class AutomatedActions:
@@ -23,6 +24,9 @@ class AutomatedActions:
             if not action_id:
                 return {"error": "Failed to create task automated action.", "success": False}
 
+            # Cached graphs flag tasks that have actions
+            WorkflowGraph.invalidate()
+
             return {"action_id": action_id, "success": True}
         except Exception as e:
             General.write_event(f"Error creating task automated action: {str(e)}")
@@ -63,6 +67,8 @@ class AutomatedActions:
             if is_update != 0:
                 return {"error": "Failed to delete automated action task.", "success": False}
 
+            WorkflowGraph.invalidate()
+
             return {"success": True, "message": "successfully delete automated action task."}
         except Exception as e:
             General.write_event(f"Error delete automated action task: {str(e)}")
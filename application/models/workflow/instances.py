@@ -1,5 +1,7 @@
+from mysql.connector.errors import IntegrityError
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.models.workflow.outbox import Outbox
 
 
 class Instances:
@@ -18,7 +20,7 @@ class Instances:
             if not data:
                 return {"data": None, "success": True}
 
-            return {"data ": data, "success": True}
+            return {"data": data, "success": True}
         except Exception as e:
             General.write_event(f"Error Check for existing instance with same request_id: {str(e)}")
             return {"error": f"Error Check for existing instance with same request_id: {str(e)}", "success": False}
@@ -41,16 +43,96 @@ class Instances:
                 "started_at": started_at
             }
 
-            instance_id = self.db_connection.create("`workflow_instances`", data, debug=True)
-            print(instance_id)
-            if not instance_id:
-                return {"error": "Failed to create workflow instance.", "success": False}
+            with Connection.atomic():
+                # The unique key on (template_id, request_id) rejects duplicates, so no pre-check is needed
+                instance_id = self.db_connection.create("`workflow_instances`", data)
+                if not instance_id:
+                    return {"error": "Failed to create workflow instance.", "success": False}
+                Outbox().add("workflow_instance.created", "workflow_instance", instance_id,
+                             dict(data, instance_id=instance_id))
+
+            return {"instance_id": instance_id, "success": True}
+        except IntegrityError as e:
+            if not Connection.is_duplicate_key(e):
+                General.write_event(f"Error creating workflow instances: {str(e)}")
+                return {"error": f"Error creating workflow instances: {str(e)}", "success": False}
+            return {"error": "Duplicate request detected", "duplicate": True,
+                    "instance_id": self._instance_id_for_request(template_id, request_id), "success": False}
+        except Exception as e:
+            General.write_event(f"Error creating workflow instances: {str(e)}")
+            return {"error": f"Error creating workflow instances: {str(e)}", "success": False}
+
+    def existing_request_ids(self, template_id, request_ids):
+        """
+        Returns the subset of `request_ids` that already have an instance of the
+        template, using a single IN (...) query on the (template_id, request_id) key.
+        """
+        if not request_ids:
+            return {"data": set(), "success": True}
 
-            return {"instance_id ": instance_id, "success": True}
+        try:
+            rows = self.db_connection.select(table_name='`workflow_instances`',
+                                             columns=['request_id'],
+                                             condition=(f"template_id = %s AND request_id IN "
+                                                        f"({', '.join(['%s'] * len(request_ids))})"),
+                                             bind_variables=(template_id, *request_ids)) or []
+            return {"data": {str(row["request_id"]) for row in rows}, "success": True}
+        except Exception as e:
+            General.write_event(f"Error checking existing instances for request ids: {str(e)}")
+            return {"error": f"Error checking existing instances for request ids: {str(e)}", "success": False}
+
+    def create_instances(self, template_id, request_ids, status, started_at):
+        """
+        Creates one workflow instance per request id with multi-row inserts.
+
+        Returns:
+            dict: {"data": {request_id: instance_id}, "success": True} or an error dict.
+        """
+        if not template_id or not request_ids or not status:
+            return {"error": "Task template id , request ids ,status are required.",
+                    "success": False}
+
+        try:
+            rows = [{
+                "template_id": template_id,
+                "request_id": request_id,
+                "status": status,
+                "started_at": started_at
+            } for request_id in request_ids]
+
+            with Connection.atomic() as tx:
+                # Ids are read back by the unique (template_id, request_id) key within the transaction
+                result = self.db_connection.create_many("`workflow_instances`", rows,
+                                                        id_key=("template_id", "request_id"))
+                if "error" in result:
+                    return {"error": f"Error creating workflow instances: {result['error']}",
+                            "duplicate": result.get("duplicate", False), "success": False}
+
+                instance_ids = result["ids"]
+                if len(instance_ids) != len(rows):
+                    tx.rollback_only()
+                    return {"error": "Failed to create workflow instances.", "success": False}
+                Outbox().add_many([("workflow_instance.created", "workflow_instance", instance_id,
+                                    dict(row, instance_id=instance_id))
+                                   for row, instance_id in zip(rows, instance_ids)])
+
+            return {"data": dict(zip(request_ids, instance_ids)), "success": True}
         except Exception as e:
             General.write_event(f"Error creating workflow instances: {str(e)}")
             return {"error": f"Error creating workflow instances: {str(e)}", "success": False}
 
+    def _instance_id_for_request(self, template_id, request_id):
+        """Id of the instance already created for a request (only read after a duplicate-key error)."""
+        try:
+            row = self.db_connection.select_one(table_name='`workflow_instances`',
+                                                columns=['id'],
+                                                condition='template_id = %s AND request_id = %s',
+                                                bind_variables=(template_id, request_id))
+            return row["id"] if row else None
+        except Exception as e:
+            General.write_event(f"Error retrieving instance for request id {request_id}: {str(e)}")
+            return None
+
     """
     Function use to get all workflow instances for template
     """
@@ -74,6 +156,28 @@ class Instances:
             General.write_event(f"Error retrieving workflow instance by status: {str(e)}")
             return {"error": f"Error retrieving workflow instance by status: {str(e)}", "success": True}
 
+    def iter_instances_by_status(self, status="Running", batch_size=None):
+        """
+        Stream a workflow's instances by status without loading them all in memory.
+
+        The query has already run when the generator is returned, so its errors come
+        back as an error dict; the generator holds a pooled connection until it is
+        exhausted or closed.
+        """
+        if not status:
+            return {"error": "status is required.", "success": False}
+
+        try:
+            rows = self.db_connection.select_iter(table_name='`workflow_instances`',
+                                                  condition='status = %s',
+                                                  bind_variables=(status,),
+                                                  batch_size=batch_size,
+                                                  eager=True)
+            return {"data": rows, "success": True}
+        except Exception as e:
+            General.write_event(f"Error streaming workflow instances by status: {str(e)}")
+            return {"error": f"Error streaming workflow instances by status: {str(e)}", "success": False}
+
     def update_instance_status(self, instance_id, status="Completed"):
         """ function update to workflow instance  """
         if not instance_id or not status:
@@ -81,18 +185,23 @@ class Instances:
 
         try:
             update_data = {
-                "instance_id": instance_id,
                 "status": status,
             }
-            is_update = self.db_connection.update(
-                table_name="`workflow_instances`",
-                condition_column="id",
-                condition_value=instance_id,
-                update_data=update_data
-            )
-
-            if is_update != 0:
-                return {"error": "Failed to update instance status.", "success": False}
+            with Connection.atomic():
+                _, affected_rows = self.db_connection.update(
+                    table_name="`workflow_instances`",
+                    condition_column="id",
+                    condition_value=instance_id,
+                    update_data=update_data,
+                    with_rowcount=True
+                )
+
+                # Nothing changed (unknown instance or same status), so there is no event to publish
+                if affected_rows == 0:
+                    return {"error": "No instance found with the specified ID or status unchanged.",
+                            "success": False}
+                Outbox().add("workflow_instance.status_changed", "workflow_instance", instance_id,
+                             {"instance_id": instance_id, "status": status})
 
             return {"success": True, "message": "instance status updated successfully."}
         except Exception as e:
@@ -0,0 +1,36 @@
+from application.mysql_connection import Connection
+
+
+class JoinCounters:
+    """
+    Per-instance arrival counters of join tasks (table workflow_join_counters).
+
+    Each finished predecessor bumps the counter of the join task once; the
+    router compares the count with the number of predecessors, so the
+    check costs the same however many branches meet at the task.
+    """
+
+    def __init__(self):
+        self.db_connection = Connection()
+
+    def arrive(self, instance_id, task_id):
+        """
+        Records one arrival at `task_id` and returns the number of arrivals so far.
+
+        Must run inside a transaction: the upsert keeps the counter row locked
+        until commit, so concurrent completions of parallel branches are
+        counted one after the other.
+        """
+        self.db_connection._execute_query(
+            query=('INSERT INTO `workflow_join_counters` (instance_id, task_id, arrived) VALUES (%s, %s, 1) '
+                   'ON DUPLICATE KEY UPDATE arrived = arrived + 1'),
+            bind_variables=(instance_id, task_id),
+            fetch_one=False, fetch_all=False
+        )
+        row = self.db_connection.select_one(
+            table_name='`workflow_join_counters`',
+            columns=['arrived'],
+            condition='instance_id = %s AND task_id = %s',
+            bind_variables=(instance_id, task_id)
+        )
+        return row["arrived"] if row else 0
@@ -0,0 +1,91 @@
+import json
+from application.mysql_connection import Connection
+from application.common.general import General
+from application.common.log_context import LogContext
+
+
+class Outbox:
+    """
+    Transactional outbox of workflow state changes (table outbox_events).
+
+    Model methods that change an instance or process call add()/add_many()
+    inside the same Connection.atomic() block as the change, so an event is
+    stored if and only if the change commits. OutboxRelay delivers pending
+    events to the configured sinks in the background.
+    """
+
+    def __init__(self):
+        self.db_connection = Connection()
+
+    def add(self, event_type, aggregate_type, aggregate_id, payload):
+        """Stores one event; must run in the caller's unit of work. Raises on failure."""
+        self.add_many([(event_type, aggregate_type, aggregate_id, payload)])
+
+    def add_many(self, events):
+        """Stores (event_type, aggregate_type, aggregate_id, payload) tuples with multi-row inserts."""
+        if not events:
+            return
+        request_id = LogContext.current().get("request_id")
+        result = self.db_connection.create_many("`outbox_events`", [{
+            "event_type": event_type,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "payload": json.dumps(payload, default=str),
+            "request_id": request_id,
+        } for event_type, aggregate_type, aggregate_id, payload in events])
+        if isinstance(result, dict):
+            # Let the surrounding transaction roll the state change back
+            raise RuntimeError(f"Failed to write outbox events: {result['error']}")
+
+    def claim(self, limit, lease_seconds):
+        """Locks up to `limit` due events for delivery, oldest first; returns them with decoded payloads."""
+        with Connection.transaction():
+            events = self.db_connection.execute_raw(
+                query=(f"SELECT id, event_type, aggregate_type, aggregate_id, payload, request_id, attempts, "
+                       f"created_at FROM `outbox_events` "
+                       f"WHERE status = 'pending' AND available_at <= NOW() "
+                       f"ORDER BY id LIMIT {int(limit)} FOR UPDATE SKIP LOCKED")
+            ) or []
+            if events:
+                self.db_connection._execute_query(
+                    query=(f"UPDATE `outbox_events` SET status = 'delivering', attempts = attempts + 1, "
+                           f"locked_until = NOW() + INTERVAL %s SECOND "
+                           f"WHERE id IN ({', '.join(['%s'] * len(events))})"),
+                    bind_variables=(lease_seconds, *(event["id"] for event in events)),
+                    fetch_one=False, fetch_all=False
+                )
+
+        for event in events:
+            event["attempts"] += 1
+            if isinstance(event["payload"], str):
+                event["payload"] = json.loads(event["payload"])
+        return events
+
+    def mark_delivered(self, event_ids):
+        self._update_events(event_ids, "status = 'delivered', delivered_at = NOW(), locked_until = NULL")
+
+    def mark_retry(self, event_ids, error, delay_seconds):
+        self._update_events(event_ids, "status = 'pending', locked_until = NULL, last_error = %s, "
+                                       "available_at = NOW() + INTERVAL %s SECOND", (str(error), int(delay_seconds)))
+
+    def mark_dead(self, event_ids, error):
+        General.write_event(f"Outbox events {event_ids} could not be delivered: {error}")
+        self._update_events(event_ids, "status = 'dead', locked_until = NULL, last_error = %s", (str(error),))
+
+    def requeue_expired(self):
+        """Puts events whose relay died mid-delivery back to pending."""
+        _, requeued = self.db_connection._execute_query(
+            query=("UPDATE `outbox_events` SET status = 'pending', locked_until = NULL "
+                   "WHERE status = 'delivering' AND locked_until < NOW()"),
+            fetch_one=False, fetch_all=False, with_rowcount=True
+        )
+        return requeued
+
+    def _update_events(self, event_ids, assignments, bind_variables=()):
+        if not event_ids:
+            return
+        self.db_connection._execute_query(
+            query=f"UPDATE `outbox_events` SET {assignments} WHERE id IN ({', '.join(['%s'] * len(event_ids))})",
+            bind_variables=(*bind_variables, *event_ids),
+            fetch_one=False, fetch_all=False
+        )
@@ -1,5 +1,6 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.models.workflow.outbox import Outbox
 from datetime import datetime
 from typing import Union, Dict
 
@@ -28,16 +29,57 @@ class Process:
                 "level_id": level_id
             }
 
-            process_id = self.db_connection.create("`workflow_process`", data, debug=True)
-            print(process_id)
-            if not process_id:
-                return {"error": "Failed to create workflow process.", "success": False}
+            with Connection.atomic():
+                process_id = self.db_connection.create("`workflow_process`", data)
+                if not process_id:
+                    return {"error": "Failed to create workflow process.", "success": False}
+                Outbox().add("workflow_process.created", "workflow_process", process_id,
+                             dict(data, process_id=process_id))
 
-            return {"task_id": task_id, "success": True}
+            return {"task_id": task_id, "process_id": process_id, "success": True}
         except Exception as e:
             General.write_event(f"Error creating workflow process: {str(e)}")
             return {"error": f"Error creating workflow process: {str(e)}", "success": False}
 
+    def create_processes(self, task_id, status, instance_ids, assigned_to=None, group_id=None, level_id=None):
+        """
+        Creates the same workflow process (one task) for many instances with multi-row inserts.
+        """
+        if not instance_ids or not task_id:
+            return {"error": "workflow instances or task is required.",
+                    "success": False}
+
+        try:
+            started_at = datetime.now()
+            rows = [{
+                "instance_id": instance_id,
+                "task_id": task_id,
+                "status": status,
+                "assigned_to": assigned_to,
+                "started_at": started_at,
+                "group_id": group_id,
+                "level_id": level_id
+            } for instance_id in instance_ids]
+
+            with Connection.atomic() as tx:
+                # Ids are read back by (instance_id, task_id) within the transaction
+                result = self.db_connection.create_many("`workflow_process`", rows, id_key=("instance_id", "task_id"))
+                if "error" in result:
+                    return {"error": f"Error creating workflow processes: {result['error']}", "success": False}
+
+                process_ids = result["ids"]
+                if len(process_ids) != len(instance_ids):
+                    tx.rollback_only()
+                    return {"error": "Failed to create workflow processes.", "success": False}
+                Outbox().add_many([("workflow_process.created", "workflow_process", process_id,
+                                    dict(row, process_id=process_id))
+                                   for row, process_id in zip(rows, process_ids)])
+
+            return {"task_id": task_id, "rows": result["rows"], "process_ids": process_ids, "success": True}
+        except Exception as e:
+            General.write_event(f"Error creating workflow processes: {str(e)}")
+            return {"error": f"Error creating workflow processes: {str(e)}", "success": False}
+
     """
     Retrieve a workflow process associated with a specific instance.
     """
@@ -109,13 +151,16 @@ class Process:
             }
 
     """ function Update the status of a workflow process and optionally set completion time. """
-    def update_process(self, process_id: Union[int, str], status: str) -> Dict[str, Union[bool, str, int, None]]:
+    def update_process(self, process_id: Union[int, str], status: str,
+                       expected_status: str = None) -> Dict[str, Union[bool, str, int, None]]:
         """
         Update the status of a workflow process and optionally set completion time.
 
         Args:
             process_id (int | str): The ID of the process to update. Must be a positive integer or non-empty string.
             status (str): New status for the process. Must be one of ["Pending", "Processing", "Completed", "Failed"]
+            expected_status (str, optional): Only update the process while it has this status. Of two
+                concurrent calls exactly one then changes the row; the other gets data 0.
 
         Returns:
             dict: Contains:
@@ -151,26 +196,27 @@ class Process:
         try:
             # Use UTC time for database consistency
             current_time = datetime.now()
-            update_data = {
-                "status": status,
-                "completed_at": current_time if status in ("Completed", "Failed") else None
-            }
-
-            # Execute update
-            affected_rows = self.db_connection.update(
-                table_name="workflow_process",
-                condition_column="id",
-                condition_value=process_id,
-                update_data=update_data
-            )
-
-            # Check if update was applied
-            if affected_rows == 0:
-                return {
-                    "success": False,
-                    "data": 0,
-                    "error": "No process found with the specified ID"
-                }
+            completed_at = current_time if status in ("Completed", "Failed") else None
+            condition = "id = %s AND status = %s" if expected_status else "id = %s"
+
+            with Connection.atomic():
+                # Execute update
+                _, affected_rows = self.db_connection._execute_query(
+                    query=f"UPDATE workflow_process SET status = %s, completed_at = %s WHERE {condition}",
+                    bind_variables=(status, completed_at, process_id, *([expected_status] if expected_status else [])),
+                    fetch_one=False, fetch_all=False, with_rowcount=True
+                )
+
+                # Check if update was applied
+                if affected_rows == 0:
+                    return {
+                        "success": False,
+                        "data": 0,
+                        "error": (f"No process with the specified ID in status {expected_status}" if expected_status
+                                  else "No process found with the specified ID")
+                    }
+                Outbox().add("workflow_process.status_changed", "workflow_process", process_id,
+                             {"process_id": process_id, "status": status})
 
             # Log successful update
             General.write_event(f"Updated process {process_id} to status {status}")
@@ -193,6 +239,111 @@ class Process:
                 "error": "Failed to update process. Please check system logs."
             }
 
+    def list_inbox(self, user_id: int, group_id: int = None, level_id: int = None,
+                   after: int = None, limit: int = 50) -> dict:
+        """
+        List the open (Processing) workflow processes a user can work on, newest first.
+
+        A process is in the inbox when it is assigned to the user, or routed to the
+        user's group and level. Each of the two cases is read from its own index
+        (see migrations/006) and the union of one page of ids is joined to the
+        instance and task names, so the cost follows the page size, not the table.
+
+        Args:
+            user_id (int): The user whose inbox is listed.
+            group_id (int, optional): The user's group; group routed processes are skipped when None.
+            level_id (int, optional): The user's level within the group.
+            after (int, optional): Keyset cursor, the last process id of the previous page.
+            limit (int): Page size.
+
+        Returns:
+            dict: success, data (list of processes), next_after (cursor of the next page or None) and error.
+        """
+        if not user_id:
+            return {
+                "success": False,
+                "data": None,
+                "error": "User ID must be a non-empty value"
+            }
+
+        cursor = " AND id < %s" if after else ""
+        branches = ["(SELECT id FROM workflow_process "
+                    f"WHERE assigned_to = %s AND status = 'Processing'{cursor} ORDER BY id DESC LIMIT %s)"]
+        bind_variables = [user_id, *([after] if after else []), limit + 1]
+        if group_id:
+            branches.append("(SELECT id FROM workflow_process "
+                            f"WHERE group_id = %s AND level_id <=> %s AND status = 'Processing'{cursor} "
+                            "ORDER BY id DESC LIMIT %s)")
+            bind_variables += [group_id, level_id, *([after] if after else []), limit + 1]
+
+        try:
+            # One extra row tells whether there is a next page
+            rows = self.db_connection.execute_raw(
+                query=('SELECT p.id AS process_id, p.instance_id, i.request_id, i.template_id, '
+                       'p.task_id, t.name AS task_name, t.task_type, p.status, p.assigned_to, '
+                       'p.group_id, p.level_id, p.started_at '
+                       f'FROM ({" UNION ".join(branches)}) inbox '
+                       'JOIN workflow_process p ON p.id = inbox.id '
+                       'JOIN workflow_instances i ON i.id = p.instance_id '
+                       'JOIN workflow_tasks t ON t.id = p.task_id '
+                       'ORDER BY p.id DESC LIMIT %s'),
+                bind_variables=(*bind_variables, limit + 1)
+            ) or []
+
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            return {
+                "success": True,
+                "data": rows,
+                "next_after": rows[-1]["process_id"] if has_more else None,
+                "error": None
+            }
+
+        except Exception as e:
+            General.write_event(f"Error listing inbox of user {user_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "error": "Failed to retrieve inbox. Please check logs."
+            }
+
+    def get_process_with_template(self, process_id: (int, str)) -> dict:
+        """
+        Retrieve a workflow process together with the template of its instance.
+
+        Returns:
+            dict: success, data ({id, instance_id, task_id, status, template_id} or None) and error.
+        """
+        if not process_id and process_id != 0:
+            return {
+                "success": False,
+                "data": None,
+                "error": "Process ID must be a non-empty value"
+            }
+
+        try:
+            result = self.db_connection.execute_raw(
+                query=('SELECT p.id, p.instance_id, p.task_id, p.status, i.template_id '
+                       'FROM workflow_process p '
+                       'JOIN workflow_instances i ON i.id = p.instance_id '
+                       'WHERE p.id = %s'),
+                bind_variables=(process_id,)
+            )
+
+            return {
+                "success": True,
+                "data": result[0] if result else None,
+                "error": None
+            }
+
+        except Exception as e:
+            General.write_event(f"Error retrieving workflow process for id {process_id}: {str(e)}")
+            return {
+                "success": False,
+                "data": None,
+                "error": "Failed to retrieve workflow process. Please check logs."
+            }
+
     def get_process_by_id(self, process_id: (int, str)) -> dict:
         """
         Retrieve a workflow process associated with a specific instance.
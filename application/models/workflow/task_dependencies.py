@@ -1,5 +1,6 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.models.workflow.workflow_graph import WorkflowGraph
 
 class TaskDependencies:
     def __init__(self):
@@ -19,6 +20,7 @@ class TaskDependencies:
             }
 
             dependent_id = self.db_connection.create("`task_dependencies`", data, debug=True)
+            WorkflowGraph.invalidate(template_id)
             
             if not dependent_id:
                 return {"error": "Failed to create  task relation.", "success": False}
@@ -87,6 +89,9 @@ class TaskDependencies:
                 update_data={"is_deleted": True}
             )
 
+            # The template of the edge is not known here
+            WorkflowGraph.invalidate()
+
             if is_update != 0:
                 return {"error": "Failed to delete task dependencies.", "success": False}
 
@@ -36,7 +36,7 @@ class TasksGroupWorkflow:
             return {"error": "Data list is required and must be a list of dictionaries.", "success": False}
 
         try:
-            inserted_ids = self.db_connection.create_many("`task_group_workflow`", data_list, debug=True)
+            inserted_ids = self.db_connection.create_many("`task_group_workflow`", data_list)
 
             if not inserted_ids:
                 return {"error": "Failed to create task group workflows.", "success": False}
@@ -48,6 +48,38 @@ class TasksGroupWorkflow:
         
         
 
+    """
+        Replace every task group workflow of a task with the given set.
+    """
+
+    def replace_task_group_workflows(self, task_id, data_list):
+        if not task_id:
+            return {"error": "Task ID is required.", "success": False}
+        if not isinstance(data_list, list):
+            return {"error": "Data list must be a list of dictionaries.", "success": False}
+
+        try:
+            # One DELETE plus one multi-row INSERT, committed together
+            with Connection.transaction() as tx:
+                self.db_connection.delete(
+                    table_name="`task_group_workflow`",
+                    condition="task_id = %s",
+                    bind_variables=(task_id,)
+                )
+
+                if not data_list:
+                    return {"inserted_ids": [], "success": True}
+
+                result = self.db_connection.create_many("`task_group_workflow`", data_list, return_ids=True)
+                if "error" in result:
+                    tx.rollback_only()
+                    return {"error": f"Failed to replace task group workflows: {result.get('error')}", "success": False}
+
+            return {"inserted_ids": result["id_ranges"], "success": True}
+        except Exception as e:
+            General.write_event(f"Error replacing task group workflows: {str(e)}")
+            return {"error": f"Error replacing task group workflows: {str(e)}", "success": False}
+
     """
     Function use to get all task for template
     """
@@ -1,5 +1,6 @@
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.models.workflow.workflow_graph import WorkflowGraph
 
 
 class Tasks:
@@ -100,6 +101,8 @@ class Tasks:
                 update_data=update_data
             )
 
+            WorkflowGraph.invalidate()
+
             if is_update != 0:
                 return {"error": "Failed to update task.", "success" : False}
 
@@ -124,6 +127,8 @@ class Tasks:
                 update_data={"is_deleted": True}
             )
 
+            WorkflowGraph.invalidate()
+
             if is_update != 0:
                 return {"error": "Failed to delete task.", "success" : False}
 
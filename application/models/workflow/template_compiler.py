@@ -0,0 +1,462 @@
+import json
+from datetime import datetime
+from application.mysql_connection import Connection
+from application.common.general import General
+from application.models.dynamic.forms import Forms
+
+
+class TemplateCompiler:
+    """
+    Turns a template's diagram_json into workflow rows with a fixed number of
+    round-trips.
+
+    plan() walks the diagram once and builds every row in memory. deploy()
+    writes them in a single transaction. On the first execution everything is
+    bulk-inserted, and diagram node ids are mapped to the generated task ids,
+    read back by (template_id, name) in the same transaction. Later executions are diffed
+    against the last deployed diagram (workflow_template_deployments), so only
+    added, removed and changed nodes and edges are written. Unchanged nodes
+    keep their task ids.
+    """
+
+    REQUIRED_NODE_FIELDS = ("role", "group", "form_name", "form_fields")
+
+    def __init__(self, template_id, diagram_json):
+        self.template_id = template_id
+        self.diagram = diagram_json or {}
+        self.nodes = []
+        self.edges = []
+        self.skipped = []
+        self._previous_map = {}
+        self.db_connection = Connection()
+
+    def plan(self):
+        """Validates the diagram and collects the nodes and edges to insert."""
+        nodes = self.diagram.get("nodes") if isinstance(self.diagram.get("nodes"), list) else []
+        for node in nodes:
+            task_data = node.get("data", {})
+            if not all(k in task_data for k in self.REQUIRED_NODE_FIELDS):
+                General.write_event(f"Skipping node due to missing required fields: {node}", level="warning")
+                self.skipped.append(node.get("id"))
+                continue
+            self.nodes.append(node)
+
+        planned = {node["id"] for node in self.nodes}
+        edges = self.diagram.get("edges") if isinstance(self.diagram.get("edges"), list) else []
+        self.edges = [edge for edge in edges if edge.get("source") in planned and edge.get("target") in planned]
+        return self
+
+    def deploy(self):
+        """
+        Executes the planned diagram, incrementally when a previous deployment exists.
+
+        Returns:
+            dict: {"success": True, "task_map": {node_id: task_id}, "changes": {...}} or an error dict.
+        """
+        previous = self._load_deployment()
+        if isinstance(previous, dict) and "error" in previous:
+            return previous
+        if previous is None:
+            return self.execute()
+        return self.execute_diff(*previous)
+
+    def execute(self):
+        """
+        Writes every planned row atomically (first execution of a template).
+
+        Returns:
+            dict: {"success": True, "task_map": {node_id: task_id}} or an error dict.
+        """
+        error = self._create_form_tables(self._manual_nodes(self.nodes))
+        if error:
+            return error
+
+        with Connection.transaction() as tx:
+            task_map = self._insert_nodes(self.nodes)
+            if "error" in task_map:
+                tx.rollback_only()
+                return task_map
+
+            error = (self._insert_dependencies([(task_map[edge["source"]], task_map[edge["target"]])
+                                                for edge in self.edges])
+                     or self._save_deployment(task_map))
+            if error:
+                tx.rollback_only()
+                return error
+
+        return {"success": True, "task_map": task_map,
+                "changes": {"added": len(self.nodes), "removed": 0, "changed": 0}}
+
+    def execute_diff(self, previous_diagram, previous_map):
+        """Applies only the difference between the last deployed diagram and the planned one."""
+        old_nodes = {node["id"]: node for node in previous_diagram.get("nodes", []) if node.get("id") in previous_map}
+        new_nodes = {node["id"]: node for node in self.nodes}
+
+        added, removed, changed = [], [], []
+        for node_id, node in new_nodes.items():
+            old = old_nodes.get(node_id)
+            if old is None:
+                added.append(node)
+            elif self._needs_replacement(old, node):
+                # A new kind of task or a different form table cannot be updated in place
+                removed.append(node_id)
+                added.append(node)
+            elif self._signature(old) != self._signature(node):
+                changed.append((old, node))
+        removed.extend(node_id for node_id in old_nodes if node_id not in new_nodes)
+
+        field_changes = self._field_changes(changed)
+        if "error" in field_changes:
+            return field_changes
+
+        # DDL commits implicitly, so it runs before the transaction and is safe to repeat
+        error = self._create_form_tables(self._manual_nodes(added))
+        if error:
+            return error
+        for table_name, fields in field_changes["alter"].items():
+            result = Forms.alter_dynamic_table(table_name, fields)
+            if isinstance(result, dict):
+                return {"error": f"Failed to alter form table {table_name}: {result['error']}", "success": False}
+
+        with Connection.transaction() as tx:
+            task_map = {node_id: previous_map[node_id] for node_id in new_nodes
+                        if node_id in old_nodes and node_id not in removed}
+            inserted = self._insert_nodes(added)
+            if "error" in inserted:
+                tx.rollback_only()
+                return inserted
+            task_map.update(inserted)
+
+            old_pairs = {(previous_map[edge["source"]], previous_map[edge["target"]])
+                         for edge in previous_diagram.get("edges", [])
+                         if edge.get("source") in previous_map and edge.get("target") in previous_map}
+            new_pairs = {(task_map[edge["source"]], task_map[edge["target"]]) for edge in self.edges}
+
+            error = (self._delete_tasks([previous_map[node_id] for node_id in removed])
+                     or self._update_nodes(changed, task_map, field_changes)
+                     or self._delete_dependencies(old_pairs - new_pairs)
+                     or self._insert_dependencies(new_pairs - old_pairs)
+                     or self._save_deployment(task_map))
+            if error:
+                tx.rollback_only()
+                return error
+
+        return {"success": True, "task_map": task_map,
+                "changes": {"added": len(added), "removed": len(removed), "changed": len(changed)}}
+
+    # ----------------------------------------------------------------- inserts
+
+    def _insert_nodes(self, nodes):
+        """Bulk-inserts tasks and everything hanging off them; returns {node_id: task_id} or an error dict."""
+        if not nodes:
+            return {}
+
+        task_rows = [{
+            "template_id": self.template_id,
+            "name": node.get("label", "Unnamed Task"),
+            "task_type": node["data"].get("type", "manual"),
+            "assigned_role": int(node["data"]["role"]) if node["data"].get("role") else None,
+            "assigned_to": int(node["data"]["group"]) if node["data"].get("group") else None,
+        } for node in nodes]
+        task_ids = self._insert_with_ids("`workflow_tasks`", task_rows, ("template_id", "name"))
+        if isinstance(task_ids, dict):
+            return task_ids
+        task_map = {node["id"]: task_id for node, task_id in zip(nodes, task_ids)}
+
+        # Forms, their fields and group assignments for manual tasks
+        manual_nodes = self._manual_nodes(nodes)
+        form_rows = [{
+            "task_id": task_map[node["id"]],
+            "form_name": node["data"]["form_name"],
+            "table_name": self._table_name(node),
+            "description": None,
+        } for node in manual_nodes]
+        form_ids = self._insert_with_ids("forms", form_rows, ("task_id",))
+        if isinstance(form_ids, dict):
+            return form_ids
+
+        field_rows = [dict(self._field_row(field), form_id=form_id)
+                      for node, form_id in zip(manual_nodes, form_ids) for field in self._fields(node)]
+
+        group_rows = [{
+            "task_id": task_map[node["id"]],
+            "group_id": node["data"]["group"],
+            "level_id": node["data"].get("level") or 0,
+        } for node in manual_nodes]
+
+        # Automated tasks
+        action_rows = [{
+            "task_id": task_map[node["id"]],
+            "action_type": node["data"].get("type"),
+            "action_config": self._config(node["data"].get("config")),
+        } for node in nodes if not self._is_manual(node)]
+
+        for table_name, rows in (("form_fields", field_rows), ("`task_groups`", group_rows),
+                                 ("`automated_actions`", action_rows)):
+            error = self._insert_rows(table_name, rows)
+            if error:
+                return error
+
+        return task_map
+
+    def _insert_dependencies(self, pairs):
+        return self._insert_rows("`task_dependencies`", [{
+            "template_id": self.template_id,
+            "task_id": task_id,
+            "dependent_task_id": dependent_task_id,
+            "task_condition": None,
+        } for task_id, dependent_task_id in sorted(pairs)])
+
+    def _insert_rows(self, table_name, rows):
+        if not rows:
+            return None
+        result = self.db_connection.create_many(table_name, rows)
+        if isinstance(result, dict):
+            return {"error": f"Failed to insert into {table_name}: {result['error']}", "success": False}
+        return None
+
+    def _insert_with_ids(self, table_name, rows, id_key):
+        """
+        Bulk-inserts rows and returns their generated ids in row order, or an error dict.
+
+        The ids are read back by `id_key` inside the deploy transaction instead of being
+        derived from the insert's id range, which is not consecutive under every
+        auto-increment setting.
+        """
+        if not rows:
+            return []
+
+        result = self.db_connection.create_many(table_name, rows, id_key=id_key)
+        if "error" in result:
+            return {"error": f"Failed to insert into {table_name}: {result['error']}", "success": False}
+
+        ids = result["ids"]
+        if len(ids) != len(rows):
+            return {"error": f"Expected {len(rows)} ids from {table_name}, got {len(ids)}.", "success": False}
+        return ids
+
+    def _create_form_tables(self, manual_nodes):
+        for node in manual_nodes:
+            table_name = Forms.create_dynamic_table(node["data"]["form_name"], self._fields(node))
+            if isinstance(table_name, dict):
+                return {"error": f"Failed to create form table: {table_name['error']}", "success": False}
+        return None
+
+    # ------------------------------------------------------- updates/deletes
+
+    def _update_nodes(self, changed, task_map, field_changes):
+        for old, node in changed:
+            task_id = task_map[node["id"]]
+            data, old_data = node["data"], old["data"]
+
+            if self._task_signature(old) != self._task_signature(node):
+                self.db_connection.update(
+                    table_name="`workflow_tasks`",
+                    condition_column="id",
+                    condition_value=task_id,
+                    update_data={
+                        "name": node.get("label", "Unnamed Task"),
+                        "assigned_role": int(data["role"]) if data.get("role") else None,
+                        "assigned_to": int(data["group"]) if data.get("group") else None,
+                    }
+                )
+
+            if not self._is_manual(node):
+                if self._config(old_data.get("config")) != self._config(data.get("config")):
+                    self.db_connection.update(
+                        table_name="`automated_actions`",
+                        condition_column="task_id",
+                        condition_value=task_id,
+                        update_data={"action_config": self._config(data.get("config"))}
+                    )
+                continue
+
+            if (old_data["group"], old_data.get("level")) != (data["group"], data.get("level")):
+                self.db_connection.update(
+                    table_name="`task_groups`",
+                    condition_column="task_id",
+                    condition_value=task_id,
+                    update_data={"group_id": data["group"], "level_id": data.get("level") or 0}
+                )
+
+        # Form fields: new ones are inserted, changed ones updated, dropped ones
+        # deleted (their ts_* column and data are kept)
+        error = self._insert_rows("form_fields", field_changes["insert"])
+        if error:
+            return error
+        for form_id, field in field_changes["update"]:
+            row = self._field_row(field)
+            name = row.pop("name")
+            self.db_connection._execute_query(
+                query=f"UPDATE form_fields SET {', '.join(f'{key} = %s' for key in row)} "
+                      f"WHERE form_id = %s AND name = %s",
+                bind_variables=tuple(row.values()) + (form_id, name),
+                fetch_one=False, fetch_all=False
+            )
+        for form_id, names in field_changes["delete"].items():
+            self.db_connection.delete(
+                table_name="form_fields",
+                condition=f"form_id = %s AND name IN ({', '.join(['%s'] * len(names))})",
+                bind_variables=(form_id, *names)
+            )
+        return None
+
+    def _delete_tasks(self, task_ids):
+        """Soft-deletes removed tasks so running instances keep their references."""
+        if not task_ids:
+            return None
+        placeholders = ', '.join(['%s'] * len(task_ids))
+        self.db_connection._execute_query(
+            query=f"UPDATE `workflow_tasks` SET is_deleted = 1 WHERE id IN ({placeholders})",
+            bind_variables=tuple(task_ids), fetch_one=False, fetch_all=False
+        )
+        self.db_connection._execute_query(
+            query=f"UPDATE `automated_actions` SET is_deleted = 1 WHERE task_id IN ({placeholders})",
+            bind_variables=tuple(task_ids), fetch_one=False, fetch_all=False
+        )
+        return None
+
+    def _delete_dependencies(self, pairs):
+        if not pairs:
+            return None
+        pairs = sorted(pairs)
+        self.db_connection._execute_query(
+            query=(f"UPDATE `task_dependencies` SET is_deleted = 1 WHERE template_id = %s AND is_deleted = 0 "
+                   f"AND (task_id, dependent_task_id) IN ({', '.join(['(%s, %s)'] * len(pairs))})"),
+            bind_variables=(self.template_id, *(task_id for pair in pairs for task_id in pair)),
+            fetch_one=False, fetch_all=False
+        )
+        return None
+
+    def _field_changes(self, changed):
+        """
+        Works out the form field rows and ts_* columns touched by changed nodes.
+
+        Returns {"insert": [rows], "update": [(form_id, field)], "delete": {form_id: [names]},
+        "alter": {table_name: [fields]}} or an error dict.
+        """
+        changes = {"insert": [], "update": [], "delete": {}, "alter": {}}
+        pairs = [(old, node) for old, node in changed
+                 if self._is_manual(node) and self._fields_signature(old) != self._fields_signature(node)]
+        if not pairs:
+            return changes
+
+        task_ids = [self._previous_map[node["id"]] for _, node in pairs]
+        forms = self.db_connection.select(
+            table_name="forms",
+            columns=["id", "task_id", "table_name"],
+            condition=f"task_id IN ({', '.join(['%s'] * len(task_ids))})",
+            bind_variables=tuple(task_ids)
+        ) or []
+        forms = {form["task_id"]: form for form in forms}
+
+        for old, node in pairs:
+            form = forms.get(self._previous_map[node["id"]])
+            if form is None:
+                return {"error": f"Form of task {self._previous_map[node['id']]} not found.", "success": False}
+
+            old_fields = {field["name"]: field for field in self._fields(old)}
+            new_fields = {field["name"]: field for field in self._fields(node)}
+            for name, field in new_fields.items():
+                previous_field = old_fields.get(name)
+                if previous_field is None:
+                    changes["insert"].append(dict(self._field_row(field), form_id=form["id"]))
+                    changes["alter"].setdefault(form["table_name"], []).append(field)
+                elif previous_field != field:
+                    changes["update"].append((form["id"], field))
+                    if previous_field["type"] != field["type"]:
+                        changes["alter"].setdefault(form["table_name"], []).append(field)
+            dropped = [name for name in old_fields if name not in new_fields]
+            if dropped:
+                changes["delete"][form["id"]] = dropped
+
+        return changes
+
+    # ------------------------------------------------------------ deployment
+
+    def _load_deployment(self):
+        """Returns (diagram, {node_id: task_id}) of the last execution, None if never executed, or an error dict."""
+        try:
+            row = self.db_connection.select_one(
+                table_name="`workflow_template_deployments`",
+                columns=["diagram_json", "task_map"],
+                condition="template_id = %s",
+                bind_variables=(self.template_id,)
+            )
+        except Exception as e:
+            General.write_event(f"Error loading deployment of template {self.template_id}: {str(e)}")
+            return {"error": f"Error loading deployment of template {self.template_id}: {str(e)}", "success": False}
+
+        if not row:
+            return None
+        diagram = json.loads(row["diagram_json"])
+        stored_map = json.loads(row["task_map"])
+        # JSON object keys are always strings; give each node id back the type it has in the diagram
+        self._previous_map = {node["id"]: stored_map[str(node["id"])] for node in diagram.get("nodes", [])
+                              if str(node.get("id")) in stored_map}
+        return diagram, self._previous_map
+
+    def _save_deployment(self, task_map):
+        result = self.db_connection.upsert_many("`workflow_template_deployments`", [{
+            "template_id": self.template_id,
+            "diagram_json": json.dumps({"nodes": self.nodes, "edges": self.edges}),
+            "task_map": json.dumps(task_map),
+            "executed_at": datetime.now(),
+        }])
+        if isinstance(result, dict):
+            return {"error": f"Failed to save template deployment: {result['error']}", "success": False}
+        return None
+
+    # --------------------------------------------------------------- helpers
+
+    def _needs_replacement(self, old, node):
+        if self._is_manual(old) != self._is_manual(node):
+            return True
+        return self._is_manual(node) and self._table_name(old) != self._table_name(node)
+
+    def _signature(self, node):
+        return self._task_signature(node), node["data"].get("level"), self._config(node["data"].get("config")), \
+            self._fields_signature(node)
+
+    @staticmethod
+    def _task_signature(node):
+        data = node["data"]
+        return node.get("label", "Unnamed Task"), data.get("role"), data.get("group")
+
+    def _fields_signature(self, node):
+        return json.dumps(self._fields(node), sort_keys=True, default=str)
+
+    def _manual_nodes(self, nodes):
+        return [node for node in nodes if self._is_manual(node)]
+
+    @staticmethod
+    def _is_manual(node):
+        return node["data"].get("type", "manual") == "manual"
+
+    @staticmethod
+    def _table_name(node):
+        return f"ts_{node['data']['form_name'].strip().lower().replace(' ', '_')}"
+
+    @staticmethod
+    def _fields(node):
+        # Diagrams name the field type either `type` or `field_type`; the tables need both
+        fields = node["data"].get("form_fields") or []
+        return [{**field,
+                 "type": field.get("type", field.get("field_type")),
+                 "field_type": field.get("field_type", field.get("type"))} for field in fields]
+
+    @staticmethod
+    def _field_row(field):
+        return {
+            "label": field['label'],
+            "name": field['name'],
+            "placeholder": field.get('placeholder'),
+            "field_type": field['field_type'],
+            "options": json.dumps(field.get('options', None)),
+            "required": field['required'],
+            "enabled": field['enabled'],
+        }
+
+    @staticmethod
+    def _config(config):
+        return config if config is None or isinstance(config, str) else json.dumps(config)
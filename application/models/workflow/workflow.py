@@ -1,6 +1,8 @@
 from typing import Dict, Any, Optional, List
 from application.mysql_connection import Connection
 from application.common.general import General
+from application.common.pagination import Pagination
+from application.common.row_counts import RowCounts
 from application.models.workflow.tasks import Tasks
 
 class Workflows:
@@ -83,9 +85,13 @@ class Workflows:
             self.logger.write_event(f"Error retrieving workflow: {str(e)}")
             return {"error": f"Error retrieving workflow: {str(e)}", "success": False}
 
-    def list_workflows(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+    def list_workflows(self, page: int = 1, page_size: int = 10,
+                       keyset: Optional[Dict[str, Any]] = None, approximate: bool = False) -> Dict[str, Any]:
         """
         Retrieve workflows with pagination and include template info.
+
+        With `keyset` (see Pagination.from_args) pages on w.id instead of OFFSET.
+        With `approximate` the total is the estimate of RowCounts instead of an exact count.
         """
         try:
             offset = (page - 1) * page_size
@@ -95,6 +101,14 @@ class Workflows:
             """
             bind_vars = (0, 1)
 
+            if keyset is not None:
+                result = Pagination.keyset_page(self.db_connection, columns="w.*", from_where=base_query,
+                                                bind_variables=bind_vars, key="w.id", keyset=keyset,
+                                                page_size=page_size, count_table="workflows",
+                                                count_condition="is_deleted = %s AND status = %s",
+                                                count_bind_variables=bind_vars, approximate=approximate)
+                return dict(result, success=True)
+
             # Get paginated data
             query = f"""
                 SELECT w.* 
@@ -104,9 +118,8 @@ class Workflows:
             results = self.db_connection.execute_raw(query, (*bind_vars, page_size, offset))
 
             # Count total records
-            count_query = f"SELECT COUNT(*) as total {base_query}"
-            total_count_result = self.db_connection.execute_raw(count_query, bind_vars)
-            total_count = total_count_result[0]['total'] if total_count_result else 0
+            total_count = RowCounts.count(self.db_connection, "workflows", "is_deleted = %s AND status = %s",
+                                          bind_vars, approximate=approximate)
 
             return {
                 "data": results,
@@ -114,7 +127,8 @@ class Workflows:
                     "page": page,
                     "page_size": page_size,
                     "total_items": total_count,
-                    "total_pages": (total_count + page_size - 1) // page_size
+                    "total_pages": (total_count + page_size - 1) // page_size,
+                    "total_is_approximate": approximate
                 },
                 "success": True
             }
@@ -0,0 +1,169 @@
+import time
+from application.mysql_connection import Connection
+from application.common.general import General
+from application.common.lookup_cache import LookupCache
+from application.common.ttl_cache import TTLCache
+import config as app
+
+
+class WorkflowGraph:
+    """
+    In-memory form of an executed workflow template.
+
+    Holds every task of the template with its routing data (group, level,
+    assignee) and the dependency edges in both directions, so start_workflow
+    and complete_task can route without querying workflow_tasks,
+    task_dependencies and task_groups on each transition. Graphs are cached
+    by template_id and dropped when the template is executed or edited again.
+    """
+
+    _MISSING = object()
+
+    _cache = TTLCache(
+        name="workflow_graphs",
+        max_size=app.Config.WORKFLOW_GRAPH_CACHE_SIZE,
+        ttl_seconds=app.Config.WORKFLOW_GRAPH_CACHE_TTL_SECONDS,
+    )
+
+    def __init__(self, template_id, tasks, edges):
+        self.template_id = template_id
+        # task_id -> task row (id, name, task_type, assigned_to, assigned_role, group_id, level_id, has_actions)
+        self.tasks = {task["id"]: task for task in tasks}
+        self._successors = {task_id: [] for task_id in self.tasks}
+        self._predecessors = {task_id: [] for task_id in self.tasks}
+
+        for edge in edges:
+            source, target = edge["task_id"], edge["dependent_task_id"]
+            if source not in self.tasks or target not in self.tasks:
+                continue
+            self._successors[source].append((target, edge.get("task_condition")))
+            self._predecessors[target].append((source, edge.get("task_condition")))
+
+        self._successors = {key: tuple(value) for key, value in self._successors.items()}
+        self._predecessors = {key: tuple(value) for key, value in self._predecessors.items()}
+
+        # The entry task has no incoming edge; ties (and cyclic templates) fall back to the lowest id
+        roots = [task_id for task_id in self.tasks if not self._predecessors[task_id]]
+        self.first_task_id = min(roots or self.tasks) if self.tasks else None
+
+    @staticmethod
+    def for_template(template_id):
+        """
+        Returns the compiled graph of a template, building it on first use.
+
+        A cached graph is served from memory for WORKFLOW_GRAPH_CHECK_SECONDS, then
+        its version in lookup_versions is read again, so templates changed in
+        another worker process are recompiled here too.
+        """
+        now = time.monotonic()
+        entry = WorkflowGraph._cache.get(template_id, WorkflowGraph._MISSING)
+        if entry is not WorkflowGraph._MISSING and now < entry["checked_until"]:
+            return entry["graph"]
+
+        # Taken before reading MySQL: an invalidate() in this process meanwhile keeps the result out of the cache
+        generation = WorkflowGraph._cache.generation(template_id)
+        version = WorkflowGraph._version(template_id)
+        checked_until = now + app.Config.WORKFLOW_GRAPH_CHECK_SECONDS
+        if entry is not WorkflowGraph._MISSING and entry["version"] == version:
+            WorkflowGraph._cache.set_if_generation(template_id, dict(entry, checked_until=checked_until), generation)
+            return entry["graph"]
+
+        graph = WorkflowGraph._load(template_id)
+        WorkflowGraph._cache.set_if_generation(template_id, {"version": version, "graph": graph,
+                                                             "checked_until": checked_until}, generation)
+        return graph
+
+    @staticmethod
+    def invalidate(template_id=None):
+        """
+        Drops the compiled graph of one template, or of every template when template_id
+        is None, in every worker process (through a version bump in lookup_versions).
+        """
+        LookupCache.invalidate(WorkflowGraph._version_name(template_id))
+        WorkflowGraph._drop(template_id)
+
+        tx = Connection.current_transaction()
+        if tx is not None:
+            tx.after_commit(lambda: WorkflowGraph._drop(template_id))
+
+    @staticmethod
+    def _drop(template_id):
+        if template_id is None:
+            WorkflowGraph._cache.clear()
+        else:
+            WorkflowGraph._cache.invalidate(template_id)
+
+    @staticmethod
+    def _version_name(template_id):
+        return "workflow_graphs" if template_id is None else f"workflow_graph:{template_id}"
+
+    @staticmethod
+    def _version(template_id):
+        """(all templates, this template) versions; either one changing makes the cached graph stale."""
+        names = (WorkflowGraph._version_name(None), WorkflowGraph._version_name(template_id))
+        rows = Connection().execute_raw(
+            query="SELECT name, version FROM `lookup_versions` WHERE name IN (%s, %s)",
+            bind_variables=names
+        ) or []
+        versions = {row["name"]: row["version"] for row in rows}
+        return tuple(versions.get(name, 0) for name in names)
+
+    def task(self, task_id):
+        return self.tasks.get(task_id)
+
+    def successors(self, task_id):
+        """(next_task_id, task_condition) pairs for the tasks that follow `task_id`."""
+        return self._successors.get(task_id, ())
+
+    def predecessors(self, task_id):
+        """(previous_task_id, task_condition) pairs for the tasks `task_id` waits on."""
+        return self._predecessors.get(task_id, ())
+
+    def join_conditions(self, task_id):
+        """Distinct non-empty conditions on the incoming edges of `task_id`."""
+        return {condition for _, condition in self.predecessors(task_id) if condition}
+
+    def join_mode(self, task_id):
+        """
+        "AND" when `task_id` waits for all of its predecessors, "OR" when the first
+        one to finish activates it. Taken from task_condition on the incoming edges
+        ("AND"/"ALL", "OR"/"ANY"), else Config.WORKFLOW_DEFAULT_JOIN.
+        """
+        conditions = {str(condition).strip().upper() for condition in self.join_conditions(task_id)}
+        if conditions & {"OR", "ANY"}:
+            return "OR"
+        if conditions & {"AND", "ALL"}:
+            return "AND"
+        return app.Config.WORKFLOW_DEFAULT_JOIN
+
+    @staticmethod
+    def _load(template_id):
+        db_connection = Connection()
+        try:
+            # One row per task; group and level both come from its lowest-id task_groups row
+            tasks = db_connection.execute_raw(
+                query=('SELECT t.id, t.template_id, t.name, t.task_type, t.assigned_to, t.assigned_role, '
+                       'tg.group_id, tg.level_id, '
+                       'EXISTS(SELECT 1 FROM automated_actions a WHERE a.task_id = t.id AND a.is_deleted = 0) '
+                       'AS has_actions '
+                       'FROM workflow_tasks t '
+                       'LEFT JOIN task_groups tg '
+                       'ON tg.id = (SELECT MIN(g.id) FROM task_groups g WHERE g.task_id = t.id) '
+                       'WHERE t.template_id = %s AND t.is_deleted = %s '
+                       'ORDER BY t.id'),
+                bind_variables=(template_id, 0)
+            )
+            if not tasks:
+                return None
+
+            edges = db_connection.select(
+                table_name='`task_dependencies`',
+                columns=['task_id', 'dependent_task_id', 'task_condition'],
+                condition='template_id = %s AND is_deleted = %s',
+                bind_variables=(template_id, 0)
+            ) or []
+
+            return WorkflowGraph(template_id, tasks, edges)
+        except Exception as e:
+            General.write_event(f"Error compiling workflow graph for template {template_id}: {str(e)}")
+            raise
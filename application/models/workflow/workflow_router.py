@@ -0,0 +1,165 @@
+from application.mysql_connection import Connection
+from application.common.general import General
+from application.models.workflow.action_queue import ActionQueue
+from application.models.workflow.instances import Instances
+from application.models.workflow.join_counters import JoinCounters
+from application.models.workflow.process import Process
+from application.models.workflow.workflow_graph import WorkflowGraph
+
+
+class WorkflowRouter:
+    """
+    Moves an instance past a finished task.
+
+    Used by complete_task for manual tasks and by the action worker once the
+    automated actions of a task have run; start_task() and start_tasks() also
+    open the first task of new instances. Manual tasks get a Processing
+    process for their group; tasks with automated actions get a Pending
+    process and their actions are queued for the worker pool, so the caller
+    never waits for them.
+
+    A successor with several predecessors is a join: an AND join activates
+    when the last predecessor finishes, an OR join when the first one does.
+    Arrivals are counted per instance in JoinCounters.
+    """
+
+    def __init__(self):
+        self.process = Process()
+        self.action_queue = ActionQueue()
+        self.join_counters = JoinCounters()
+
+    def advance(self, instance_id, template_id, task_id):
+        """
+        Creates the processes of the tasks that follow `task_id`, or completes the
+        instance when there are none. Runs inside the caller's transaction when one
+        is open; the join counters rely on that to count each arrival exactly once.
+
+        Returns:
+            dict: {"success": True, "data": {"next_tasks", "waiting_tasks", "queued_jobs", "instance_completed"}}
+            or an error dict. next_tasks are the successors activated now; waiting_tasks are joins still
+            waiting for other branches.
+        """
+        graph = WorkflowGraph.for_template(template_id)
+        tasks_dependent = graph.successors(int(task_id)) if graph else ()
+
+        if not tasks_dependent:
+            Instances().update_instance_status(instance_id=instance_id, status="Completed")
+            General.write_event(f"Workflow instance {instance_id} completed.", level="INFO")
+            return {"success": True, "data": {"next_tasks": [], "waiting_tasks": [], "queued_jobs": 0,
+                                              "instance_completed": True}}
+
+        General.write_event(f"Task {task_id} has dependent tasks: {[next_task for next_task, _ in tasks_dependent]}",
+                            level="INFO")
+
+        queued_jobs = 0
+        activated, waiting = [], []
+        # Joins the caller's transaction, so a completion and the processes it creates commit together
+        with Connection.atomic() as tx:
+            for next_task, _ in tasks_dependent:
+                if not self._join_ready(graph, instance_id, next_task):
+                    waiting.append(next_task)
+                    continue
+                activated.append(next_task)
+
+                created = self.start_task(graph, instance_id, next_task)
+                if "error" in created:
+                    tx.rollback_only()
+                    return created
+                queued_jobs += created["queued_jobs"]
+
+        General.write_event(f"Task {task_id} completed, moving to next tasks {activated}"
+                            f"{f', joins waiting {waiting}' if waiting else ''}.", level="INFO")
+        return {"success": True, "data": {"next_tasks": activated, "waiting_tasks": waiting,
+                                          "queued_jobs": queued_jobs, "instance_completed": False}}
+
+    def start_task(self, graph, instance_id, task_id):
+        """
+        Creates the process of `task_id` for an instance: Processing for a manual task,
+        or Pending with its automated actions queued.
+
+        The process and its jobs commit together (joining the caller's transaction, if
+        any) and the worker pool is woken once they are committed.
+
+        Returns:
+            dict: the create_process result plus "queued_jobs", or an error dict.
+        """
+        task_info = graph.task(task_id)
+        automated = bool(task_info.get("has_actions"))
+        queued_jobs = 0
+        with Connection.atomic() as tx:
+            created = self.process.create_process(instance_id=instance_id,
+                                                  task_id=task_id,
+                                                  status="Pending" if automated else "Processing",
+                                                  assigned_to=task_info.get("assigned_to"),
+                                                  group_id=task_info.get("group_id"),
+                                                  level_id=task_info.get("level_id"))
+            if "error" in created:
+                tx.rollback_only()
+                return created
+
+            if automated:
+                queued = self.action_queue.enqueue_task_actions(process_id=created["process_id"], task_id=task_id)
+                if "error" in queued:
+                    tx.rollback_only()
+                    return queued
+                queued_jobs = queued["jobs"]
+
+        if queued_jobs:
+            self._notify_workers()
+        return dict(created, queued_jobs=queued_jobs)
+
+    def start_tasks(self, graph, instance_ids, task_id):
+        """
+        Batch form of start_task(): creates the process of `task_id` for each of
+        `instance_ids` with multi-row inserts.
+
+        Returns:
+            dict: the create_processes result plus "queued_jobs", or an error dict.
+        """
+        task_info = graph.task(task_id)
+        automated = bool(task_info.get("has_actions"))
+        queued_jobs = 0
+        with Connection.atomic() as tx:
+            created = self.process.create_processes(task_id=task_id,
+                                                    status="Pending" if automated else "Processing",
+                                                    instance_ids=instance_ids,
+                                                    assigned_to=task_info.get("assigned_to"),
+                                                    group_id=task_info.get("group_id"),
+                                                    level_id=task_info.get("level_id"))
+            if "error" in created:
+                tx.rollback_only()
+                return created
+
+            if automated:
+                queued = self.action_queue.enqueue_processes_actions(process_ids=created["process_ids"],
+                                                                     task_id=task_id)
+                if "error" in queued:
+                    tx.rollback_only()
+                    return queued
+                queued_jobs = queued["jobs"]
+
+        if queued_jobs:
+            self._notify_workers()
+        return dict(created, queued_jobs=queued_jobs)
+
+    @staticmethod
+    def _notify_workers():
+        # Imported here: the worker itself uses the router
+        from application.common.action_worker import ActionWorker
+
+        tx = Connection.current_transaction()
+        if tx is None:
+            ActionWorker.notify()
+        else:
+            # The jobs are invisible to the worker until the caller's transaction commits
+            tx.after_commit(ActionWorker.notify)
+
+    def _join_ready(self, graph, instance_id, task_id):
+        """True when `task_id` should be activated by this arrival."""
+        expected = len(graph.predecessors(task_id))
+        if expected < 2:
+            return True
+
+        arrived = self.join_counters.arrive(instance_id, task_id)
+        # Exactly one arrival activates the join: the first for OR, the last for AND
+        return arrived == (1 if graph.join_mode(task_id) == "OR" else expected)
@@ -1,20 +1,105 @@
 from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+import os
+import threading
+import time
 import mysql.connector
+from mysql.connector import errorcode
 from mysql.connector.errors import DatabaseError, IntegrityError, InterfaceError, Error
 import config as app
 from application.common.general import General
+from application.mysql_pool import ConnectionPool
+
+
+class Transaction:
+    """Unit of work opened by Connection.transaction(); holds the shared connection."""
+
+    def __init__(self, connection, parent=None):
+        self.connection = connection
+        self.is_rollback_only = False
+        # Savepoint names must be unique across the whole transaction
+        self._root = parent._root if parent is not None else self
+        self._savepoint_seq = 0
+        self._after_commit = []
+
+    def after_commit(self, callback):
+        """Runs `callback()` once the outermost transaction has committed; dropped if it rolls back."""
+        self._root._after_commit.append(callback)
+
+    def rollback_only(self):
+        """Roll back on exit instead of committing (only to the savepoint when nested)."""
+        self.is_rollback_only = True
+
+    @contextmanager
+    def savepoint(self, name=None):
+        """
+        Runs the block inside a SAVEPOINT; if it raises, only the work done
+        since the savepoint is undone and the exception propagates.
+        """
+        self._root._savepoint_seq += 1
+        name = name or f"sp_{self._root._savepoint_seq}"
+        self._execute(f"SAVEPOINT {name}")
+        try:
+            yield name
+        except BaseException:
+            self._execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            self._execute(f"RELEASE SAVEPOINT {name}")
+
+    def _execute(self, statement):
+        with self.connection.cursor() as cur:
+            cur.execute(statement)
 
 
 class Connection:
+    # Process-wide pool shared by every Connection instance (see _get_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+    # Per-thread state, e.g. the open transaction
+    _local = threading.local()
+    # Callables notified after every statement (see register_query_hook)
+    _query_hooks = []
+
     def __init__(self):
         self._host = app.Config.MYSQL_DATABASE_HOST
         self._user = app.Config.MYSQL_DATABASE_USER
         self._password = app.Config.MYSQL_DATABASE_PASSWORD
         self._db_name = app.Config.MYSQL_DATABASE_DB
 
+    def _get_pool(self):
+        """Returns the shared connection pool, creating it on first use in this process."""
+        pool = Connection._pool
+        if pool is not None and pool.pid == os.getpid():
+            return pool
+
+        with Connection._pool_lock:
+            # Re-check under the lock; a forked worker must not reuse its parent's sockets
+            if Connection._pool is None or Connection._pool.pid != os.getpid():
+                Connection._pool = ConnectionPool(
+                    size=app.Config.MYSQL_POOL_SIZE,
+                    wait_seconds=app.Config.MYSQL_POOL_WAIT_SECONDS,
+                    recycle_seconds=app.Config.MYSQL_POOL_RECYCLE_SECONDS,
+                    ping_seconds=app.Config.MYSQL_POOL_PING_SECONDS,
+                    host=self._host,
+                    user=self._user,
+                    password=self._password,
+                    database=self._db_name,
+                )
+            return Connection._pool
+
     def _connect(self):
-        """Establishes a connection to the MySQL database."""
+        """
+        Establishes a connection to the MySQL database.
+
+        When MYSQL_POOL_ENABLED is set the connection is borrowed from the shared
+        pool; closing it (or leaving its `with` block) returns it to the pool.
+        """
         try:
+            if app.Config.MYSQL_POOL_ENABLED:
+                return self._get_pool().acquire()
+
             return mysql.connector.connect(
                 host=self._host,
                 user=self._user,
@@ -40,59 +125,278 @@ class Connection:
         
 
 
-    def _execute_query(self, query, bind_variables=None, fetch_one=False, fetch_all=True, is_bulk_insert=False):
+    def _execute_query(self, query, bind_variables=None, fetch_one=False, fetch_all=True, is_bulk_insert=False,
+                       prepared=False, with_rowcount=False):
         """
         Executes a query and handles connection management.
 
+        Inside Connection.transaction() the statement runs on the transaction's
+        connection and is committed together with the rest of the unit of work.
+        Registered query hooks are notified after every statement.
+
         Args:
             query (str): The SQL query to execute.
             bind_variables (tuple, optional): The bind variables for the query.
             fetch_one (bool, optional): Whether to fetch a single record.
             fetch_all (bool, optional): Whether to fetch all records.
+            prepared (bool, optional): Run as a cached server-side prepared statement
+                when Config.MYSQL_PREPARED_STATEMENTS is enabled.
+            with_rowcount (bool, optional): Return (result, rowcount) instead of the result.
 
         Returns:
             list[dict] or dict or None: Query results.
         """
+        started = time.perf_counter()
+        connected = started
+        rowcount = None
+        error = None
         try:
+            tx = Connection.current_transaction()
+            if tx is not None:
+                result, rowcount = self._run_query(tx.connection, query, bind_variables, fetch_one, fetch_all,
+                                                   is_bulk_insert, commit=False, prepared=prepared)
+                return (result, rowcount) if with_rowcount else result
+
             with self._connect() as conn:
-                with conn.cursor(dictionary=True) as cur:
-                    if is_bulk_insert:
-                        # If it's a bulk insert, use executemany
-                        cur.executemany(query, bind_variables)
-                        conn.commit()
-
-                        # Return the number of rows inserted
-                        return cur.rowcount
-                    else:
-                        cur.execute(query, bind_variables or ())
-                        if fetch_one:
-                            return cur.fetchone()
-                        if fetch_all:
-                            return cur.fetchall()
-                        conn.commit()
-                        
-                        # Return the last inserted ID for INSERT queries
-                        if query.strip().lower().startswith("insert") or query.strip().lower().startswith("update"):
-                            return cur.lastrowid
-                    
-                    return None
+                connected = time.perf_counter()
+                result, rowcount = self._run_query(conn, query, bind_variables, fetch_one, fetch_all,
+                                                   is_bulk_insert, commit=True, prepared=prepared)
+                return (result, rowcount) if with_rowcount else result
         except mysql.connector.Error as err:
+            error = err
             General.write_event(message=f"MySQL Error: {err}, Query: {query}")
             raise
+        finally:
+            if Connection._query_hooks:
+                finished = time.perf_counter()
+                Connection._notify_query_hooks({
+                    "query": query,
+                    "bind_variables": bind_variables,
+                    "is_bulk_insert": is_bulk_insert,
+                    "rows": rowcount,
+                    "connect_ms": (connected - started) * 1000,
+                    "execute_ms": (finished - connected) * 1000,
+                    "error": error,
+                })
+
+    @staticmethod
+    def _run_query(conn, query, bind_variables, fetch_one, fetch_all, is_bulk_insert, commit, prepared=False):
+        """Runs a single statement on an already open connection; returns (result, rowcount)."""
+        cached = Connection._prepared_cursor(conn, query) if prepared else None
+        if cached is None:
+            with conn.cursor(dictionary=True) as cur:
+                return Connection._run_on_cursor(conn, cur, query, bind_variables, fetch_one, fetch_all,
+                                                 is_bulk_insert, commit)
+
+        statement, cur = cached
+        try:
+            result = Connection._run_on_cursor(conn, cur, statement, bind_variables, fetch_one, fetch_all,
+                                               is_bulk_insert, commit)
+        except Error:
+            # The cursor may be left mid-result; prepare it again next time
+            Connection._discard_prepared(conn, query)
+            raise
+        # The cursor stays open, so drain what fetchone() left unread
+        if conn.unread_result:
+            cur.fetchall()
+        return result
+
+    @staticmethod
+    def _prepared_cursor(conn, query):
+        """
+        Returns (statement, cursor) for `query` from the connection's prepared
+        statement cache, preparing it on first use. Returns None when prepared
+        statements are disabled or the connection is not pooled.
+        """
+        if not app.Config.MYSQL_PREPARED_STATEMENTS:
+            return None
+        entry = getattr(conn, "entry", None)
+        if entry is None:
+            return None
+
+        statements = entry.statements
+        cached = statements.get(query)
+        if cached is not None:
+            statements.move_to_end(query)
+            return cached
+
+        # The cursor only skips re-preparing when it sees the same string object,
+        # so the cached statement text is passed back on every execute
+        cached = statements[query] = (query, conn.cursor(prepared=True, dictionary=True))
+        while len(statements) > app.Config.MYSQL_PREPARED_CACHE_SIZE:
+            _, (_, evicted) = statements.popitem(last=False)
+            try:
+                evicted.close()
+            except Error:
+                pass
+        return cached
+
+    @staticmethod
+    def _discard_prepared(conn, query):
+        cached = conn.entry.statements.pop(query, None)
+        if cached is not None:
+            try:
+                cached[1].close()
+            except Error:
+                pass
+
+    @staticmethod
+    def _run_on_cursor(conn, cur, query, bind_variables, fetch_one, fetch_all, is_bulk_insert, commit):
+        """Executes `query` on the given cursor; returns (result, rowcount)."""
+        if is_bulk_insert:
+            # If it's a bulk insert, use executemany
+            cur.executemany(query, bind_variables)
+            if commit:
+                conn.commit()
+
+            # Return the number of rows inserted
+            return cur.rowcount, cur.rowcount
+        else:
+            cur.execute(query, bind_variables or ())
+            if fetch_one:
+                row = cur.fetchone()
+                return row, 1 if row else 0
+            if fetch_all:
+                rows = cur.fetchall()
+                return rows, len(rows)
+            if commit:
+                conn.commit()
+
+            # Return the last inserted ID for INSERT queries
+            if query.strip().lower().startswith("insert") or query.strip().lower().startswith("update"):
+                return cur.lastrowid, cur.rowcount
+
+        return None, cur.rowcount
+
+    @classmethod
+    def register_query_hook(cls, hook):
+        """
+        Registers a callable notified after every statement run through Connection.
+
+        The hook receives a dict with query, bind_variables, is_bulk_insert,
+        rows, connect_ms, execute_ms and error (None on success).
+        """
+        if hook not in cls._query_hooks:
+            cls._query_hooks.append(hook)
+
+    @classmethod
+    def _notify_query_hooks(cls, event):
+        for hook in list(cls._query_hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                # Instrumentation must never break the query it observes
+                General.write_event(message=f"Query hook {hook!r} failed: {e}")
+
+    @staticmethod
+    def is_duplicate_key(error):
+        """True when `error` is MySQL's duplicate-key error (ER_DUP_ENTRY) from a unique index."""
+        return isinstance(error, IntegrityError) and error.errno == errorcode.ER_DUP_ENTRY
+
+    @staticmethod
+    def current_transaction():
+        """Returns the transaction open on this thread, or None."""
+        return getattr(Connection._local, "transaction", None)
+
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        """
+        Groups every Connection call made on this thread into one unit of work.
+
+            with Connection.transaction() as tx:
+                role_id = Connection().create("`roles`", role_data)
+                Connection().create_many("permission_role", rows)
+
+        The work is committed once when the block exits and rolled back if it
+        raises or tx.rollback_only() was called. Nesting opens a savepoint on
+        the outer transaction instead of a new transaction.
+        """
+        outer = cls.current_transaction()
+        if outer is not None:
+            nested = Transaction(outer.connection, parent=outer)
+            with outer.savepoint() as name:
+                cls._local.transaction = nested
+                try:
+                    yield nested
+                finally:
+                    cls._local.transaction = outer
+                if nested.is_rollback_only:
+                    outer._execute(f"ROLLBACK TO SAVEPOINT {name}")
+            return
+
+        conn = cls()._connect()
+        tx = Transaction(conn)
+        cls._local.transaction = tx
+        try:
+            conn.start_transaction()
+            yield tx
+            if tx.is_rollback_only:
+                conn.rollback()
+            else:
+                conn.commit()
+                for callback in tx._after_commit:
+                    try:
+                        callback()
+                    except Exception as e:
+                        # The work is committed; a failing callback must not turn it into an error
+                        General.write_event(message=f"After-commit callback {callback!r} failed: {e}")
+        except BaseException:
+            try:
+                conn.rollback()
+            except Error as err:
+                General.write_event(message=f"MySQL Error during rollback: {err}")
+            raise
+        finally:
+            cls._local.transaction = None
+            conn.close()
+
+    @classmethod
+    def atomic(cls):
+        """
+        Like transaction(), but joins an already open transaction as it is
+        instead of adding a savepoint. For model methods whose statements must
+        commit together, whether or not the caller opened a transaction;
+        rollback_only() then marks the joined transaction.
+        """
+        outer = cls.current_transaction()
+        return nullcontext(outer) if outer is not None else cls.transaction()
+
+    # The SQL builders are memoized per statement shape; besides saving the string
+    # work, returning the same string object lets a cached prepared cursor reuse
+    # its statement without preparing it again.
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _insert_sql(table_name, columns):
+        return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _update_sql(table_name, columns, condition_column):
+        set_clause = ', '.join([f"{key} = %s" for key in columns])
+        return f"UPDATE {table_name} SET {set_clause} WHERE {condition_column} = %s"
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _select_sql(table_name, columns, condition, limit_one=False):
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM {table_name}"
+        if condition:
+            query += f" WHERE {condition}"
+        if limit_one:
+            query += " LIMIT 1"
+        return query
 
     def create(self, table_name, data, debug=False):
         """Inserts a record into the database."""
         if not table_name or not data:
             raise ValueError("Table name and data are required.")
 
-        columns = ', '.join(data.keys())
-        values = ', '.join(['%s'] * len(data))
-        query = f"INSERT INTO {table_name} ({columns}) VALUES ({values})"
+        query = self._insert_sql(table_name, tuple(data.keys()))
 
         if debug:
             print(f"Query: {query}, Data: {data}")
         
-        insert_id = self._execute_query(query, tuple(data.values()), fetch_one=False, fetch_all=False)
+        insert_id = self._execute_query(query, tuple(data.values()), fetch_one=False, fetch_all=False, prepared=True)
         return insert_id 
 
     # def create_many(self, table_name, data, debug=False):
@@ -110,9 +414,40 @@ class Connection:
     #         print(f"Query: {query}, Data: {values}")
 
     #     return self._execute_query(query, values, fetch_one=False, fetch_all=False)
-    def create_many(self, table_name, data, debug=False):
-        """Inserts multiple records into the database with error handling."""
-        
+    def create_many(self, table_name, data, debug=False, return_ids=False, id_key=None):
+        """
+        Inserts multiple records into the database with error handling.
+
+        Rows are sent as multi-row `INSERT ... VALUES (...), (...)` statements,
+        chunked so that no statement exceeds Config.MYSQL_MAX_PACKET_BYTES or
+        Config.MYSQL_BULK_MAX_ROWS rows. All chunks are written in one
+        transaction (or the caller's, if one is open).
+
+        Returns the number of inserted rows, or with return_ids=True a dict
+        with `rows` and `id_ranges` ([first_id, first_id + chunk rows - 1]
+        per chunk). The ranges are only exact when the server hands out
+        consecutive ids (auto_increment_increment = 1 and no interleaved
+        inserts under innodb_autoinc_lock_mode = 2); pass `id_key`, the
+        columns identifying a row, to also get `ids`: the generated id of
+        every row in row order, read back by that key in the same transaction.
+        On failure returns {"error": ...}, with "duplicate": True when a
+        unique index rejected a row.
+        """
+        return self._insert_many(table_name, data, debug=debug, return_ids=return_ids or bool(id_key),
+                                 id_key=tuple(id_key) if id_key else None)
+
+    def upsert_many(self, table_name, data, update_columns=None, debug=False):
+        """
+        Inserts multiple records, updating the existing row on a duplicate key.
+
+        Uses the same chunked multi-row statements as create_many with an
+        `ON DUPLICATE KEY UPDATE` clause for `update_columns` (every inserted
+        column by default). Returns the affected row count as reported by
+        MySQL (1 per inserted row, 2 per updated row), or {"error": ...}.
+        """
+        return self._insert_many(table_name, data, debug=debug, update_columns=update_columns or True)
+
+    def _insert_many(self, table_name, data, debug=False, return_ids=False, update_columns=None, id_key=None):
         # Validate inputs
         if not table_name or not isinstance(data, list) or not data:
             General.write_event("Table name and non-empty list of data are required.")
@@ -124,37 +459,120 @@ class Connection:
 
         try:
             # Ensure columns are extracted in a consistent order
-            all_keys = list(data[0].keys())  # Maintain order from first record
-            columns = ', '.join(all_keys)
-            placeholders = ', '.join(['%s'] * len(all_keys))
-            query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+            all_keys = tuple(data[0].keys())  # Maintain order from first record
+            if update_columns is True:
+                update_columns = all_keys
+            update_columns = tuple(update_columns) if update_columns else None
 
             # Generate values while ensuring correct order
             values = [tuple(d[col] for col in all_keys) for d in data]
-
-            if debug:
-                print(f"Query: {query}, Data: {values}")
-
-            # Execute the query (assuming `_execute_query` supports bulk insertion)
-            return self._execute_query(query, values, fetch_one=False, fetch_all=False, is_bulk_insert=True)
+            chunks = self._chunk_rows(values)
+
+            total_rows = 0
+            id_ranges = []
+            ids = None
+            # A single chunk is atomic on its own; several (or a read-back of the ids) share one transaction
+            with (Connection.transaction() if len(chunks) > 1 or id_key else nullcontext()):
+                for chunk in chunks:
+                    query = self._insert_many_sql(table_name, all_keys, len(chunk), update_columns)
+                    params = tuple(value for row in chunk for value in row)
+
+                    if debug:
+                        print(f"Query: {query}, Data: {chunk}")
+
+                    first_id, rowcount = self._execute_query(query, params, fetch_one=False, fetch_all=False,
+                                                             with_rowcount=True)
+                    total_rows += rowcount
+                    if first_id:
+                        id_ranges.append([first_id, first_id + len(chunk) - 1])
+
+                if id_key:
+                    ids = self._ids_by_key(table_name, data, id_key, min(first for first, _ in id_ranges))
+
+            if id_key:
+                return {"rows": total_rows, "id_ranges": id_ranges, "ids": ids}
+            if return_ids:
+                return {"rows": total_rows, "id_ranges": id_ranges}
+            return total_rows
 
         except Exception as e:
             General.write_event(f"Unexpected Error: {e}")
             print(f"Unexpected Error: {e}")
+            if Connection.is_duplicate_key(e):
+                return {"error": str(e), "duplicate": True}
             return {"error": str(e)}
 
-    def update(self, table_name, condition_column, condition_value, update_data, debug=False):
-        """Updates records in the database."""
+    def _ids_by_key(self, table_name, data, id_key, min_id):
+        """
+        Ids of the just inserted `data` rows in row order, matched on the `id_key` columns.
+
+        Rows sharing a key get that key's ids in ascending order, which is the order
+        MySQL assigns them within an insert; `min_id` (the first generated id) keeps
+        older rows with the same key out.
+        """
+        keys = [tuple(str(row[column]) for column in id_key) for row in data]
+        unique_keys = list(dict.fromkeys(tuple(row[column] for column in id_key) for row in data))
+        placeholders = f"({', '.join(['%s'] * len(id_key))})"
+        found = self._execute_query(
+            f"SELECT id, {', '.join(id_key)} FROM {table_name} "
+            f"WHERE id >= %s AND ({', '.join(id_key)}) IN ({', '.join([placeholders] * len(unique_keys))}) "
+            f"ORDER BY id",
+            (min_id, *(value for key in unique_keys for value in key))
+        ) or []
+
+        ids_by_key = defaultdict(list)
+        for row in found:
+            ids_by_key[tuple(str(row[column]) for column in id_key)].append(row["id"])
+        positions = defaultdict(int)
+        ids = []
+        for key in keys:
+            if positions[key] >= len(ids_by_key[key]):
+                raise LookupError(f"Inserted row {dict(zip(id_key, key))} not found in {table_name}")
+            ids.append(ids_by_key[key][positions[key]])
+            positions[key] += 1
+        return ids
+
+    @staticmethod
+    def _chunk_rows(values):
+        """Splits rows so each statement stays under the packet and row limits."""
+        max_bytes = app.Config.MYSQL_MAX_PACKET_BYTES
+        max_rows = app.Config.MYSQL_BULK_MAX_ROWS
+        chunks, chunk, chunk_bytes = [], [], 0
+
+        for row in values:
+            # Rough wire size: the literal plus quoting/separators per value
+            row_bytes = sum(len(str(value)) * 2 + 4 for value in row) + 4
+            if chunk and (len(chunk) >= max_rows or chunk_bytes + row_bytes > max_bytes):
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(row)
+            chunk_bytes += row_bytes
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _insert_many_sql(table_name, columns, row_count, update_columns=None):
+        row = f"({', '.join(['%s'] * len(columns))})"
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {', '.join([row] * row_count)}"
+        if update_columns:
+            query += " ON DUPLICATE KEY UPDATE " + ', '.join(f"{col} = VALUES({col})" for col in update_columns)
+        return query
+
+    def update(self, table_name, condition_column, condition_value, update_data, debug=False, with_rowcount=False):
+        """Updates records in the database (with_rowcount=True returns (lastrowid, affected rows))."""
         if not table_name or not condition_column or not update_data:
             raise ValueError("Table name, condition column, and update data are required.")
 
-        set_clause = ', '.join([f"{key} = %s" for key in update_data.keys()])
-        query = f"UPDATE {table_name} SET {set_clause} WHERE {condition_column} = %s"
+        query = self._update_sql(table_name, tuple(update_data.keys()), condition_column)
 
         if debug:
             print(f"Query: {query}, Data: {update_data}, Condition: {condition_value}")
         
-        updated_id = self._execute_query(query, tuple(update_data.values()) + (condition_value,), fetch_one=False, fetch_all=False)
+        updated_id = self._execute_query(query, tuple(update_data.values()) + (condition_value,), fetch_one=False, fetch_all=False,
+                                         prepared=True, with_rowcount=with_rowcount)
         return updated_id
 
     def select(self, table_name, columns=None, condition=None, bind_variables=None, debug=False):
@@ -162,16 +580,12 @@ class Connection:
         if not table_name:
             raise ValueError("Table name is required.")
 
-        columns_str = ', '.join(columns) if columns else '*'
-        query = f"SELECT {columns_str} FROM {table_name}"
-
-        if condition:
-            query += f" WHERE {condition}"
+        query = self._select_sql(table_name, tuple(columns) if columns else None, condition)
 
         if debug:
             print(f"Query: {query}, Bind Variables: {bind_variables}")
 
-        return self._execute_query(query, bind_variables, fetch_one=False)
+        return self._execute_query(query, bind_variables, fetch_one=False, prepared=True)
 
     def select_one(self, table_name, columns=None, condition=None, bind_variables=None, debug=False):
         """Selects a single record from the database."""
@@ -180,18 +594,8 @@ class Connection:
         if not table_name:
             raise ValueError("Table name is required.")
 
-        # Set columns to '*' if not provided, otherwise join the column names
-        columns_str = ', '.join(columns) if columns else '*'
-        
-        # Build the query
-        query = f"SELECT {columns_str} FROM {table_name}"
-        
-        # Add condition if provided
-        if condition:
-            query += f" WHERE {condition}"
-        
-        # Add LIMIT 1 to fetch only one record
-        query += " LIMIT 1"
+        # Build the query (columns default to '*'), limited to one record
+        query = self._select_sql(table_name, tuple(columns) if columns else None, condition, limit_one=True)
 
         # Debugging output
         if debug:
@@ -199,7 +603,7 @@ class Connection:
             print(f"Bind Variables: {bind_variables}")
 
         # Execute the query
-        return self._execute_query(query, bind_variables, fetch_one=True)
+        return self._execute_query(query, bind_variables, fetch_one=True, prepared=True)
 
     def execute_raw(self, query, bind_variables=None, debug=False):
         """Executes a raw SQL query."""
@@ -208,6 +612,102 @@ class Connection:
 
         return self._execute_query(query, bind_variables)
 
+    def select_iter(self, table_name, columns=None, condition=None, bind_variables=None,
+                    batch_size=None, as_tuples=False, debug=False, eager=False):
+        """
+        Streams records from the database instead of materializing them.
+
+        Rows are read through an unbuffered cursor in batches of `batch_size`
+        (Config.MYSQL_STREAM_BATCH_SIZE by default), so memory stays flat
+        regardless of table size. The connection is held until the generator
+        is exhausted or closed.
+
+        The query normally runs on the first next(); with eager=True it runs
+        before select_iter returns, so connection and SQL errors are raised to
+        the caller instead of surfacing in the middle of a response stream.
+        """
+        if not table_name:
+            raise ValueError("Table name is required.")
+
+        columns_str = ', '.join(columns) if columns else '*'
+        query = f"SELECT {columns_str} FROM {table_name}"
+
+        if condition:
+            query += f" WHERE {condition}"
+
+        if debug:
+            print(f"Query: {query}, Bind Variables: {bind_variables}")
+
+        rows = self._iter_query(query, bind_variables, batch_size, as_tuples)
+        return self._started(rows) if eager else rows
+
+    def execute_iter(self, query, bind_variables=None, batch_size=None, as_tuples=False, debug=False, eager=False):
+        """Streams the rows of a raw SQL query (see select_iter)."""
+        if debug:
+            print(f"Raw Query: {query}, Bind Variables: {bind_variables}")
+
+        rows = self._iter_query(query, bind_variables, batch_size, as_tuples)
+        return self._started(rows) if eager else rows
+
+    @staticmethod
+    def _started(rows):
+        """Advances a row generator to its first row now; returns a generator over all of its rows."""
+        first = next(rows, None)
+
+        def stream():
+            # An empty result already ran the generator to its end and released the connection
+            if first is None:
+                return
+            yield first
+            yield from rows
+
+        return stream()
+
+    def _iter_query(self, query, bind_variables, batch_size, as_tuples):
+        """Generator behind select_iter/execute_iter; yields dicts, or tuples if as_tuples."""
+        batch_size = batch_size or app.Config.MYSQL_STREAM_BATCH_SIZE
+        started = time.perf_counter()
+        connected = started
+        rowcount = 0
+        error = None
+
+        tx = Connection.current_transaction()
+        conn = tx.connection if tx is not None else self._connect()
+        try:
+            connected = time.perf_counter()
+            cur = conn.cursor(dictionary=not as_tuples, buffered=False)
+            try:
+                cur.execute(query, bind_variables or ())
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    rowcount += len(rows)
+                    yield from rows
+            finally:
+                # Drain what an early-closed generator left unread so the
+                # connection can be reused
+                conn.consume_results()
+                cur.close()
+        except mysql.connector.Error as err:
+            error = err
+            General.write_event(message=f"MySQL Error: {err}, Query: {query}")
+            raise
+        finally:
+            if tx is None:
+                conn.close()
+            if Connection._query_hooks:
+                finished = time.perf_counter()
+                Connection._notify_query_hooks({
+                    "query": query,
+                    "bind_variables": bind_variables,
+                    "is_bulk_insert": False,
+                    "rows": rowcount,
+                    "connect_ms": (connected - started) * 1000,
+                    "execute_ms": (finished - connected) * 1000,
+                    "error": error,
+                })
+
     def delete(self, table_name, condition, bind_variables=None, debug=False):
         """Deletes records from the database."""
         if not table_name or not condition:
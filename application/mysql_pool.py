@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+import mysql.connector
+from mysql.connector.errors import Error
+
+
+class PoolExhaustedError(ConnectionError):
+    """Raised when no pooled connection becomes free within the configured wait time."""
+
+
+class _PoolEntry:
+    """A physical MySQL connection plus the bookkeeping the pool needs for it."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # Prepared (query, cursor) pairs cached for this connection, keyed by SQL text (LRU order)
+        self.statements = OrderedDict()
+
+    def close_statements(self):
+        statements, self.statements = self.statements, OrderedDict()
+        for _, cursor in statements.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.close_statements()
+        try:
+            self.raw.close()
+        except Exception:
+            pass
+
+
+class PooledConnection:
+    """
+    Handle returned by ConnectionPool.acquire().
+
+    It behaves like a regular mysql.connector connection (every attribute is
+    delegated), but close() and leaving a `with` block hand the underlying
+    connection back to the pool instead of tearing it down.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise Error("Pooled connection has already been returned to the pool.")
+        return getattr(entry.raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def entry(self):
+        return self._entry
+
+    def close(self):
+        """Return the connection to the pool; safe to call more than once."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __del__(self):
+        # Safety net for callers that return early without closing the connection
+        if self.__dict__.get("_entry") is not None:
+            self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of reusable MySQL connections.
+
+    - at most `size` connections exist (checked out + idle) at any time
+    - callers wait up to `wait_seconds` for a free slot
+    - connections older than `recycle_seconds` are replaced
+    - connections idle longer than `ping_seconds` are pinged before reuse
+    - open transactions are rolled back when a connection comes back
+    """
+
+    def __init__(self, size, wait_seconds, recycle_seconds, ping_seconds, **connect_kwargs):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+
+        self.size = size
+        self.wait_seconds = wait_seconds
+        self.recycle_seconds = recycle_seconds
+        self.ping_seconds = ping_seconds
+        self.pid = os.getpid()
+        self._connect_kwargs = connect_kwargs
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        """Check a connection out of the pool, opening a new one if none is idle."""
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise PoolExhaustedError(
+                f"No MySQL connection available after {self.wait_seconds}s (pool size {self.size})."
+            )
+
+        try:
+            entry = self._checkout_idle() or _PoolEntry(mysql.connector.connect(**self._connect_kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Give a connection back; broken ones are discarded instead of reused."""
+        try:
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+            entry.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(entry)
+        except Exception:
+            entry.close()
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        """Close every idle connection (checked-out connections close on release)."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            entry.close()
+
+    def _checkout_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                # LIFO keeps the hottest connections in use and lets the rest age out
+                entry = self._idle.pop()
+
+            if self._is_healthy(entry):
+                return entry
+            entry.close()
+
+    def _is_healthy(self, entry):
+        now = time.monotonic()
+        if self.recycle_seconds and now - entry.created_at > self.recycle_seconds:
+            return False
+        if self.ping_seconds is not None and now - entry.last_used > self.ping_seconds:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
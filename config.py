@@ -18,6 +18,79 @@ class Config:
     MYSQL_DATABASE_DB = "dynamic_workflows_db"
     MYSQL_DATABASE_HOST = "localhost"
     MYSQL_DATABASE_PORT = "3306"
+    # MYSQL CONNECTION POOL
+    MYSQL_POOL_ENABLED = True
+    MYSQL_POOL_SIZE = 10  # max open connections per worker process
+    MYSQL_POOL_WAIT_SECONDS = 5  # how long a request waits for a free connection
+    MYSQL_POOL_RECYCLE_SECONDS = 1800  # replace connections older than this
+    MYSQL_POOL_PING_SECONDS = 30  # ping connections idle longer than this before reuse
+    MYSQL_STREAM_BATCH_SIZE = 500  # rows fetched per round-trip by select_iter/execute_iter
+    MYSQL_PREPARED_STATEMENTS = False  # reuse server-side prepared statements per pooled connection
+    MYSQL_PREPARED_CACHE_SIZE = 64  # prepared statements kept per connection (least recently used are closed)
+    MYSQL_MAX_PACKET_BYTES = 4 * 1024 * 1024  # upper bound for one multi-row INSERT (keep below max_allowed_packet)
+    MYSQL_BULK_MAX_ROWS = 1000  # rows per multi-row INSERT chunk
+    # EVENT LOG
+    EVENT_LOG_ASYNC = True  # write General.write_event records from a background thread
+    EVENT_LOG_BUFFER_SIZE = 10000  # records held in memory; DEBUG/INFO are dropped first when full
+    EVENT_LOG_BATCH_SIZE = 500  # wake the writer early once this many records are waiting
+    EVENT_LOG_FLUSH_SECONDS = 1  # maximum delay before a record reaches the file
+    EVENT_LOG_FORMAT = "json"  # "json" for structured records with request context, "text" for the classic lines
+    LOG_REQUESTS = True  # write one INFO record per request with status and elapsed ms
+    # SQL INSTRUMENTATION
+    SQL_METRICS_ENABLED = True
+    SQL_METRICS_MAX_FINGERPRINTS = 500  # distinct statements tracked before folding into "<other>"
+    SLOW_QUERY_THRESHOLD_MS = 500  # statements slower than this go to the slow-query log
+    # CACHES
+    USER_CONTEXT_CACHE_TTL_SECONDS = 30  # how long token_required trusts a cached user row
+    USER_CONTEXT_CACHE_SIZE = 2048  # users kept in the context cache per worker process
+    ROLE_PERMISSION_CACHE_TTL_SECONDS = 300  # safety net for grants changed by another process
+    ROLE_PERMISSION_CACHE_SIZE = 256  # roles kept in the permission cache per worker process
+    WORKFLOW_GRAPH_CACHE_TTL_SECONDS = 3600  # compiled template graphs; template edits drop them through a version check
+    WORKFLOW_GRAPH_CHECK_SECONDS = 5  # how long a compiled graph is used before its version is checked again
+    WORKFLOW_GRAPH_CACHE_SIZE = 256  # templates kept compiled per worker process
+    COUNT_CACHE_TTL_SECONDS = 10  # exact pagination totals; writes through Connection drop them earlier
+    COUNT_CACHE_SIZE = 1024  # (table, filter) totals kept per worker process
+    LOOKUP_CACHE_TTL_SECONDS = 3600  # whole lookup tables (lkt_*, levels, field and action types) kept in memory
+    LOOKUP_CACHE_SIZE = 512  # lookup tables kept per worker process
+    LOOKUP_CACHE_CHECK_SECONDS = 5  # how long a cached table is served before its version is checked again; 0 checks every read
+    LOOKUP_CACHE_MAX_ROWS = 5000  # larger lookup tables are read from MySQL instead
+    LOOKUP_BULK_MAX_IDS = 50  # lockup_ids accepted by one POST /api/dynamic/lockups/bulk call
+    # WORKFLOW
+    WORKFLOW_START_BATCH_MAX = 5000  # request_ids accepted by one batch start call
+    WORKFLOW_DEFAULT_JOIN = "AND"  # join of a task with several predecessors and no task_condition: "AND" or "OR"
+    INBOX_PAGE_SIZE = 50  # processes per GET /api/inbox page when no limit is given
+    INBOX_PAGE_SIZE_MAX = 200  # largest limit accepted by GET /api/inbox
+    # AUTOMATED ACTIONS
+    ACTION_WORKERS_ENABLED = True  # run queued automated actions in background threads of each app process
+    ACTION_WORKER_THREADS = 8  # actions running at once per process
+    ACTION_WORKER_CONCURRENCY = {"default": 4}  # actions running at once per action type ("default" for the rest)
+    ACTION_WORKER_POLL_SECONDS = 2  # how often idle workers look for due jobs
+    ACTION_TIMEOUT_SECONDS = 30  # an attempt running longer than this counts as failed
+    ACTION_MAX_ATTEMPTS = 5  # attempts before a job and its process are marked failed
+    ACTION_RETRY_BACKOFF_SECONDS = 2  # delay before the first retry, doubled on each further attempt
+    ACTION_RETRY_BACKOFF_MAX_SECONDS = 300  # upper bound of the retry delay
+    ACTION_LEASE_SECONDS = 300  # running jobs not finished within this are requeued (crashed worker)
+    # OUTBOUND HTTP
+    HTTP_CONNECT_TIMEOUT_SECONDS = 3  # default connect timeout of General.call_api / post_api
+    HTTP_READ_TIMEOUT_SECONDS = 30  # default read timeout of General.call_api / post_api
+    HTTP_MAX_CONCURRENCY_PER_HOST = 10  # requests in flight per host; also the keep-alive pool size
+    HTTP_QUEUE_WAIT_SECONDS = 10  # how long a call waits for a free slot of a busy host
+    HTTP_MAX_RETRIES = 2  # retries after connection errors and 429/502/503/504 answers
+    HTTP_RETRY_BACKOFF_SECONDS = 0.5  # base of the jittered exponential retry delay
+    HTTP_RETRY_BACKOFF_MAX_SECONDS = 10  # upper bound of one retry delay (also caps Retry-After)
+    HTTP_FANOUT_CONCURRENCY = 10  # default calls in flight for one General.call_api_many fan-out
+    HTTP_FANOUT_THREADS = 32  # threads shared by all fan-outs of a process
+    # OUTBOX
+    OUTBOX_RELAY_ENABLED = True  # deliver workflow state-change events from a background thread
+    OUTBOX_SINKS = ("file",)  # sinks every batch goes to: "file", "http" or names added with OutboxRelay.register_sink
+    OUTBOX_FILE_PATH = None  # JSON-lines file of the "file" sink; None for the daily bpm-service-outbox log
+    OUTBOX_HTTP_URL = None  # endpoint the "http" sink POSTs {"events": [...]} to
+    OUTBOX_BATCH_SIZE = 200  # events delivered per batch
+    OUTBOX_POLL_SECONDS = 1  # how often the relay looks for new events
+    OUTBOX_LEASE_SECONDS = 120  # events stuck in delivery longer than this are retried (crashed relay)
+    OUTBOX_MAX_ATTEMPTS = 10  # failed deliveries before events are marked dead
+    OUTBOX_RETRY_BACKOFF_SECONDS = 2  # delay before the first redelivery, doubled on each further attempt
+    OUTBOX_RETRY_BACKOFF_MAX_SECONDS = 600  # upper bound of the redelivery delay
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,10 @@
+-- Last executed version of each workflow template, used to re-execute
+-- templates incrementally (see TemplateCompiler.deploy).
+-- task_map maps diagram node ids to workflow_tasks.id.
+CREATE TABLE IF NOT EXISTS `workflow_template_deployments` (
+    `template_id` INT NOT NULL,
+    `diagram_json` LONGTEXT NOT NULL,
+    `task_map` JSON NOT NULL,
+    `executed_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`template_id`)
+);
@@ -0,0 +1,5 @@
+-- Makes workflow instance creation idempotent: a retried start with the same
+-- request_id is rejected by MySQL (ER_DUP_ENTRY) instead of a check-then-insert.
+-- Remove existing duplicate (template_id, request_id) rows before applying.
+ALTER TABLE `workflow_instances`
+    ADD UNIQUE KEY `uq_workflow_instances_template_request` (`template_id`, `request_id`);
@@ -0,0 +1,27 @@
+-- Queue of automated task actions run by the in-process action worker pool
+-- (application/common/action_worker.py). Workers claim rows with
+-- SELECT ... FOR UPDATE SKIP LOCKED, which needs MySQL 8.0+.
+CREATE TABLE IF NOT EXISTS `automated_action_jobs` (
+    `id` BIGINT NOT NULL AUTO_INCREMENT,
+    `process_id` INT NOT NULL,
+    `action_id` INT NOT NULL,
+    `action_type` VARCHAR(100) NOT NULL,
+    `action_config` TEXT NULL,
+    `status` VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed
+    `attempts` INT NOT NULL DEFAULT 0,
+    `max_attempts` INT NOT NULL DEFAULT 5,
+    `available_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `locked_by` VARCHAR(100) NULL,
+    `locked_until` DATETIME NULL,
+    `last_error` TEXT NULL,
+    `result` JSON NULL,
+    `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `finished_at` DATETIME NULL,
+    PRIMARY KEY (`id`),
+    KEY `idx_action_jobs_status_available` (`status`, `available_at`),
+    KEY `idx_action_jobs_process` (`process_id`)
+);
+
+-- Outcome of the automated actions of a process
+ALTER TABLE `workflow_process`
+    ADD COLUMN `action_result` JSON NULL;
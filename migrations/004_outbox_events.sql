@@ -0,0 +1,20 @@
+-- Transactional outbox: workflow state changes are written here in the same
+-- transaction as the change itself and delivered later by the outbox relay
+-- (application/common/outbox_relay.py).
+CREATE TABLE IF NOT EXISTS `outbox_events` (
+    `id` BIGINT NOT NULL AUTO_INCREMENT,
+    `event_type` VARCHAR(100) NOT NULL,
+    `aggregate_type` VARCHAR(50) NOT NULL,
+    `aggregate_id` BIGINT NOT NULL,
+    `payload` JSON NOT NULL,
+    `request_id` VARCHAR(64) NULL,
+    `status` VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, delivering, delivered, dead
+    `attempts` INT NOT NULL DEFAULT 0,
+    `available_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `locked_until` DATETIME NULL,
+    `last_error` TEXT NULL,
+    `created_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `delivered_at` DATETIME NULL,
+    PRIMARY KEY (`id`),
+    KEY `idx_outbox_status_available` (`status`, `available_at`, `id`)
+);
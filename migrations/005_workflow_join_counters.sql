@@ -0,0 +1,10 @@
+-- Arrivals at join tasks (tasks with several predecessors) per instance, so
+-- WorkflowRouter decides AND/OR joins from one row instead of reading the
+-- processes of every predecessor.
+CREATE TABLE IF NOT EXISTS `workflow_join_counters` (
+    `instance_id` INT NOT NULL,
+    `task_id` INT NOT NULL,
+    `arrived` INT NOT NULL DEFAULT 0,
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`instance_id`, `task_id`)
+);
@@ -0,0 +1,6 @@
+-- Indexes for GET /api/inbox (Process.list_inbox). Each branch of the inbox
+-- query is a range scan over one of these indexes in id order, and only the
+-- process ids of one page are read from them before the join.
+ALTER TABLE `workflow_process`
+    ADD INDEX `ix_workflow_process_assignee_inbox` (`assigned_to`, `status`, `id`),
+    ADD INDEX `ix_workflow_process_group_inbox` (`group_id`, `level_id`, `status`, `id`);
@@ -0,0 +1,9 @@
+-- Version counters of the cached lookup tables (see common/lookup_cache.py).
+-- Every write to a lookup bumps its row; app processes compare their cached
+-- version with this table to notice writes made by other workers.
+CREATE TABLE IF NOT EXISTS `lookup_versions` (
+    `name` VARCHAR(100) NOT NULL,
+    `version` BIGINT NOT NULL DEFAULT 0,
+    `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`name`)
+);
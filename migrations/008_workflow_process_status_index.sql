@@ -0,0 +1,5 @@
+-- Index for the action worker's sweep (ActionQueue.stalled_processes): it
+-- looks for Pending processes whose jobs have all finished but that were never
+-- moved on, and only the few Pending rows should be read to find them.
+ALTER TABLE `workflow_process`
+    ADD INDEX `ix_workflow_process_status` (`status`, `id`);